@@ -1,40 +1,43 @@
+import io
 import sys
 import os
-import psycopg2
 import pandas as pd
+from typing import Dict, List, Optional, Union
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, File, UploadFile, Request
-from fastapi.responses import Response
-from starlette.responses import RedirectResponse
+from fastapi import FastAPI, File, UploadFile, Request, Body, HTTPException, Query
+from starlette.responses import RedirectResponse, JSONResponse, StreamingResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.templating import Jinja2Templates
 from uvicorn import run as app_run
 
 from networksecurity.exception.exception import NetworkSecurityException
-from networksecurity.pipeline.training_pipeline import TrainingPipeline
-from networksecurity.utils.main_utils.utils import load_object
-from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.logging.logger import logging
+from networksecurity.pipeline.training_job import TrainingJobManager
+from networksecurity.utils.ml_utils.model.registry import ModelRegistry
+from networksecurity.serving.batcher import PredictionBatcher
+from networksecurity.serving.executor import BoundedExecutor, ServerOverloadedError
+from networksecurity.serving.drift_monitor import DriftMonitor
+from networksecurity.serving.prediction_log import PredictionLogWriter
+from networksecurity.serving.metrics import ServingMetrics, MetricsMiddleware
+from networksecurity.utils.main_utils.db import get_pool
+from networksecurity.utils.ml_utils.model.registry import LoadedModel
+from networksecurity.constant.training_pipeline import (
+    SERVING_HOST,
+    SERVING_PORT,
+    PREDICTION_STREAM_CHUNK_ROWS,
+    PREDICTION_HTML_MAX_ROWS,
+)
 
 load_dotenv()
 
-POSTGRES_HOST = os.getenv("POSTGRES_HOST")
-POSTGRES_PORT = os.getenv("POSTGRES_PORT")
-POSTGRES_DB = os.getenv("POSTGRES_DB")
-POSTGRES_USER = os.getenv("POSTGRES_USER")
-POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
-
-conn = psycopg2.connect(
-    host=POSTGRES_HOST,
-    port=POSTGRES_PORT,
-    database=POSTGRES_DB,
-    user=POSTGRES_USER,
-    password=POSTGRES_PASSWORD
-)
-cursor = conn.cursor()
+db_pool = get_pool()
 
 app = FastAPI()
 origins = ["*"]
 
+serving_metrics = ServingMetrics()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -42,40 +45,237 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware, metrics=serving_metrics)
 
 templates = Jinja2Templates(directory="./templates")
 
+model_registry = ModelRegistry()
+inference_executor = BoundedExecutor()
+drift_monitor = DriftMonitor()
+prediction_log = PredictionLogWriter(db_pool)
+prediction_batcher = PredictionBatcher(model_registry, executor=inference_executor, drift_monitor=drift_monitor,
+                                       prediction_log=prediction_log, metrics=serving_metrics)
+serving_metrics.register_sources(model_registry=model_registry, executor=inference_executor,
+                                 batcher=prediction_batcher, prediction_log=prediction_log, db_pool=db_pool,
+                                 drift_monitor=drift_monitor)
+training_jobs = TrainingJobManager(on_success=model_registry.reload)
+
+def preload_model():
+    """Load the model in the gunicorn master, forked workers share it and their startup reload is a no-op"""
+    try:
+        model_registry.reload()
+    except NetworkSecurityException as e:
+        logging.warning(f"Starting without a model: {e}")
+
+@app.on_event("startup")
+async def load_model_registry():
+    preload_model()
+    model_registry.start_watcher()
+    prediction_log.start()
+    serving_metrics.start()
+    await prediction_batcher.start()
+
+@app.on_event("shutdown")
+async def stop_model_registry():
+    await prediction_batcher.stop()
+    model_registry.stop_watcher()
+    inference_executor.shutdown()
+    training_jobs.shutdown()
+    await run_in_threadpool(prediction_log.stop)
+    await run_in_threadpool(serving_metrics.stop)
+    db_pool.close()
+
+def overloaded_response(e: ServerOverloadedError) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+def no_model_response() -> HTTPException:
+    return HTTPException(status_code=503, detail="No model loaded, run /train first")
+
 @app.get("/", tags=["authentication"])
 async def index():
     return RedirectResponse(url="/docs")
 
-@app.get("/train")
+@app.get("/health")
+async def health_route():
+    """Liveness of this worker process"""
+    return {"status": "ok", "pid": os.getpid()}
+
+@app.get("/ready")
+async def ready_route():
+    """Readiness of this worker: a model is loaded and the prediction batcher is running"""
+    ready = model_registry.is_loaded and prediction_batcher.is_running
+    body = {
+        "ready": ready,
+        "pid": os.getpid(),
+        "model_version": model_registry.version,
+        "batcher_running": prediction_batcher.is_running,
+        "inference_in_flight": inference_executor.in_flight,
+    }
+    if not ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+@app.get("/metrics")
+async def metrics_route():
+    """Prometheus text format, summed over every gunicorn worker"""
+    body = await run_in_threadpool(serving_metrics.render)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+@app.get("/train", status_code=202)
 async def train_route():
     try:
-        train_pipeline = TrainingPipeline()
-        train_pipeline.run_pipeline()
-        return Response("Training is successful")
+        job = training_jobs.submit()
+        return job.to_dict()
     except Exception as e:
         raise NetworkSecurityException(e, sys)
 
+@app.get("/train/{job_id}")
+async def train_status_route(job_id: str):
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown training job {job_id}")
+    return job.to_dict()
+
+def score_frame(loaded_model: LoadedModel, df: pd.DataFrame, source: str) -> pd.DataFrame:
+    network_model = loaded_model.network_model
+    with serving_metrics.phase(source, "preprocess"):
+        # Reorder columns to match training
+        df = df.reindex(columns=network_model.preprocessor.feature_names_in_, fill_value=0)
+    serving_metrics.observe_batch(source, len(df))
+
+    with serving_metrics.phase(source, "predict"):
+        y_pred = network_model.predict(df)
+    with serving_metrics.phase(source, "write"):
+        drift_monitor.observe(loaded_model, df.to_numpy(dtype=float))
+        # shallow copy, the output column added below is not part of the logged features
+        prediction_log.log(loaded_model.version, df.copy(deep=False), y_pred, source=source)
+    df['predicted_column'] = y_pred
+    return df
+
+def score_csv_upload(file):
+    """Score the upload chunk by chunk, only the rows shown in the HTML table are kept"""
+    loaded_model = model_registry.current()
+    shown, no_of_rows = [], 0
+    reader = pd.read_csv(file, chunksize=PREDICTION_STREAM_CHUNK_ROWS)
+    while True:
+        with serving_metrics.phase("csv", "parse"):
+            chunk = next(reader, None)
+        if chunk is None:
+            break
+        scored = score_frame(loaded_model, chunk, source="csv")
+        if no_of_rows < PREDICTION_HTML_MAX_ROWS:
+            shown.append(scored.head(PREDICTION_HTML_MAX_ROWS - no_of_rows))
+        no_of_rows += len(scored)
+    with serving_metrics.phase("csv", "render"):
+        table = pd.concat(shown) if shown else pd.DataFrame()
+        return table.to_html(classes='table table-striped'), no_of_rows
+
 @app.post("/predict")
 async def predict_route(request: Request, file: UploadFile = File(...)):
     try:
-        df = pd.read_csv(file.file)
-        preprocessor = load_object("final_model/preprocessor.pkl")
-        final_model = load_object("final_model/model.pkl")
-        network_model = NetworkModel(preprocessor=preprocessor, model=final_model)
-        # Reorder columns to match training
-        df = df.reindex(columns=preprocessor.feature_names_in_, fill_value=0)
+        table_html, no_of_rows = await inference_executor.run(score_csv_upload, file.file)
+        note = None
+        if no_of_rows > PREDICTION_HTML_MAX_ROWS:
+            note = (f"Showing the first {PREDICTION_HTML_MAX_ROWS} of {no_of_rows} predictions, "
+                    f"POST the file to /predict/stream for all of them.")
+        return templates.TemplateResponse("table.html", {"request": request, "table": table_html, "note": note})
+    except ServerOverloadedError as e:
+        raise overloaded_response(e)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
 
-        y_pred = network_model.predict(df)
-        df['predicted_column'] = y_pred
-        df.to_csv('prediction_output/output.csv', index=False)
-        table_html = df.to_html(classes='table table-striped')
-        return templates.TemplateResponse("table.html", {"request": request, "table": table_html})
-    
+def score_next_chunk(loaded_model: LoadedModel, reader, output_format: str, header: bool) -> str:
+    """Read, score and serialize the next chunk of a CSV reader, None once the file is exhausted"""
+    with serving_metrics.phase("csv", "parse"):
+        chunk = next(reader, None)
+    if chunk is None:
+        return None
+    scored = score_frame(loaded_model, chunk, source="csv")
+    with serving_metrics.phase("csv", "render"):
+        if output_format == "ndjson":
+            lines = scored.to_json(orient="records", lines=True)
+            return lines if lines.endswith("\n") else lines + "\n"
+        return scored.to_csv(index=False, header=header)
+
+@app.post("/predict/stream")
+async def predict_stream_route(file: UploadFile = File(...), format: str = Query("csv", pattern="^(csv|ndjson)$")):
+    """
+    Bulk scoring: the upload is read PREDICTION_STREAM_CHUNK_ROWS rows at a time and every
+    scored chunk is sent as soon as it is ready, so memory stays flat whatever the file size.
+    """
+    # FastAPI closes the upload once this handler returns, before the body is streamed,
+    # so the spooled file is taken over here and closed when streaming ends
+    upload, file.file = file.file, io.BytesIO()
+    try:
+        loaded_model = model_registry.current()
+        reader = await inference_executor.run(pd.read_csv, upload, chunksize=PREDICTION_STREAM_CHUNK_ROWS)
+        # the first chunk is scored before responding, so overload and bad input still get a proper status
+        first = await inference_executor.run(score_next_chunk, loaded_model, reader, format, True)
+    except ServerOverloadedError as e:
+        upload.close()
+        raise overloaded_response(e)
+    except Exception as e:
+        upload.close()
+        raise NetworkSecurityException(e, sys)
+
+    async def body():
+        try:
+            body_chunk = first
+            while body_chunk is not None:
+                yield body_chunk
+                # the status line is already sent, so a full executor is waited out instead of answered with 503
+                body_chunk = await inference_executor.run_when_free(score_next_chunk, loaded_model, reader,
+                                                                    format, False)
+        finally:
+            upload.close()
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return StreamingResponse(body(), media_type=media_type, headers={"X-Model-Version": loaded_model.version})
+
+@app.post("/predict/json")
+async def predict_json_route(
+    records: Union[Dict[str, Optional[float]], List[Dict[str, Optional[float]]]] = Body(...)
+):
+    if not model_registry.is_loaded:
+        raise no_model_response()
+    try:
+        if isinstance(records, dict):
+            records = [records]
+        return await prediction_batcher.predict(records)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ServerOverloadedError as e:
+        raise overloaded_response(e)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+@app.get("/model")
+async def model_route():
+    if not model_registry.is_loaded:
+        raise no_model_response()
+    loaded_model = model_registry.current()
+    network_model = loaded_model.network_model
+    compiled = getattr(network_model, "compiled", None)
+    return {
+        "model_version": loaded_model.version,
+        "loaded_at": loaded_model.loaded_at,
+        "model": type(network_model.model).__name__,
+        "compiled": compiled.kind if compiled is not None else None,
+        "prediction_cache": network_model.stats() if hasattr(network_model, "stats") else None,
+    }
+
+@app.get("/drift")
+async def drift_route():
+    return drift_monitor.snapshot()
+
+@app.post("/reload")
+async def reload_route():
+    try:
+        version = await run_in_threadpool(model_registry.reload)
+        return {"model_version": version}
     except Exception as e:
         raise NetworkSecurityException(e, sys)
 
 if __name__ == "__main__":
-    app_run(app, host="0.0.0.0", port=8000)
+    # single process for development, production runs `gunicorn -c gunicorn.conf.py app:app`
+    app_run(app, host=SERVING_HOST, port=SERVING_PORT)
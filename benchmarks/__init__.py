@@ -0,0 +1,7 @@
+"""
+Offline benchmarks of the inference and training hot paths on synthetic data.
+
+    python -m benchmarks.run --rows 10k 1M --baseline benchmarks/baseline.json
+
+See benchmarks/run.py for the options.
+"""
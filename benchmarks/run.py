@@ -0,0 +1,165 @@
+"""
+Run the benchmark suites at one or more scales, write the results as JSON and
+compare them with a baseline run.
+
+    python -m benchmarks.run --rows 10k 100k 1M 10M
+    python -m benchmarks.run --suites predict drift --rows 1M --save-baseline
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.2
+
+A metric regresses when a _seconds value grows, or a _per_second value shrinks, by
+more than the tolerance relative to the baseline measured at the same scale. The
+exit status is 1 when anything regressed, so the command can gate CI.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from typing import List
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from benchmarks.synthetic import REPO_DIR, SyntheticData
+from benchmarks.suites import SUITES
+
+DEFAULT_ROWS = ["10k", "100k"]
+DEFAULT_RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+DEFAULT_BASELINE_FILE_PATH = os.path.join(REPO_DIR, "benchmarks", "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+ROW_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_rows(value: str) -> int:
+    """10000, 10k or 1M"""
+    multiplier = ROW_SUFFIXES.get(value[-1:].lower(), 1)
+    try:
+        return int(float(value[:-1] if multiplier > 1 else value) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid number of rows {value}")
+
+
+def rows_label(rows: int) -> str:
+    for suffix, multiplier in sorted(ROW_SUFFIXES.items(), key=lambda item: -item[1]):
+        if rows >= multiplier and rows % multiplier == 0:
+            return f"{rows // multiplier}{suffix.upper() if suffix == 'm' else suffix}"
+    return str(rows)
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "commit": commit,
+    }
+
+
+def run_suites(suites: List[str], rows: List[int], seed: int) -> dict:
+    data = SyntheticData(seed=seed)
+    results = {}
+    for suite in suites:
+        results[suite] = {}
+        for scale in rows:
+            label = rows_label(scale)
+            print(f"{suite} @ {label} rows ...", flush=True)
+            start = time.perf_counter()
+            metrics = SUITES[suite](scale, data)
+            metrics["suite_seconds_total"] = time.perf_counter() - start
+            results[suite][label] = metrics
+            for name, value in metrics.items():
+                print(f"  {name}: {value:.6g}" if isinstance(value, float) else f"  {name}: {value}")
+    return results
+
+
+def direction(metric: str) -> int:
+    """+1 when larger is better, -1 when smaller is better, 0 when the metric is informational"""
+    if metric.endswith("_per_second"):
+        return 1
+    if metric.endswith("_seconds"):
+        return -1
+    return 0
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[dict]:
+    """Metrics of results that are worse than the same metric of baseline by more than tolerance"""
+    regressions = []
+    for suite, scales in results.items():
+        for label, metrics in scales.items():
+            base_metrics = baseline.get("results", {}).get(suite, {}).get(label, {})
+            for metric, value in metrics.items():
+                base_value = base_metrics.get(metric)
+                sign = direction(metric)
+                if not sign or not isinstance(value, (int, float)) or not isinstance(base_value, (int, float)) \
+                        or base_value <= 0:
+                    continue
+                change = (value - base_value) / base_value
+                if -sign * change > tolerance:
+                    regressions.append({"suite": suite, "rows": label, "metric": metric,
+                                        "baseline": base_value, "current": value, "change": change})
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", nargs="+", type=parse_rows, default=[parse_rows(rows) for rows in DEFAULT_ROWS],
+                        help="scales to run every suite at, e.g. 10k 100k 1M 10M")
+    parser.add_argument("--suites", nargs="+", choices=list(SUITES), default=list(SUITES))
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic data")
+    parser.add_argument("--output", help="results file, defaults to benchmarks/results/<timestamp>.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_FILE_PATH,
+                        help="results of an earlier run to compare with, skipped when the file does not exist")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative change of a metric that counts as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="also write the results to --baseline")
+    args = parser.parse_args(argv)
+
+    # the suites read data_schema/ and the database settings relative to the repository
+    os.chdir(REPO_DIR)
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "seed": args.seed,
+        "environment": environment(),
+        "results": run_suites(args.suites, args.rows, args.seed),
+    }
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{datetime.now():%Y_%m_%d_%H_%M_%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results written to {output}")
+
+    status = 0
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("environment", {}).get("cpu_count") != report["environment"]["cpu_count"]:
+            print("Warning: the baseline was measured on a machine with a different CPU count")
+        regressions = compare(report["results"], baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['suite']} @ {regression['rows']} {regression['metric']}: "
+                  f"{regression['baseline']:.6g} -> {regression['current']:.6g} ({regression['change']:+.0%})")
+        print(f"{len(regressions)} regressions beyond {args.tolerance:.0%} against {args.baseline}")
+        status = 1 if regressions else 0
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
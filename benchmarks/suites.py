@@ -0,0 +1,270 @@
+"""
+One function per benchmarked hot path, each taking the number of rows and the data
+generator and returning flat {metric: value}. Metric names end in _seconds (lower is
+better) or _per_second (higher is better); run.py compares those against the baseline.
+"""
+import os
+import time
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.impute import KNNImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from networksecurity.components.data_transformation import DataTransformation
+from networksecurity.utils.main_utils.utils import evaluate_models
+from networksecurity.utils.ml_utils.imputer.ternary_knn_imputer import TernaryKNNImputer
+from networksecurity.utils.ml_utils.metric.drift import value_histograms, compare_histograms, detect_drift
+from networksecurity.utils.ml_utils.model.compiled import CompiledModel
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+
+from benchmarks.synthetic import SyntheticData
+
+# the training side of the predict benchmark and the model search are capped, their cost is not per row
+MODEL_TRAIN_ROWS = 20_000
+FOREST_TREES = 64
+PREDICT_BATCH_SIZES = (1, 16, 256, 4096, 65536)
+# batch sizes up to this are timed call by call for latency percentiles
+LATENCY_MAX_BATCH_SIZE = 256
+LATENCY_CALLS = 200
+# about 0.3% of served rows carry a NaN, imputation cost on its own is the imputer suite's subject
+SERVED_MISSING_RATE = 0.0001
+# sklearn's KNNImputer is quadratic, it is compared with TernaryKNNImputer on a capped sample
+IMPUTER_TRAIN_ROWS = 10_000
+IMPUTER_QUERY_ROWS = 5_000
+IMPUTER_MISSING_RATE = 0.05
+DRIFT_FRAME_ROWS = 1_000_000
+ETL_MAX_ROWS = 1_000_000
+ETL_TABLE_NAME = "benchmark_phishing_data"
+# short measurements are the best of this many runs, a single one is mostly scheduler noise
+REPEAT = 3
+
+
+@contextmanager
+def working_directory(path: str):
+    """Run the block in path, for code that writes relative paths such as Artifacts/search_cache"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(previous)
+
+
+def best_of(fn: Callable, repeat: int = REPEAT) -> Tuple[float, object]:
+    """(fastest wall time of repeat calls of fn, its last result)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def percentile_seconds(timings, q: float) -> float:
+    return float(np.percentile(timings, q)) if len(timings) else 0.0
+
+
+def train_network_model(data: SyntheticData, rows: int) -> NetworkModel:
+    frame = data.frame(min(rows, MODEL_TRAIN_ROWS))
+    x, y = frame[data.feature_columns].astype(np.float64), frame["Result"].replace(-1, 0)
+    # the preprocessor training uses, with the configured imputer engine; the method reads no instance state
+    preprocessor = DataTransformation.get_data_transformer_object(DataTransformation).fit(x)
+    model = RandomForestClassifier(n_estimators=FOREST_TREES, random_state=0).fit(preprocessor.transform(x), y)
+    return NetworkModel(preprocessor=preprocessor, model=model)
+
+
+def bench_predict(rows: int, data: SyntheticData) -> Dict[str, float]:
+    """NetworkModel.predict throughput and latency per batch size, sklearn path and compiled model"""
+    network_model = train_network_model(data, rows)
+    variants = {
+        "sklearn": network_model,
+        "compiled": NetworkModel(network_model.preprocessor, network_model.model,
+                                 compiled=CompiledModel.compile(network_model.preprocessor, network_model.model)),
+    }
+    results = {}
+    for variant, model in variants.items():
+        for batch_size in PREDICT_BATCH_SIZES:
+            if batch_size > rows:
+                continue
+            if batch_size <= LATENCY_MAX_BATCH_SIZE:
+                calls = min(LATENCY_CALLS, max(rows // batch_size, 1))
+                batches = [data.frame(batch_size * calls, chunk_index=1, missing_rate=SERVED_MISSING_RATE,
+                                      with_target=False)]
+            else:
+                batches = data.chunks(rows, missing_rate=SERVED_MISSING_RATE, with_target=False)
+            timings, scored = [], 0
+            for frame in batches:
+                for start in range(0, len(frame), batch_size):
+                    batch = frame.iloc[start:start + batch_size]
+                    begin = time.perf_counter()
+                    model.predict(batch)
+                    timings.append(time.perf_counter() - begin)
+                    scored += len(batch)
+            prefix = f"{variant}_batch_{batch_size}"
+            results[f"{prefix}_rows_per_second"] = scored / sum(timings)
+            results[f"{prefix}_p50_seconds"] = percentile_seconds(timings, 50)
+            results[f"{prefix}_p99_seconds"] = percentile_seconds(timings, 99)
+    return results
+
+
+def benchmark_against_knn_imputer(X_train, X_query, n_neighbors: int = 3, repeat: int = REPEAT) -> dict:
+    """Times TernaryKNNImputer against sklearn's KNNImputer on the same data and reports agreement"""
+    report = {"train_rows": len(X_train), "query_rows": len(X_query),
+              "rows_with_missing": int(np.isnan(np.asarray(X_query, dtype=np.float64)).any(axis=1).sum())}
+    outputs = {}
+    for name, imputer in (("knn_imputer", KNNImputer(n_neighbors=n_neighbors, weights="uniform")),
+                          ("ternary_knn_imputer", TernaryKNNImputer(n_neighbors=n_neighbors))):
+        start = time.perf_counter()
+        imputer.fit(X_train)
+        report[f"{name}_fit_seconds"] = time.perf_counter() - start
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            outputs[name] = imputer.transform(X_query)
+            timings.append(time.perf_counter() - start)
+        report[f"{name}_transform_seconds"] = min(timings)
+    missing = np.isnan(np.asarray(X_query, dtype=np.float64))
+    agree = outputs["knn_imputer"][missing] == outputs["ternary_knn_imputer"][missing]
+    report["imputed_values"] = int(missing.sum())
+    report["imputed_value_agreement"] = float(agree.mean()) if agree.size else 1.0
+    report["speedup"] = report["knn_imputer_transform_seconds"] / report["ternary_knn_imputer_transform_seconds"]
+    return report
+
+
+def bench_imputer(rows: int, data: SyntheticData) -> Dict[str, float]:
+    """KNNImputer and TernaryKNNImputer fit and transform cost on the same rows"""
+    train = data.frame(min(rows, IMPUTER_TRAIN_ROWS), with_target=False).astype(np.float64)
+    query = data.frame(min(rows, IMPUTER_QUERY_ROWS), chunk_index=1, missing_rate=IMPUTER_MISSING_RATE,
+                       with_target=False)
+    report = benchmark_against_knn_imputer(train, query)
+    for name in ("knn_imputer", "ternary_knn_imputer"):
+        report[f"{name}_transform_rows_per_second"] = report["query_rows"] / report[f"{name}_transform_seconds"]
+    return report
+
+
+def bench_evaluate_models(rows: int, data: SyntheticData) -> Dict[str, float]:
+    """evaluate_models over every model family with small grids, without and with the fold score cache"""
+    frame = data.frame(min(rows, MODEL_TRAIN_ROWS))
+    x, y = frame[data.feature_columns].to_numpy(np.float64), frame["Result"].replace(-1, 0).to_numpy()
+    split = int(len(x) * 0.8)
+
+    def run():
+        models = {
+            "Random Forest": RandomForestClassifier(random_state=0),
+            "Decision Tree": DecisionTreeClassifier(random_state=0),
+            "Gradient Boosting": GradientBoostingClassifier(random_state=0),
+            "Logistic Regression": LogisticRegression(),
+            "AdaBoost": AdaBoostClassifier(random_state=0),
+        }
+        params = {
+            "Random Forest": {"n_estimators": [8, 32]},
+            "Decision Tree": {"criterion": ["gini", "entropy"]},
+            "Gradient Boosting": {"n_estimators": [16, 32]},
+            "Logistic Regression": {},
+            "AdaBoost": {"n_estimators": [16, 32]},
+        }
+        start = time.perf_counter()
+        report = evaluate_models(X_train=x[:split], y_train=y[:split], X_test=x[split:], y_test=y[split:],
+                                 models=models, param=params)
+        return time.perf_counter() - start, report
+
+    # a fresh directory, so the first search fits everything and the second is served from its cache
+    with tempfile.TemporaryDirectory() as temp_dir, working_directory(temp_dir):
+        cold_seconds, report = run()
+        cached_seconds, _ = run()
+    return {
+        "train_rows": split,
+        "cold_seconds": cold_seconds,
+        "cached_seconds": cached_seconds,
+        "best_test_score": max(report.values()),
+    }
+
+
+def bench_drift(rows: int, data: SyntheticData) -> Dict[str, float]:
+    """Value counting as done during validation, the histogram tests, and detect_drift on frames"""
+    domain = np.array([-1, 0, 1])
+    seconds, counts = 0.0, None
+    for frame in data.chunks(rows, with_target=False):
+        matrix = frame.to_numpy()
+        chunk_seconds, chunk_counts = best_of(lambda: value_histograms(matrix, domain))
+        seconds += chunk_seconds
+        counts = chunk_counts if counts is None else counts + chunk_counts
+    base_counts = value_histograms(data.features(min(rows, MODEL_TRAIN_ROWS), chunk_index=7), domain)
+    compare_seconds, _ = best_of(lambda: compare_histograms(data.feature_columns, base_counts, counts, domain))
+
+    frame_rows = min(rows, DRIFT_FRAME_ROWS)
+    base_df = data.frame(frame_rows, chunk_index=8, with_target=False)
+    current_df = data.frame(frame_rows, chunk_index=9, with_target=False)
+    detect_drift_seconds, _ = best_of(lambda: detect_drift(base_df, current_df))
+    return {
+        "histogram_rows_per_second": rows / seconds,
+        "compare_histograms_seconds": compare_seconds,
+        "detect_drift_rows": frame_rows,
+        "detect_drift_seconds": detect_drift_seconds,
+    }
+
+
+def bench_etl(rows: int, data: SyntheticData) -> Dict[str, float]:
+    """
+    COPY load of a synthetic CSV into a scratch table of the configured PostgreSQL, then
+    streaming ingestion of that table into a columnar feature store and the train/test split.
+    The table and its load progress rows are dropped afterwards.
+    """
+    from networksecurity.utils.main_utils.db import get_pool
+    if not get_pool().ping():
+        return {"skipped": "PostgreSQL is unreachable, set POSTGRES_* to a local instance"}
+
+    from push_data import NetworkDataExtract, BULK_LOAD_PROGRESS_TABLE
+    from networksecurity.components.data_ingestion import DataIngestion
+    from networksecurity.entity.config_entity import DataIngestionConfig, TrainingPipelineConfig
+
+    etl_rows = min(rows, ETL_MAX_ROWS)
+    extract = NetworkDataExtract()
+    db_pool = extract.db_pool
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_file_path = data.write_csv(os.path.join(temp_dir, "phishing.csv"), etl_rows)
+        try:
+            with db_pool.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {ETL_TABLE_NAME};")
+            extract.ensure_table_exists(ETL_TABLE_NAME)
+            start = time.perf_counter()
+            extract.bulk_load_csv(csv_file_path, ETL_TABLE_NAME)
+            load_seconds = time.perf_counter() - start
+
+            config = DataIngestionConfig(training_pipeline_config=TrainingPipelineConfig())
+            config.table_name = ETL_TABLE_NAME
+            config.persistent_feature_store_dir = os.path.join(temp_dir, "feature_store")
+            config.training_file_path = os.path.join(temp_dir, "ingested", "train")
+            config.testing_file_path = os.path.join(temp_dir, "ingested", "test")
+            ingestion = DataIngestion(data_ingestion_config=config)
+            start = time.perf_counter()
+            store = ingestion.sync_feature_store()
+            sync_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            ingestion.split_feature_store_as_train_test(store)
+            split_seconds = time.perf_counter() - start
+        finally:
+            with db_pool.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {ETL_TABLE_NAME};")
+                cursor.execute(f"DELETE FROM {BULK_LOAD_PROGRESS_TABLE} WHERE source = %s;",
+                               (os.path.abspath(csv_file_path),))
+    return {
+        "etl_rows": etl_rows,
+        "copy_load_rows_per_second": etl_rows / load_seconds,
+        "ingestion_sync_rows_per_second": etl_rows / sync_seconds,
+        "train_test_split_seconds": split_seconds,
+    }
+
+
+SUITES: Dict[str, Callable[[int, SyntheticData], Dict[str, float]]] = {
+    "predict": bench_predict,
+    "imputer": bench_imputer,
+    "evaluate_models": bench_evaluate_models,
+    "drift": bench_drift,
+    "etl": bench_etl,
+}
@@ -0,0 +1,73 @@
+"""Synthetic phishing feature data shaped by data_schema/schema.yaml"""
+import os
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from networksecurity.utils.main_utils.utils import read_yaml_file
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# rows generated per call, bounds memory whatever the benchmark scale
+CHUNK_ROWS = 1_000_000
+
+
+class SyntheticData:
+    """
+    Deterministic generator of rows that pass data validation.
+
+    Every feature draws from the values the schema's domain allows for it, with
+    per-column probabilities fixed by the seed, and the target is a noisy logistic
+    function of the features, so models have something to learn. Chunk i of a
+    given seed is always the same rows, so any number of rows can be streamed
+    without holding them all.
+    """
+
+    def __init__(self, seed: int = 0, schema_file_path: str = os.path.join(REPO_DIR, SCHEMA_FILE_PATH)):
+        schema = read_yaml_file(schema_file_path)
+        self.seed = seed
+        self.columns: List[str] = [name for column in schema["columns"] for name in column]
+        self.feature_columns: List[str] = [column for column in self.columns if column != TARGET_COLUMN]
+        domain = schema.get("domain") or {}
+        rng = np.random.default_rng(seed)
+        self.values = [np.array((domain.get("columns") or {}).get(column, domain.get("default")), dtype=np.int8)
+                       for column in self.feature_columns]
+        self.probabilities = [rng.dirichlet(np.full(len(values), 2.0)) for values in self.values]
+        self.weights = rng.normal(0.0, 1.0, len(self.feature_columns))
+
+    def features(self, rows: int, chunk_index: int = 0, missing_rate: float = 0.0) -> np.ndarray:
+        """(rows, features) matrix, int8 or float64 with NaN when missing_rate > 0"""
+        rng = np.random.default_rng([self.seed, chunk_index])
+        matrix = np.empty((rows, len(self.feature_columns)), dtype=np.int8)
+        for column, (values, probabilities) in enumerate(zip(self.values, self.probabilities)):
+            matrix[:, column] = rng.choice(values, size=rows, p=probabilities)
+        if missing_rate <= 0:
+            return matrix
+        matrix = matrix.astype(np.float64)
+        matrix[rng.random(matrix.shape) < missing_rate] = np.nan
+        return matrix
+
+    def target(self, features: np.ndarray, chunk_index: int = 0) -> np.ndarray:
+        rng = np.random.default_rng([self.seed, chunk_index, 1])
+        score = np.nan_to_num(np.asarray(features, dtype=np.float64)) @ self.weights
+        probability = 1.0 / (1.0 + np.exp(-score))
+        return np.where(rng.random(len(score)) < probability, 1, -1).astype(np.int8)
+
+    def frame(self, rows: int, chunk_index: int = 0, missing_rate: float = 0.0,
+              with_target: bool = True) -> pd.DataFrame:
+        features = self.features(rows, chunk_index, missing_rate)
+        frame = pd.DataFrame(features, columns=self.feature_columns)
+        if with_target:
+            frame[TARGET_COLUMN] = self.target(features, chunk_index)
+        return frame
+
+    def chunks(self, rows: int, chunk_rows: int = CHUNK_ROWS, **kwargs) -> Iterator[pd.DataFrame]:
+        """rows rows as consecutive frames of at most chunk_rows"""
+        for chunk_index, start in enumerate(range(0, rows, chunk_rows)):
+            yield self.frame(min(chunk_rows, rows - start), chunk_index=chunk_index, **kwargs)
+
+    def write_csv(self, file_path: str, rows: int, **kwargs) -> str:
+        for chunk_index, chunk in enumerate(self.chunks(rows, **kwargs)):
+            chunk.to_csv(file_path, mode="w" if chunk_index == 0 else "a", header=chunk_index == 0, index=False)
+        return file_path
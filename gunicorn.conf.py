@@ -0,0 +1,62 @@
+"""
+Production serving: N uvicorn worker processes behind one gunicorn master.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app is imported and the model loaded once in the master (preload_app), then
+the workers are forked. The model's arrays are memory-mapped from final_model/,
+so every worker reads the same pages of the OS page cache instead of holding its
+own copy, and each worker scores on its own core without sharing a GIL. The
+PostgresPool from get_pool() is created in the master but opens no connections
+there; each worker opens its own pool of DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE
+connections on first use, never sharing the master's sockets. Workers pick up a
+new model through their registry watcher. Probe each worker with /health
+(liveness) and /ready.
+Workers write their metrics to a shared directory, so /metrics answered by any
+worker covers all of them.
+
+WEB_CONCURRENCY, PORT and SERVING_TIMEOUT override the defaults.
+"""
+import gc
+import os
+import sys
+import glob
+import tempfile
+
+from networksecurity.constant.training_pipeline import (
+    SERVING_HOST,
+    SERVING_PORT,
+    SERVING_WORKERS,
+    SERVING_WORKER_TIMEOUT_SECONDS,
+    METRICS_MULTIPROCESS_DIR_ENV_VAR,
+)
+
+bind = f"{SERVING_HOST}:{os.getenv('PORT', SERVING_PORT)}"
+workers = int(os.getenv("WEB_CONCURRENCY", SERVING_WORKERS))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("SERVING_TIMEOUT", SERVING_WORKER_TIMEOUT_SECONDS))
+graceful_timeout = 30
+preload_app = True
+
+# set before the app is imported, so every worker's metrics registry finds it
+metrics_dir = os.environ.setdefault(METRICS_MULTIPROCESS_DIR_ENV_VAR,
+                                    tempfile.mkdtemp(prefix="networksecurity-metrics-"))
+
+
+def on_starting(server):
+    """Counters of a previous server run must not be added to this one"""
+    for file_path in glob.glob(os.path.join(metrics_dir, "*.json")):
+        os.remove(file_path)
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported, before any worker is forked"""
+    app_module = sys.modules.get("app")
+    if app_module is None:
+        return
+    app_module.preload_model()
+    # objects loaded so far are never collected, so the collector does not write
+    # to their pages in every worker and undo the copy-on-write sharing
+    gc.freeze()
+    server.log.info(f"Preloaded model version {app_module.model_registry.version} for {workers} workers")
+
@@ -2,41 +2,31 @@ from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
 from networksecurity.entity.config_entity import DataIngestionConfig
 from networksecurity.entity.artifact_entity import DataIngestionArtifact
+from networksecurity.constant.training_pipeline import SCHEMA_FILE_PATH
+from networksecurity.utils.main_utils.utils import read_yaml_file
+from networksecurity.utils.main_utils.columnar_store import ColumnarStore
+from networksecurity.utils.main_utils.db import get_pool
+from networksecurity.utils.main_utils.profiling import add_rows
 
 import os
 import sys
+import numpy as np
 import pandas as pd
-import psycopg2
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
-from typing import List
+from typing import Iterator, List, Tuple
 from sklearn.model_selection import train_test_split
-from dotenv import load_dotenv
-
-load_dotenv()
-
-POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
-POSTGRES_PORT = int(os.getenv("POSTGRES_PORT", 5432))
-POSTGRES_DB = os.getenv("POSTGRES_DB", "NetworkSecurity")
-POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
-POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "")
-
 
 class DataIngestion:
     def __init__(self, data_ingestion_config: DataIngestionConfig):
         try:
             self.data_ingestion_config = data_ingestion_config
 
-            # Connect to PostgreSQL
-            self.conn = psycopg2.connect(
-                host=POSTGRES_HOST,
-                port=POSTGRES_PORT,
-                database=POSTGRES_DB,
-                user=POSTGRES_USER,
-                password=POSTGRES_PASSWORD,
-                cursor_factory=RealDictCursor
-            )
-            self.cursor = self.conn.cursor()
-            logging.info(" Connected to PostgreSQL successfully.")
+            # connections are checked out of the shared pool per query
+            self.db_pool = get_pool()
+
+            schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+            self.columns: List[str] = [name for column in schema_config["columns"] for name in column]
         except Exception as e:
             raise NetworkSecurityException(e, sys)
 
@@ -46,9 +36,10 @@ class DataIngestion:
             table = self.data_ingestion_config.table_name
             schema = self.data_ingestion_config.schema_name
 
-            query = f"SELECT data FROM {schema}.{table};"
-            self.cursor.execute(query)
-            rows = self.cursor.fetchall()
+            query = f"SELECT data FROM {schema}.{table} ORDER BY id;"
+            with self.db_pool.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(query)
+                rows = cursor.fetchall()
 
             dataframe = pd.json_normalize([row['data'] for row in rows])
             logging.info(" Exported PostgreSQL table to DataFrame successfully.")
@@ -56,6 +47,142 @@ class DataIngestion:
         except Exception as e:
             raise NetworkSecurityException(e, sys)
 
+    @staticmethod
+    def rows_to_dataframe(rows: List[tuple], columns: List[str]) -> pd.DataFrame:
+        """Turn fetched tuples into int8 columns, columns holding NULLs stay float32 with NaN"""
+        values = np.array(rows, dtype=np.float32).reshape(len(rows), len(columns))
+        has_null = np.isnan(values).any(axis=0)
+        return pd.DataFrame({
+            column: values[:, i] if has_null[i] else values[:, i].astype(np.int8)
+            for i, column in enumerate(columns)
+        })
+
+    def export_table_in_chunks(self, after_id: int = 0) -> Iterator[Tuple[np.ndarray, pd.DataFrame]]:
+        """
+        Stream the rows with id > after_id in id order through a named (server-side) cursor,
+        chunk_size rows at a time, yielding (ids of the chunk, chunk).
+        Each JSONB key is extracted and cast to smallint by PostgreSQL, so no Python dicts are built.
+        """
+        try:
+            chunk_size = self.data_ingestion_config.chunk_size
+            query = sql.SQL("SELECT id, {fields} FROM {schema}.{table} WHERE id > %s ORDER BY id").format(
+                fields=sql.SQL(", ").join(
+                    sql.SQL("(data->>{})::smallint").format(sql.Literal(column)) for column in self.columns
+                ),
+                schema=sql.Identifier(self.data_ingestion_config.schema_name),
+                table=sql.Identifier(self.data_ingestion_config.table_name),
+            )
+            # the connection stays checked out until the named cursor is exhausted
+            with self.db_pool.connection() as conn, conn.cursor(name="data_ingestion_export") as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(query, (after_id,))
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    ids = np.array([row[0] for row in rows], dtype=np.int64)
+                    yield ids, self.rows_to_dataframe([row[1:] for row in rows], self.columns)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def transaction_horizon(self) -> Tuple[int, int]:
+        """(xmin, xmax) of a fresh snapshot: transactions below xmin have all ended, any running one is below xmax"""
+        with self.db_pool.cursor() as cursor:
+            cursor.execute("SELECT pg_snapshot_xmin(s)::text::bigint, pg_snapshot_xmax(s)::text::bigint "
+                           "FROM pg_current_snapshot() s;")
+            xmin, xmax = cursor.fetchone()
+            return int(xmin), int(xmax)
+
+    @staticmethod
+    def in_pending(ids: np.ndarray, pending: List[list]) -> np.ndarray:
+        """Which ids fall in one of the pending [first, last, xmax] id ranges"""
+        if not pending or not len(ids):
+            return np.zeros(len(ids), dtype=bool)
+        firsts = np.array([first for first, _, _ in pending], dtype=np.int64)
+        lasts = np.array([last for _, last, _ in pending], dtype=np.int64)
+        index = np.searchsorted(firsts, ids, side="right") - 1
+        return (index >= 0) & (ids <= lasts[np.maximum(index, 0)])
+
+    @staticmethod
+    def remove_from_pending(pending: List[list], ids: np.ndarray) -> List[list]:
+        """pending id ranges without the (sorted) ids, ranges are split around them"""
+        remaining = []
+        for first, last, xmax in pending:
+            start = first
+            for id_ in ids[np.searchsorted(ids, first):np.searchsorted(ids, last, side="right")]:
+                if id_ > start:
+                    remaining.append([start, int(id_) - 1, xmax])
+                start = int(id_) + 1
+            if start <= last:
+                remaining.append([start, last, xmax])
+        return remaining
+
+    def sync_feature_store(self) -> ColumnarStore:
+        """
+        Append the rows added to the table since the last run to the persistent feature store.
+
+        The table is append-only with a SERIAL id, but ids do not become visible in order:
+        concurrent transactions (e.g. the parallel COPY batches of push_data.bulk_load_csv)
+        commit out of order. Ids skipped below the high-water mark are kept as pending
+        ranges, each with the xmax of a snapshot taken after it was seen missing. Every
+        sync re-reads from the lowest pending id and keeps the rows that fill a pending id.
+        A range is dropped once the snapshot xmin passes its xmax: all transactions that
+        could have written it have ended, so it was a rollback or a sequence gap.
+        """
+        try:
+            store = ColumnarStore(self.data_ingestion_config.persistent_feature_store_dir)
+            store.create(self.columns, metadata={"high_water_mark": 0, "pending_ids": []})
+            metadata = store.metadata
+            high_water_mark = metadata["high_water_mark"]
+            pending = metadata.get("pending_ids", [])
+            # taken before the export, so no writer of a pending id that is still missing can have ended unseen
+            horizon_xmin, _ = self.transaction_horizon()
+            after_id = min([high_water_mark] + [first - 1 for first, _, _ in pending])
+            no_of_rows = 0
+            for ids, chunk in self.export_table_in_chunks(after_id=after_id):
+                new = ids > high_water_mark
+                filled = ~new & self.in_pending(ids, pending)
+                pending = self.remove_from_pending(pending, ids[filled])
+                # ids skipped between the rows above the mark may still be committed by running transactions
+                new_ids = ids[new]
+                if len(new_ids):
+                    _, horizon_xmax = self.transaction_horizon()
+                    bounds = np.concatenate([[high_water_mark], new_ids])
+                    gaps = np.flatnonzero(np.diff(bounds) > 1)
+                    pending += [[int(bounds[i]) + 1, int(bounds[i + 1]) - 1, horizon_xmax] for i in gaps]
+                    high_water_mark = int(new_ids[-1])
+                keep = new | filled
+                # the mark and pending ids are committed together with the rows,
+                # an interrupted sync resumes after the last chunk
+                store.append(chunk[keep].reset_index(drop=True),
+                             metadata={"high_water_mark": high_water_mark, "pending_ids": pending})
+                no_of_rows += int(keep.sum())
+            pending = [gap for gap in pending if gap[2] > horizon_xmin]
+            store.append({column: [] for column in self.columns}, metadata={"pending_ids": pending})
+            logging.info(f" Ingested {no_of_rows} new rows after id {after_id}, "
+                         f"feature store holds {store.num_rows} rows, {len(pending)} id ranges pending.")
+            if store.num_rows == 0:
+                raise Exception(f"Table {self.data_ingestion_config.table_name} is empty")
+            return store
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def split_feature_store_as_train_test(self, store: ColumnarStore):
+        """Split the feature store into train and test columnar stores, copying stored values as they are"""
+        try:
+            # same proportions as train_test_split: the test set gets ceil(ratio * n) rows
+            permutation = np.random.default_rng(
+                self.data_ingestion_config.split_random_state).permutation(store.num_rows)
+            no_of_test_rows = int(np.ceil(self.data_ingestion_config.train_test_split_ratio * store.num_rows))
+            chunk_size = self.data_ingestion_config.chunk_size
+            store.subset(self.data_ingestion_config.testing_file_path,
+                         np.sort(permutation[:no_of_test_rows]), chunk_size=chunk_size)
+            store.subset(self.data_ingestion_config.training_file_path,
+                         np.sort(permutation[no_of_test_rows:]), chunk_size=chunk_size)
+            logging.info(" Exported train and test columnar stores successfully.")
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
     def export_data_into_feature_store(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         """Save the full dataframe to feature store CSV"""
         try:
@@ -68,31 +195,35 @@ class DataIngestion:
             raise NetworkSecurityException(e, sys)
 
     def split_data_as_train_test(self, dataframe: pd.DataFrame):
-        """Split the dataframe into train and test CSV files"""
+        """Split the dataframe into train and test columnar stores"""
         try:
             train_set, test_set = train_test_split(
-                dataframe, test_size=self.data_ingestion_config.train_test_split_ratio
+                dataframe, test_size=self.data_ingestion_config.train_test_split_ratio,
+                random_state=self.data_ingestion_config.split_random_state
             )
             logging.info(" Performed train-test split on the dataframe.")
 
-            # Ensure directories exist
-            os.makedirs(os.path.dirname(self.data_ingestion_config.training_file_path), exist_ok=True)
-            os.makedirs(os.path.dirname(self.data_ingestion_config.testing_file_path), exist_ok=True)
-
-            # Save CSVs
-            train_set.to_csv(self.data_ingestion_config.training_file_path, index=False, header=True)
-            test_set.to_csv(self.data_ingestion_config.testing_file_path, index=False, header=True)
-            logging.info(" Exported train and test CSV files successfully.")
+            ColumnarStore.write(self.data_ingestion_config.training_file_path, train_set,
+                                columns=self.columns, default_dtype="int8")
+            ColumnarStore.write(self.data_ingestion_config.testing_file_path, test_set,
+                                columns=self.columns, default_dtype="int8")
+            logging.info(" Exported train and test columnar stores successfully.")
 
         except Exception as e:
             raise NetworkSecurityException(e, sys)
 
     def initiate_data_ingestion(self) -> DataIngestionArtifact:
-        """Full pipeline: PostgreSQL table -> feature store -> train/test CSV"""
+        """Full pipeline: PostgreSQL table -> feature store -> train/test columnar stores"""
         try:
-            dataframe = self.export_table_as_dataframe()
-            dataframe = self.export_data_into_feature_store(dataframe)
-            self.split_data_as_train_test(dataframe)
+            if self.data_ingestion_config.streaming:
+                store = self.sync_feature_store()
+                self.split_feature_store_as_train_test(store)
+                add_rows(store.num_rows)
+            else:
+                dataframe = self.export_table_as_dataframe()
+                dataframe = self.export_data_into_feature_store(dataframe)
+                self.split_data_as_train_test(dataframe)
+                add_rows(len(dataframe))
 
             artifact = DataIngestionArtifact(
                 trained_file_path=self.data_ingestion_config.training_file_path,
@@ -101,6 +232,3 @@ class DataIngestion:
             return artifact
         except Exception as e:
             raise NetworkSecurityException(e, sys)
-        finally:
-            self.cursor.close()
-            self.conn.close()
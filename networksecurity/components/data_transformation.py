@@ -1,10 +1,12 @@
 import os,sys
+import json
 import numpy as np
 import pandas as pd
 from sklearn.impute import KNNImputer
 from sklearn.pipeline import Pipeline
 
-from networksecurity.constant.training_pipeline import TARGET_COLUMN,DATA_TRANSFORMATION_IMPUTER_PARAMS
+from networksecurity.constant.training_pipeline import (TARGET_COLUMN,DATA_TRANSFORMATION_IMPUTER_PARAMS,
+                                                       DATA_TRANSFORMATION_IMPUTER_ENGINE)
 from networksecurity.entity.artifact_entity import (
     DataTransformationArtifact,
     DataValidationArtifact
@@ -12,6 +14,11 @@ from networksecurity.entity.artifact_entity import (
 
 from networksecurity.entity.config_entity import DataTransformationConfig
 from networksecurity.utils.main_utils.utils import save_numpy_array_data,save_object
+from networksecurity.utils.main_utils.columnar_store import read_table
+from networksecurity.utils.ml_utils.imputer.ternary_knn_imputer import TernaryKNNImputer
+from networksecurity.utils.ml_utils.metric.drift import histogram_snapshot
+from networksecurity.pipeline.dag import TaskGraph
+from networksecurity.utils.main_utils.profiling import add_rows
 
 from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
@@ -29,7 +36,7 @@ class DataTransformation :
     @staticmethod
     def  read_data(file_path:str)->pd.DataFrame :
         try:
-            return pd.read_csv(file_path)
+            return read_table(file_path)
         except Exception as e:
             raise NetworkSecurityException(e, sys)
     
@@ -37,6 +44,8 @@ class DataTransformation :
         """
         It initialises a KNNImputer object with the parameters specified in the training_pipeline.py file
         and returns a Pipeline object with the KNNImputer object as the first step.
+        With DATA_TRANSFORMATION_IMPUTER_ENGINE set to "ternary" the step is a TernaryKNNImputer
+        with the same n_neighbors instead.
 
         Args:
           cls: DataTransformation
@@ -46,51 +55,73 @@ class DataTransformation :
         """
         logging.info("Entered get_data_trnasformer_object method of Trnasformation class")
         try:
-           imputer:KNNImputer=KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS) # take it as key value pair
+           if DATA_TRANSFORMATION_IMPUTER_ENGINE == "ternary":
+               imputer=TernaryKNNImputer(n_neighbors=DATA_TRANSFORMATION_IMPUTER_PARAMS["n_neighbors"])
+           else:
+               imputer:KNNImputer=KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS) # take it as key value pair
            logging.info(
-                f"Initialise KNNImputer with {DATA_TRANSFORMATION_IMPUTER_PARAMS}"
+                f"Initialise {type(imputer).__name__} with {DATA_TRANSFORMATION_IMPUTER_PARAMS}"
             )
            processor:Pipeline=Pipeline([("imputer",imputer)])
            return processor
         except Exception as e:
             raise NetworkSecurityException(e,sys)
 
+    @staticmethod
+    def split_features(df:pd.DataFrame):
+        """Input features and the target with -1 mapped to 0"""
+        return df.drop(columns={TARGET_COLUMN},axis=1),df[TARGET_COLUMN].replace(-1,0)
+
+    @staticmethod
+    def transform_split(preprocessor_object:Pipeline,df:pd.DataFrame)->np.ndarray:
+        input_feature_df,target_feature_df=DataTransformation.split_features(df)
+        return np.c_[preprocessor_object.transform(input_feature_df),np.array(target_feature_df)]
+
+    def save_drift_baseline(self,train_df:pd.DataFrame)->str:
+        file_path=self.data_transformation_config.drift_baseline_file_path
+        os.makedirs(os.path.dirname(file_path),exist_ok=True)
+        with open(file_path,"w") as baseline_file:
+            json.dump(histogram_snapshot(DataTransformation.split_features(train_df)[0]),baseline_file)
+        return file_path
+
     def initiate_data_transformation(self)->DataTransformationArtifact :
         logging.info("Entered initiate_data_transformartion method of DataTransformation class")  
         try:
             logging.info("starting data transformation")
-            train_df=DataTransformation.read_data(self.data_validation_artifact.valid_train_file_path)
-            test_df=DataTransformation.read_data(self.data_validation_artifact.valid_test_file_path)
-
-
-            #training df
-            input_feature_train_df=train_df.drop(columns={TARGET_COLUMN},axis=1)
-            target_feature_train_df=train_df[TARGET_COLUMN]
-            target_feature_train_df=target_feature_train_df.replace(-1,0)
-            #test df
-            input_feature_test_df=test_df.drop(columns={TARGET_COLUMN},axis=1)
-            target_feature_test_df=test_df[TARGET_COLUMN]
-            target_feature_test_df=target_feature_test_df.replace(-1,0)
-
-            preprocessor=self.get_data_transformer_object()
-            preprocessor_object=preprocessor.fit(input_feature_train_df)
-            transformed_input_train_feature=preprocessor_object.transform(input_feature_train_df)
-            transformed_input_test_feature=preprocessor_object.transform(input_feature_test_df)
-
-            train_arr=np.c_[transformed_input_train_feature,np.array(target_feature_train_df)]
-            test_arr=np.c_[transformed_input_test_feature,np.array(target_feature_test_df)]
-
+            config=self.data_transformation_config
+            # the splits are read, transformed and saved concurrently, only the fit waits for train
+            graph=TaskGraph("data_transformation")
+            graph.add("train_df",lambda train_file_path:DataTransformation.read_data(train_file_path),
+                      inputs=["train_file_path"])
+            graph.add("test_df",lambda test_file_path:DataTransformation.read_data(test_file_path),
+                      inputs=["test_file_path"])
+            graph.add("preprocessor_object",
+                      lambda train_df:self.get_data_transformer_object().fit(DataTransformation.split_features(train_df)[0]),
+                      inputs=["train_df"])
+            graph.add("train_arr",lambda preprocessor_object,train_df:DataTransformation.transform_split(preprocessor_object,train_df),
+                      inputs=["preprocessor_object","train_df"])
+            graph.add("test_arr",lambda preprocessor_object,test_df:DataTransformation.transform_split(preprocessor_object,test_df),
+                      inputs=["preprocessor_object","test_df"])
             #save numpy array data
-            save_object(self.data_transformation_config.transformed_object_file_path,preprocessor_object)
-            save_numpy_array_data(self.data_transformation_config.transformed_train_file_path,array=train_arr)
-            save_numpy_array_data(self.data_transformation_config.transformed_test_file_path,array=test_arr)
-            save_object("final_model/preprocessor.pkl",preprocessor_object)
+            graph.add("save_preprocessor",lambda preprocessor_object:save_object(config.transformed_object_file_path,preprocessor_object),
+                      inputs=["preprocessor_object"])
+            graph.add("save_train_arr",lambda train_arr:save_numpy_array_data(config.transformed_train_file_path,array=train_arr),
+                      inputs=["train_arr"])
+            graph.add("save_test_arr",lambda test_arr:save_numpy_array_data(config.transformed_test_file_path,array=test_arr),
+                      inputs=["test_arr"])
+            # raw training feature counts, served drift is measured against them
+            graph.add("drift_baseline",self.save_drift_baseline,inputs=["train_df"])
+            results=graph.run(train_file_path=self.data_validation_artifact.valid_train_file_path,
+                              test_file_path=self.data_validation_artifact.valid_test_file_path)
+
+            add_rows(len(results["train_arr"])+len(results["test_arr"]))
             #preparing artifacts
 
             data_trasnformation_artifact=DataTransformationArtifact(
                 transformed_object_file_path=self.data_transformation_config.transformed_object_file_path,
                 transformed_train_file_path=self.data_transformation_config.transformed_train_file_path,
-                transformed_test_file_path=self.data_transformation_config.transformed_test_file_path
+                transformed_test_file_path=self.data_transformation_config.transformed_test_file_path,
+                drift_baseline_file_path=self.data_transformation_config.drift_baseline_file_path
             )
             return data_trasnformation_artifact
 
@@ -4,9 +4,13 @@ from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.constant.training_pipeline import SCHEMA_FILE_PATH
 from networksecurity.logging.logger import logging
 from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file
-from scipy.stats import ks_2samp
+from networksecurity.utils.main_utils.columnar_store import ColumnarStore
+from networksecurity.utils.ml_utils.metric.drift import compare_histograms, value_histograms
+from networksecurity.pipeline.dag import TaskGraph
+from networksecurity.utils.main_utils.profiling import add_rows
+import numpy as np
 import pandas as pd
-import os, sys
+import os, sys, shutil
 
 
 class DataValidation:
@@ -21,9 +25,126 @@ class DataValidation:
             raise NetworkSecurityException(e, sys)
 
     @staticmethod
-    def read_data(file_path: str) -> pd.DataFrame:
+    def read_header(file_path: str) -> pd.DataFrame:
+        """Empty DataFrame with the columns of a columnar store or CSV file"""
         try:
-            return pd.read_csv(file_path)
+            store = ColumnarStore(file_path)
+            if store.exists():
+                return pd.DataFrame(columns=store.columns)
+            return pd.read_csv(file_path, nrows=0)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def get_domain_rules(self) -> dict:
+        """
+        Lookup tables for the domain section of the schema: the union of all allowed
+        values, which of them every column accepts, and which columns accept nulls.
+        Columns without allowed values (and no default) accept any integer.
+        """
+        try:
+            columns = [name for column in self.schema_config["columns"] for name in column]
+            domain_config = self.schema_config.get("domain") or {}
+            allowed = {column: (domain_config.get("columns") or {}).get(column, domain_config.get("default"))
+                       for column in columns}
+            domain = np.unique([value for values in allowed.values() if values for value in values])
+            domain = domain.astype(np.float64)
+            return {
+                "columns": columns,
+                "domain": domain,
+                "allowed": np.array([np.isin(domain, allowed[column] or []) for column in columns],
+                                    dtype=bool).reshape(len(columns), len(domain)),
+                "unrestricted": np.array([not allowed[column] for column in columns]),
+                "nullable": np.array([column not in (domain_config.get("not_nullable") or [])
+                                      for column in columns]),
+            }
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @staticmethod
+    def iter_chunks(file_path: str, columns: list, chunk_size: int):
+        """
+        Yield (float matrix with NaN for nulls, mask of non-numeric cells) chunk by chunk.
+        Columnar stores are sliced from their memory maps, CSV files are parsed chunk_size rows at a time.
+        """
+        store = ColumnarStore(file_path)
+        if store.exists():
+            for start in range(0, store.num_rows, chunk_size):
+                matrix = store.to_numpy(columns, rows=slice(start, start + chunk_size))
+                yield matrix, np.zeros(matrix.shape, dtype=bool)
+        else:
+            for chunk in pd.read_csv(file_path, chunksize=chunk_size):
+                chunk = chunk[columns]
+                numeric = chunk.apply(pd.to_numeric, errors="coerce")
+                yield numeric.to_numpy(dtype=np.float64), numeric.isna().to_numpy() & chunk.notna().to_numpy()
+
+    @staticmethod
+    def check_chunk(matrix: np.ndarray, not_numeric: np.ndarray, rules: dict, counters: dict) -> np.ndarray:
+        """Apply every rule to all cells of the chunk at once, add the rejected cells per column to counters
+        and return the mask of rows breaking at least one rule"""
+        domain = rules["domain"]
+        present = ~np.isnan(matrix)
+        not_integer = present & (matrix != np.round(matrix))
+        if len(domain):
+            codes = np.clip(np.searchsorted(domain, matrix), 0, len(domain) - 1)
+            in_domain = (domain[codes] == matrix) & rules["allowed"][np.arange(matrix.shape[1]), codes]
+        else:
+            in_domain = np.zeros(matrix.shape, dtype=bool)
+        violations = {
+            "not_numeric": not_numeric,
+            "not_integer": not_integer,
+            "out_of_domain": present & ~not_integer & ~in_domain & ~rules["unrestricted"],
+            "null_not_allowed": ~present & ~not_numeric & ~rules["nullable"],
+        }
+        bad_rows = np.zeros(len(matrix), dtype=bool)
+        for rule, mask in violations.items():
+            counters[rule] += mask.sum(axis=0)
+            bad_rows |= mask.any(axis=1)
+        return bad_rows
+
+    def validate_file(self, file_path: str, valid_file_path: str, invalid_file_path: str, rules: dict) -> dict:
+        """
+        One pass over the input: good rows go to the valid store, rows breaking a rule to the
+        invalid store (float64, so rejected values are kept as they were). Also counts the
+        values of the good rows, which the drift check uses without reading the data again.
+        """
+        try:
+            columns = rules["columns"]
+            source = ColumnarStore(file_path)
+            dtypes = source.manifest["dtypes"] if source.exists() else None
+            valid_store = ColumnarStore(valid_file_path).create(columns, dtypes=dtypes, default_dtype="int8",
+                                                                overwrite=True)
+            invalid_store = ColumnarStore(invalid_file_path)
+            if os.path.exists(invalid_file_path):
+                shutil.rmtree(invalid_file_path)
+
+            counters = {rule: np.zeros(len(columns), dtype=np.int64)
+                        for rule in ("not_numeric", "not_integer", "out_of_domain", "null_not_allowed")}
+            histograms = np.zeros((len(columns), len(rules["domain"])), dtype=np.int64)
+            no_of_rows = no_of_invalid_rows = 0
+            for matrix, not_numeric in self.iter_chunks(file_path, columns, self.data_validation_config.chunk_size):
+                bad_rows = self.check_chunk(matrix, not_numeric, rules, counters)
+                good = matrix[~bad_rows]
+                valid_store.append(dict(zip(columns, good.T)))
+                histograms += value_histograms(good, rules["domain"])
+                if bad_rows.any():
+                    if not invalid_store.exists():
+                        invalid_store.create(columns, default_dtype="float64")
+                    invalid_store.append(dict(zip(columns, matrix[bad_rows].T)))
+                no_of_rows += len(matrix)
+                no_of_invalid_rows += int(bad_rows.sum())
+
+            if no_of_invalid_rows:
+                logging.warning(f"Quarantined {no_of_invalid_rows} of {no_of_rows} rows of {file_path} "
+                                f"to {invalid_file_path}")
+            return {
+                "rows": no_of_rows,
+                "valid_rows": no_of_rows - no_of_invalid_rows,
+                "invalid_rows": no_of_invalid_rows,
+                "invalid_file_path": invalid_file_path if invalid_store.exists() else None,
+                "rules": {rule: {column: int(count) for column, count in zip(columns, counts) if count}
+                          for rule, counts in counters.items()},
+                "histograms": histograms,
+            }
         except Exception as e:
             raise NetworkSecurityException(e, sys)
 
@@ -47,43 +168,20 @@ class DataValidation:
         except Exception as e:
             raise NetworkSecurityException(e, sys)
 
-    def detect_dataset_drift(self, base_df, current_df, threshold=0.05) -> bool:
-        try:
-            status = True
-            report = {}
-            for column in base_df.columns:
-                d1 = base_df[column]
-                d2 = current_df[column]
-                is_same_dist = ks_2samp(d1, d2)
-
-                drift_found = is_same_dist.pvalue < threshold
-                if drift_found:
-                    status = False
-
-                report.update({
-                    column: {
-                        "p_value": float(is_same_dist.pvalue),
-                        "drift_detected": drift_found
-                    }
-                })
-
-            drift_report_file_path = self.data_validation_config.drift_report_file_path
-            dir_path = os.path.dirname(drift_report_file_path)
-            os.makedirs(dir_path, exist_ok=True)
-
-            write_yaml_file(file_path=drift_report_file_path, content=report)
-
-            return status
-        except Exception as e:
-            raise NetworkSecurityException(e, sys)
+    def write_drift_report(self, report: dict):
+        drift_report_file_path = self.data_validation_config.drift_report_file_path
+        dir_path = os.path.dirname(drift_report_file_path)
+        os.makedirs(dir_path, exist_ok=True)
+
+        write_yaml_file(file_path=drift_report_file_path, content=report)
 
     def initiate_data_validation(self) -> DataValidationArtifact:
         try:
             train_file_path = self.data_ingestion_artifact.trained_file_path
             test_file_path = self.data_ingestion_artifact.test_file_path
 
-            train_df = self.read_data(train_file_path)
-            test_df = self.read_data(test_file_path)
+            train_df = self.read_header(train_file_path)
+            test_df = self.read_header(test_file_path)
 
             error_message = ""
 
@@ -100,24 +198,40 @@ class DataValidation:
             if error_message:
                 raise Exception(error_message)
 
-            logging.info("Data validation completed successfully.")
-
-            # check drift
-            status = self.detect_dataset_drift(base_df=train_df, current_df=test_df)
+            # check every row against the schema domain, keeping good rows and quarantining bad ones
+            # the two splits are validated concurrently, the chunk checks are NumPy and release the GIL
+            rules = self.get_domain_rules()
+            config = self.data_validation_config
+            graph = TaskGraph("data_validation")
+            graph.add("train_result", lambda: self.validate_file(train_file_path, config.valid_train_file_path,
+                                                                 config.invalid_train_file_path, rules))
+            graph.add("test_result", lambda: self.validate_file(test_file_path, config.valid_test_file_path,
+                                                                config.invalid_test_file_path, rules))
+            results = graph.run()
+            train_result, test_result = results["train_result"], results["test_result"]
+            add_rows(train_result["rows"] + test_result["rows"])
+            write_yaml_file(
+                file_path=self.data_validation_config.validation_report_file_path,
+                content={name: {key: value for key, value in result.items() if key != "histograms"}
+                         for name, result in (("train", train_result), ("test", test_result))},
+                replace=True
+            )
+            if not train_result["valid_rows"] or not test_result["valid_rows"]:
+                raise Exception(f"No valid rows left, see {self.data_validation_config.validation_report_file_path}")
 
-            # save validated train and test data
-            os.makedirs(os.path.dirname(self.data_validation_config.valid_train_file_path), exist_ok=True)
-            train_df.to_csv(self.data_validation_config.valid_train_file_path, index=False, header=True)
+            logging.info("Data validation completed successfully.")
 
-            os.makedirs(os.path.dirname(self.data_validation_config.valid_test_file_path), exist_ok=True)
-            test_df.to_csv(self.data_validation_config.valid_test_file_path, index=False, header=True)
+            # check drift on the value counts collected while validating
+            status, report = compare_histograms(rules["columns"], train_result["histograms"],
+                                                test_result["histograms"], rules["domain"])
+            self.write_drift_report(report)
 
             data_validation_artifact = DataValidationArtifact(
                 validation_status=status,
-                valid_train_file_path=self.data_ingestion_artifact.trained_file_path,
-                valid_test_file_path=self.data_ingestion_artifact.test_file_path,
-                invalid_train_file_path=None,
-                invalid_test_file_path=None,
+                valid_train_file_path=self.data_validation_config.valid_train_file_path,
+                valid_test_file_path=self.data_validation_config.valid_test_file_path,
+                invalid_train_file_path=train_result["invalid_file_path"],
+                invalid_test_file_path=test_result["invalid_file_path"],
                 drift_report_file_path=self.data_validation_config.drift_report_file_path
             )
 
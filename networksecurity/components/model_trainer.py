@@ -9,10 +9,15 @@ from networksecurity.entity.config_entity import ModelTrainerConfig
 
 
 
+from networksecurity.constant.training_pipeline import MODEL_TRAINER_COMPILE_MODEL
 from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.model.registry import publish_model
+from networksecurity.utils.ml_utils.model.compiled import CompiledModel,check_parity
 from networksecurity.utils.main_utils.utils import save_object,load_object
 from networksecurity.utils.main_utils.utils import load_numpy_array_data,evaluate_models
 from networksecurity.utils.ml_utils.metric.classification_metric import get_classification_score
+from networksecurity.pipeline.dag import TaskGraph
+from networksecurity.utils.main_utils.profiling import add_rows
 
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import r2_score
@@ -23,6 +28,7 @@ from sklearn.ensemble import (
     GradientBoostingClassifier,
     RandomForestClassifier,
 )
+import numpy as np
 import mlflow
 from urllib.parse import urlparse
 
@@ -72,7 +78,30 @@ class ModelTrainer:
             #     mlflow.sklearn.log_model(best_model, "model")
 
 
-        
+
+    def compile_model(self,preprocessor,model,x):
+        """
+        Flatten preprocessor and model into a CompiledModel and check it predicts exactly
+        like NetworkModel on x. Returns None when the model cannot be compiled or disagrees.
+        """
+        try:
+            compiled=CompiledModel.compile(preprocessor,model)
+            if not check_parity(NetworkModel(preprocessor=preprocessor,model=model),compiled,x):
+                logging.warning("Compiled model failed the parity check, serving the sklearn model")
+                return None
+            return compiled
+        except NetworkSecurityException as e:
+            logging.warning(f"Model not compiled: {e}")
+            return None
+
+    @staticmethod
+    def publish_final_model(network_model:NetworkModel,drift_baseline_file_path:str=None)->None:
+        """Publish the preprocessor, model, compiled model and drift baseline to final_model/ as one release"""
+        try:
+            publish_model(network_model,drift_baseline_file_path)
+        except Exception as e:
+            raise NetworkSecurityException(e,sys)
+
     def train_model(self,X_train,y_train,x_test,y_test):
         models = {
                 "Random Forest": RandomForestClassifier(verbose=1),
@@ -120,29 +149,36 @@ class ModelTrainer:
             list(model_report.values()).index(best_model_score)
         ]
         best_model = models[best_model_name]
-        y_train_pred=best_model.predict(X_train)
 
-        classification_train_metric=get_classification_score(y_true=y_train,y_pred=y_train_pred)
-        
+        # train and test metrics, loading the preprocessor and compiling the model are independent
+        graph=TaskGraph("model_trainer")
+        graph.add("classification_train_metric",
+                  lambda:get_classification_score(y_true=y_train,y_pred=best_model.predict(X_train)))
         # Track the experiements with mlflow
         # self.track_mlflow(best_model,classification_train_metric)
-
-
-        y_test_pred=best_model.predict(x_test)
-        classification_test_metric=get_classification_score(y_true=y_test,y_pred=y_test_pred)
-
+        graph.add("classification_test_metric",
+                  lambda:get_classification_score(y_true=y_test,y_pred=best_model.predict(x_test)))
         # self.track_mlflow(best_model,classification_test_metric)
+        graph.add("preprocessor",
+                  lambda:load_object(file_path=self.data_transformation_artifact.transformed_object_file_path))
+        graph.add("compiled_model",
+                  lambda preprocessor:self.compile_model(preprocessor,best_model,np.r_[X_train,x_test])
+                  if MODEL_TRAINER_COMPILE_MODEL else None,
+                  inputs=["preprocessor"])
+        results=graph.run()
+        classification_train_metric=results["classification_train_metric"]
+        classification_test_metric=results["classification_test_metric"]
+        preprocessor=results["preprocessor"]
+        compiled_model=results["compiled_model"]
 
-        preprocessor = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
-            
         model_dir_path = os.path.dirname(self.model_trainer_config.trained_model_file_path)
         os.makedirs(model_dir_path,exist_ok=True)
 
-        Network_Model=NetworkModel(preprocessor=preprocessor,model=best_model)
-        save_object(self.model_trainer_config.trained_model_file_path,obj=NetworkModel)
+        Network_Model=NetworkModel(preprocessor=preprocessor,model=best_model,compiled=compiled_model)
+        save_object(self.model_trainer_config.trained_model_file_path,obj=Network_Model)
         #model pusher
-        save_object("final_model/model.pkl",best_model)
-        
+        self.publish_final_model(Network_Model,self.data_transformation_artifact.drift_baseline_file_path)
+
 
         ## Model Trainer Artifact
         model_trainer_artifact=ModelTrainerArtifact(trained_model_file_path=self.model_trainer_config.trained_model_file_path,
@@ -169,6 +205,7 @@ class ModelTrainer:
                 test_arr[:, -1],
             )
 
+            add_rows(len(train_arr)+len(test_arr))
             model_trainer_artifact=self.train_model(x_train,y_train,x_test,y_test)
             return model_trainer_artifact
 
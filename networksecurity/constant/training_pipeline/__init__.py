@@ -12,10 +12,30 @@ FILE_NAME: str = "phishingData.csv"
 TRAIN_FILE_NAME: str = "train.csv"
 TEST_FILE_NAME: str = "test.csv"
 
+# ingested and validated splits are columnar stores (directories of int8 column files)
+TRAIN_STORE_NAME: str = "train"
+TEST_STORE_NAME: str = "test"
+
 SCHEMA_FILE_PATH = os.path.join("data_schema", "schema.yaml")
 SAVED_MODEL_DIR = os.path.join("saved_models")
 MODEL_FILE_NAME = "model.pkl"
 
+# validation, transformation and training are skipped when a previous run saw the same data, schema,
+# stage constants and component source; their artifacts are looked up by that hash in STAGE_CACHE_DIR
+TRAINING_PIPELINE_STAGE_CACHE: bool = True
+STAGE_CACHE_DIR: str = os.path.join(ARTIFACT_DIR, "stage_cache")
+
+# independent steps of the training pipeline run concurrently on this many workers
+DAG_MAX_WORKERS: int = os.cpu_count() or 1
+
+# wall time, CPU time, peak RSS and rows of every stage and searched model, with the task graph
+# timings, go to <artifact dir>/run_report.json. Setting the env var to "cprofile", "tracemalloc"
+# or "cprofile,tracemalloc" also profiles each stage, .prof dumps are written to <artifact dir>/profiles
+PIPELINE_RUN_REPORT_FILE_NAME: str = "run_report.json"
+PIPELINE_PROFILE_ENV_VAR: str = "NETWORKSECURITY_PROFILE"
+PIPELINE_PROFILE_DIR_NAME: str = "profiles"
+PIPELINE_PROFILE_TOP_N: int = 25
+
 
 """
 Data Ingestion related constant start with DATA_INGESTION VAR NAME
@@ -30,8 +50,15 @@ DATA_INGESTION_DIR_NAME: str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR: str = "feature_store"
 DATA_INGESTION_INGESTED_DIR: str = "ingested"
 
-# Train-test split
+# Train-test split, seeded so unchanged data gives identical splits and the later stages can be reused
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO: float = 0.2
+DATA_INGESTION_SPLIT_RANDOM_STATE: int = 42
+
+# Streaming export: only rows newer than the last ingested id are read, through a
+# server-side cursor chunk by chunk, and appended to the persistent feature store
+DATA_INGESTION_STREAMING: bool = True
+DATA_INGESTION_PERSISTENT_FEATURE_STORE_DIR: str = os.path.join(ARTIFACT_DIR, "feature_store")
+DATA_INGESTION_CHUNK_SIZE: int = 10000
 
 
 """
@@ -42,6 +69,15 @@ DATA_VALIDATION_VALID_DIR: str = "validated"
 DATA_VALIDATION_INVALID_DIR: str = "invalid"
 DATA_VALIDATION_DRIFT_REPORT_DIR: str = "drift_report"
 DATA_VALIDATION_DRIFT_REPORT_FILE_NAME: str = "report.yaml"
+# rows per chunk checked against the schema domain, and the per rule counts of rejected values
+DATA_VALIDATION_CHUNK_SIZE: int = 100000
+DATA_VALIDATION_REPORT_FILE_NAME: str = "validation_report.yaml"
+# every column gets a KS test, "chi2", "psi" and "js" can be added; a column drifted if any test flags it
+DATA_VALIDATION_DRIFT_EXTRA_TESTS: list = []
+# p-value below (ks, chi2) or score above (psi, js distance) which a column has drifted
+DATA_VALIDATION_DRIFT_THRESHOLDS: dict = {"ks": 0.05, "chi2": 0.05, "psi": 0.2, "js": 0.1}
+# KS p-values are exact up to this many rows per side, asymptotic above
+DATA_VALIDATION_DRIFT_KS_EXACT_MAX_ROWS: int = 1000
 PREPROCESSING_OBJECT_FILE_NAME = "preprocessing.pkl"
 
 
@@ -51,6 +87,7 @@ Data Transformation related constant start with DATA_TRANSFORMATION VAR NAME
 DATA_TRANSFORMATION_DIR_NAME: str = "data_transformation"
 DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR: str = "transformed"
 DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR: str = "transformed_object"
+DATA_TRANSFORMATION_DRIFT_BASELINE_FILE_NAME: str = "drift_baseline.json"
 
 # kkn imputer to replace nan values
 DATA_TRANSFORMATION_IMPUTER_PARAMS: dict = {
@@ -58,6 +95,9 @@ DATA_TRANSFORMATION_IMPUTER_PARAMS: dict = {
     "n_neighbors": 3,
     "weights": "uniform",
 }
+# "knn" uses sklearn's KNNImputer, "ternary" the bit-packed TernaryKNNImputer
+# (same distances and n_neighbors, only valid for features in {-1, 0, 1})
+DATA_TRANSFORMATION_IMPUTER_ENGINE: str = "knn"
 DATA_TRANSFORMATION_TRAIN_FILE_PATH: str = "train.npy"
 DATA_TRANSFORMATION_TEST_FILE_PATH: str = "test.npy"
 
@@ -71,4 +111,96 @@ MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
 MODEL_TRAINER_OVER_FIITING_UNDER_FITTING_THRESHOLD: float = 0.05
 
+# hyperparameter search: "grid" (cached, parallel) or "halving" (successive halving)
+MODEL_TRAINER_SEARCH_STRATEGY: str = "grid"
+MODEL_TRAINER_SEARCH_CV: int = 3
+MODEL_TRAINER_SEARCH_N_JOBS: int = -1
+# fold scores are kept across runs, outside the timestamped artifact dirs, one file per training data
+# fingerprint; only the most recently used files are kept
+MODEL_TRAINER_SEARCH_CACHE_DIR: str = os.path.join(ARTIFACT_DIR, "search_cache")
+MODEL_TRAINER_SEARCH_CACHE_MAX_FILES: int = 5
+
+# export the best model as a flat NumPy predictor next to model.pkl, served when it passes the parity check
+MODEL_TRAINER_COMPILE_MODEL: bool = True
+
 TRAINING_BUCKET_NAME = "networksecurity"
+
+
+"""
+Model serving related constant start with MODEL_REGISTRY VAR NAME
+"""
+FINAL_MODEL_DIR: str = "final_model"
+FINAL_MODEL_FILE_NAME: str = "model.pkl"
+FINAL_PREPROCESSOR_FILE_NAME: str = "preprocessor.pkl"
+FINAL_COMPILED_MODEL_FILE_NAME: str = "compiled_model.pkl"
+# value counts of the raw training features, the reference for the serving drift monitor
+FINAL_DRIFT_BASELINE_FILE_NAME: str = "drift_baseline.json"
+# every publish writes all model files into final_model/releases/<release>/ and then points
+# final_model/current.json at it, so a reader never sees files of two different trainings
+FINAL_MODEL_RELEASES_DIR: str = "releases"
+FINAL_MODEL_CURRENT_FILE_NAME: str = "current.json"
+# older releases kept next to the current one, a worker may still be loading the previous release
+FINAL_MODEL_RELEASE_HISTORY: int = 2
+
+# how often the serving process checks final_model/ for a newly pushed model
+MODEL_REGISTRY_POLL_INTERVAL_SECONDS: float = 5.0
+
+# JSON prediction endpoint: requests are coalesced into one predict call
+PREDICTION_BATCH_MAX_SIZE: int = 256
+PREDICTION_BATCH_MAX_WAIT_MS: float = 5.0
+
+# CSV uploads are read and scored this many rows at a time; /predict renders at most PREDICTION_HTML_MAX_ROWS
+# rows of the result, /predict/stream returns every row as CSV or NDJSON
+PREDICTION_STREAM_CHUNK_ROWS: int = 10000
+PREDICTION_HTML_MAX_ROWS: int = 1000
+
+# distinct feature vectors whose prediction is kept per served model (LRU), 0 disables the cache
+PREDICTION_CACHE_SIZE: int = 65536
+
+# inference runs on a bounded thread pool, requests beyond workers + queue depth get a 503
+INFERENCE_MAX_WORKERS: int = 4
+INFERENCE_MAX_QUEUE_DEPTH: int = 64
+
+# every served prediction is appended to this PostgreSQL table by a background writer, flushed with one COPY
+# per flush_rows rows or flush interval; beyond max buffer rows batches are dropped rather than slowing requests
+PREDICTION_LOG_TABLE_NAME: str = "prediction_log"
+PREDICTION_LOG_FLUSH_ROWS: int = 5000
+PREDICTION_LOG_FLUSH_INTERVAL_SECONDS: float = 2.0
+PREDICTION_LOG_MAX_BUFFER_ROWS: int = 200000
+# a batch the database rejects (not a lost connection) is retried this many times, then dropped
+PREDICTION_LOG_MAX_FLUSH_ATTEMPTS: int = 3
+
+# number of finished /train jobs kept for status polling; every job is a JSON file in TRAINING_JOB_DIR and
+# the worker running the retrain holds a lock on its lock file, so any gunicorn worker can answer /train/{id}
+TRAINING_JOB_HISTORY_SIZE: int = 20
+TRAINING_JOB_DIR: str = os.path.join(ARTIFACT_DIR, "training_jobs")
+TRAINING_JOB_LOCK_FILE_NAME: str = "active.lock"
+TRAINING_JOB_ACTIVE_FILE_NAME: str = "active.json"
+
+# live traffic is histogrammed in tumbling windows and compared with the drift baseline when a window closes;
+# windows with fewer rows are reported but not tested
+DRIFT_MONITOR_WINDOW_SECONDS: float = 300.0
+DRIFT_MONITOR_MIN_ROWS: int = 100
+
+# production serving: gunicorn.conf.py runs this many uvicorn worker processes (WEB_CONCURRENCY overrides),
+# the model is loaded once in the master before the workers are forked
+SERVING_HOST: str = "0.0.0.0"
+SERVING_PORT: int = 8000
+SERVING_WORKERS: int = os.cpu_count() or 1
+SERVING_WORKER_TIMEOUT_SECONDS: int = 120
+
+# /metrics in the Prometheus text format. Under gunicorn every worker writes its counters to the
+# directory in the env var every flush interval and /metrics adds up all workers
+METRICS_PREFIX: str = "networksecurity"
+METRICS_LATENCY_BUCKETS: tuple = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_BATCH_ROWS_BUCKETS: tuple = (1, 4, 16, 64, 256, 1024, 4096, 16384, 65536)
+METRICS_MULTIPROCESS_DIR_ENV_VAR: str = "NETWORKSECURITY_METRICS_DIR"
+METRICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+# PostgreSQL connection pool shared by serving, ingestion and the ETL loader (DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE
+# override the size); min size connections stay open, idle ones are pinged before reuse
+DB_POOL_MIN_SIZE: int = 2
+DB_POOL_MAX_SIZE: int = 10
+DB_POOL_CHECKOUT_TIMEOUT_SECONDS: float = 30.0
+DB_POOL_HEALTH_CHECK_INTERVAL_SECONDS: float = 30.0
+DB_CONNECT_TIMEOUT_SECONDS: int = 10
@@ -20,6 +20,7 @@ class DataTransformationArtifact :
     transformed_object_file_path:str
     transformed_train_file_path:str
     transformed_test_file_path:str
+    drift_baseline_file_path:str = None
 
 
 @dataclass
@@ -3,8 +3,9 @@ import os
 from networksecurity.constant import training_pipeline
 
 class TrainingPipelineConfig:
-    def __init__(self, timestamp=datetime.now()):
-        timestamp = timestamp.strftime("%m_%d_%Y_%H_%M_%S")
+    def __init__(self, timestamp: datetime = None):
+        # taken per config, a default argument would be evaluated once and shared by every run of the process
+        timestamp = (timestamp or datetime.now()).strftime("%m_%d_%Y_%H_%M_%S")
         self.pipeline_name: str = training_pipeline.PIPELINE_NAME
         self.artifact_name: str = training_pipeline.ARTIFACT_DIR
         self.artifact_dir: str = os.path.join(self.artifact_name, timestamp)
@@ -26,16 +27,23 @@ class DataIngestionConfig:
         self.training_file_path: str = os.path.join(
             self.data_ingestion_dir,
             training_pipeline.DATA_INGESTION_INGESTED_DIR,
-            training_pipeline.TRAIN_FILE_NAME
+            training_pipeline.TRAIN_STORE_NAME
         )
         self.testing_file_path: str = os.path.join(
             self.data_ingestion_dir,
             training_pipeline.DATA_INGESTION_INGESTED_DIR,
-            training_pipeline.TEST_FILE_NAME
+            training_pipeline.TEST_STORE_NAME
         )
         self.train_test_split_ratio: float = training_pipeline.DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO
+        self.split_random_state: int = training_pipeline.DATA_INGESTION_SPLIT_RANDOM_STATE
         self.table_name: str = training_pipeline.DATA_INGESTION_TABLE_NAME
         self.schema_name: str = training_pipeline.DATA_INGESTION_SCHEMA_NAME
+        self.streaming: bool = training_pipeline.DATA_INGESTION_STREAMING
+        self.persistent_feature_store_dir: str = os.path.join(
+            training_pipeline.DATA_INGESTION_PERSISTENT_FEATURE_STORE_DIR,
+            self.table_name
+        )
+        self.chunk_size: int = training_pipeline.DATA_INGESTION_CHUNK_SIZE
 
 
 class DataValidationConfig:
@@ -54,25 +62,30 @@ class DataValidationConfig:
         )
         self.valid_train_file_path: str = os.path.join(
             self.valid_data_dir,
-            training_pipeline.TRAIN_FILE_NAME
+            training_pipeline.TRAIN_STORE_NAME
         )
         self.valid_test_file_path: str = os.path.join(
             self.valid_data_dir,
-            training_pipeline.TEST_FILE_NAME
+            training_pipeline.TEST_STORE_NAME
         )
         self.invalid_train_file_path: str = os.path.join(
             self.invalid_data_dir,
-            training_pipeline.TRAIN_FILE_NAME
+            training_pipeline.TRAIN_STORE_NAME
         )
         self.invalid_test_file_path: str = os.path.join(
             self.invalid_data_dir,
-            training_pipeline.TEST_FILE_NAME
+            training_pipeline.TEST_STORE_NAME
         )
         self.drift_report_file_path: str = os.path.join(
             self.data_validation_dir,
             training_pipeline.DATA_VALIDATION_DRIFT_REPORT_DIR,
             training_pipeline.DATA_VALIDATION_DRIFT_REPORT_FILE_NAME
         )
+        self.validation_report_file_path: str = os.path.join(
+            self.data_validation_dir,
+            training_pipeline.DATA_VALIDATION_REPORT_FILE_NAME
+        )
+        self.chunk_size: int = training_pipeline.DATA_VALIDATION_CHUNK_SIZE
 
 
 class DataTransformationConfig:
@@ -96,6 +109,10 @@ class DataTransformationConfig:
             training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
             training_pipeline.PREPROCESSING_OBJECT_FILE_NAME
         )
+        self.drift_baseline_file_path: str = os.path.join(
+            self.data_transformation_dir,
+            training_pipeline.DATA_TRANSFORMATION_DRIFT_BASELINE_FILE_NAME
+        )
 
 
 class ModelTrainerConfig:
@@ -0,0 +1,150 @@
+import sys
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constant.training_pipeline import DAG_MAX_WORKERS
+
+
+@dataclass
+class Task:
+    name: str
+    fn: Callable
+    inputs: List[str] = field(default_factory=list)
+
+
+@dataclass
+class TaskTiming:
+    name: str
+    # when the task began and ended running on its worker, queueing for a free worker is not included
+    started: float
+    finished: float
+    seconds: float
+
+
+class TaskGraph:
+    """
+    Minimal task-graph executor.
+
+    Every task names the earlier task results it takes as keyword arguments and its
+    own result is stored under its name. A task is submitted as soon as all of its
+    inputs exist, so independent tasks run at the same time on a thread pool (the
+    pipeline's steps are NumPy, sklearn and IO work that release the GIL), and run()
+    returns all results. The first failing task cancels what has
+    not started and its error is raised. Per-task start and end times are kept in
+    timings; report() compares the wall time with the critical path.
+    """
+
+    # (sequence number, report) of the last graphs run in this process, so a caller can
+    # collect the graphs nested in its own tasks; see reports_since
+    finished_reports = deque(maxlen=100)
+    finished_count = 0
+    _finished_lock = threading.Lock()
+
+    def __init__(self, name: str, max_workers: int = DAG_MAX_WORKERS):
+        self.name = name
+        self.max_workers = max_workers
+        self.tasks: Dict[str, Task] = {}
+        self.timings: Dict[str, TaskTiming] = {}
+        self.wall_seconds = 0.0
+
+    def add(self, name: str, fn: Callable, inputs: List[str] = ()) -> "TaskGraph":
+        if name in self.tasks:
+            raise ValueError(f"Task {name} is already in graph {self.name}")
+        self.tasks[name] = Task(name=name, fn=fn, inputs=list(inputs))
+        return self
+
+    @staticmethod
+    def _timed(fn: Callable, kwargs: dict):
+        """Runs on the worker, so the start time is when the task actually began"""
+        started = time.perf_counter()
+        result = fn(**kwargs)
+        return result, started, time.perf_counter()
+
+    def _check(self, results: dict):
+        known = set(results)
+        remaining = dict(self.tasks)
+        while remaining:
+            ready = [name for name, task in remaining.items() if set(task.inputs) <= known]
+            if not ready:
+                unresolved = {name: sorted(set(task.inputs) - known) for name, task in remaining.items()}
+                raise ValueError(f"Graph {self.name} has missing inputs or a cycle: {unresolved}")
+            for name in ready:
+                known.add(name)
+                del remaining[name]
+
+    def run(self, **initial) -> dict:
+        """Run every task, initial values are available as inputs by name"""
+        try:
+            self._check(initial)
+            results = dict(initial)
+            pending = dict(self.tasks)
+            running = {}
+            start = time.perf_counter()
+            threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"dag-{self.name}")
+            try:
+                while pending or running:
+                    for name in [name for name, task in pending.items() if set(task.inputs) <= set(results)]:
+                        task = pending.pop(name)
+                        kwargs = {input_name: results[input_name] for input_name in task.inputs}
+                        running[threads.submit(self._timed, task.fn, kwargs)] = task
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task = running.pop(future)
+                        results[task.name], started, finished = future.result()
+                        self.timings[task.name] = TaskTiming(name=task.name, started=started - start,
+                                                             finished=finished - start, seconds=finished - started)
+                        logging.info(f"[{self.name}] {task.name} finished in {finished - started:.2f}s")
+            finally:
+                for future in running:
+                    future.cancel()
+                threads.shutdown(wait=True, cancel_futures=True)
+            self.wall_seconds = time.perf_counter() - start
+            report = self.report()
+            with TaskGraph._finished_lock:
+                TaskGraph.finished_reports.append((TaskGraph.finished_count, report))
+                TaskGraph.finished_count += 1
+            logging.info(f"[{self.name}] {len(self.tasks)} tasks in {report['wall_seconds']:.2f}s, "
+                         f"critical path {report['critical_path_seconds']:.2f}s, "
+                         f"serial {report['serial_seconds']:.2f}s")
+            return results
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def critical_path(self) -> List[str]:
+        """The chain of dependent tasks with the largest total duration"""
+        longest = {}
+
+        def visit(name: str):
+            if name not in longest:
+                # initial values are inputs too, but not tasks
+                upstream = [visit(input_name) for input_name in self.tasks[name].inputs if input_name in self.timings]
+                best = max(upstream, key=lambda path: path[0], default=(0.0, []))
+                longest[name] = (best[0] + self.timings[name].seconds, best[1] + [name])
+            return longest[name]
+
+        paths = [visit(name) for name in self.tasks if name in self.timings]
+        return max(paths, key=lambda path: path[0], default=(0.0, []))[1]
+
+    def report(self) -> dict:
+        critical_path = self.critical_path()
+        return {
+            "graph": self.name,
+            "wall_seconds": self.wall_seconds,
+            "serial_seconds": sum(timing.seconds for timing in self.timings.values()),
+            "critical_path_seconds": sum(self.timings[name].seconds for name in critical_path),
+            "critical_path": critical_path,
+            "tasks": [asdict(timing) for timing in sorted(self.timings.values(), key=lambda timing: timing.started)],
+        }
+
+    @classmethod
+    def reports_since(cls, marker: int) -> List[dict]:
+        """Reports of the graphs finished since TaskGraph.finished_count was marker"""
+        with cls._finished_lock:
+            return [report for number, report in cls.finished_reports if number >= marker]
@@ -0,0 +1,162 @@
+import os
+import sys
+import ast
+import json
+import hashlib
+import inspect
+import dataclasses
+from typing import List
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constant import training_pipeline
+from networksecurity.constant.training_pipeline import STAGE_CACHE_DIR
+from networksecurity.utils.main_utils.mmap_pickle import manifest_file_path
+
+
+def fingerprint_path(path: str) -> str:
+    """
+    sha256 of a file's content, or of every file below a directory with its relative path.
+    A saved object's manifest is included, it holds the checksums of the out-of-band arrays.
+    """
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        base_dir = path
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    else:
+        base_dir = os.path.dirname(path)
+        files = [path]
+        if os.path.exists(manifest_file_path(path)):
+            files.append(manifest_file_path(path))
+    for file_path in files:
+        digest.update(os.path.relpath(file_path, base_dir).encode() + b"\0")
+        with open(file_path, "rb") as file_obj:
+            for block in iter(lambda: file_obj.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_constants(*prefixes: str) -> dict:
+    """
+    Source of every training_pipeline constant whose name starts with one of prefixes, with
+    the constants it is computed from. Read from the file on disk like fingerprint_source, the
+    imported values would be stale in a process that imported the module before an edit.
+    """
+    with open(inspect.getsourcefile(training_pipeline)) as source_file:
+        source = source_file.read()
+    assignments = {}
+    for node in ast.parse(source).body:
+        target = node.target if isinstance(node, ast.AnnAssign) else \
+            node.targets[0] if isinstance(node, ast.Assign) and len(node.targets) == 1 else None
+        if isinstance(target, ast.Name) and target.id.isupper():
+            assignments[target.id] = node
+    constants = {}
+    pending = [name for name in assignments if name.startswith(prefixes)]
+    while pending:
+        name = pending.pop()
+        if name in constants:
+            continue
+        node = assignments[name]
+        constants[name] = ast.get_source_segment(source, node)
+        pending.extend(child.id for child in ast.walk(node.value) if isinstance(child, ast.Name)
+                       and child.id in assignments and child.id != name)
+    return constants
+
+
+def fingerprint_source(*objects) -> str:
+    """sha256 of the source files defining objects (classes, functions or modules)"""
+    digest = hashlib.sha256()
+    for obj in objects:
+        with open(inspect.getsourcefile(obj), "rb") as source_file:
+            digest.update(source_file.read())
+    return digest.hexdigest()
+
+
+def artifact_paths(artifact) -> List[str]:
+    """Every file or directory an artifact points to, nested artifacts included"""
+    paths = []
+    for field in dataclasses.fields(artifact):
+        value = getattr(artifact, field.name)
+        if dataclasses.is_dataclass(value):
+            paths.extend(artifact_paths(value))
+        elif isinstance(value, str) and field.name.endswith("_path"):
+            paths.append(value)
+    return paths
+
+
+def artifact_from_dict(artifact_type, values: dict):
+    kwargs = {}
+    for field in dataclasses.fields(artifact_type):
+        if field.name not in values:
+            continue
+        value = values[field.name]
+        if dataclasses.is_dataclass(field.type) and isinstance(value, dict):
+            value = artifact_from_dict(field.type, value)
+        kwargs[field.name] = value
+    return artifact_type(**kwargs)
+
+
+class StageCache:
+    """
+    Content-addressed cache of pipeline stage artifacts.
+
+    A stage's key is the sha256 of everything its output depends on: fingerprints of
+    the input data, the schema, the constants it reads and the source of the component.
+    When a run computes a key that an earlier run stored, that run's artifact is
+    returned and the stage is skipped, provided every file the artifact points to is
+    still on disk with the content it had when the entry was stored. Entries are small JSON files under cache_dir/<stage>/<key>.json.
+    """
+
+    def __init__(self, cache_dir: str = STAGE_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def key(inputs: dict) -> str:
+        # default=repr covers values JSON cannot encode, such as np.nan in the imputer params
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=repr).encode()).hexdigest()
+
+    def entry_path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, f"{key}.json")
+
+    def get(self, stage: str, key: str, artifact_type):
+        """The artifact stored under key, None when there is none or its files are gone or changed"""
+        try:
+            entry_path = self.entry_path(stage, key)
+            if not os.path.exists(entry_path):
+                return None
+            with open(entry_path) as entry_file:
+                entry = json.load(entry_file)
+            artifact = artifact_from_dict(artifact_type, entry["artifact"])
+            missing = [path for path in artifact_paths(artifact) if not os.path.exists(path)]
+            if missing:
+                logging.info(f"Stage cache entry {stage}/{key[:12]} is stale, missing {missing}")
+                return None
+            # a later run may have written into the same artifact directory since
+            fingerprints = entry.get("fingerprints", {})
+            changed = [path for path in artifact_paths(artifact)
+                       if fingerprints.get(path) != fingerprint_path(path)]
+            if changed:
+                logging.info(f"Stage cache entry {stage}/{key[:12]} is stale, changed {changed}")
+                return None
+            logging.info(f"Stage {stage} unchanged (key {key[:12]}), reusing the artifact of run {entry['run']}")
+            return artifact
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def put(self, stage: str, key: str, artifact, inputs: dict, run: str):
+        try:
+            entry_path = self.entry_path(stage, key)
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            entry = {
+                "run": run,
+                "inputs": inputs,
+                "artifact": dataclasses.asdict(artifact),
+                "fingerprints": {path: fingerprint_path(path) for path in artifact_paths(artifact)},
+            }
+            temp_file_path = f"{entry_path}.{os.getpid()}.tmp"
+            with open(temp_file_path, "w") as entry_file:
+                json.dump(entry, entry_file, indent=2, default=repr)
+            os.replace(temp_file_path, entry_path)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import time
+import uuid
+import fcntl
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, asdict, fields
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constant.training_pipeline import (
+    TRAINING_JOB_HISTORY_SIZE, TRAINING_JOB_DIR, TRAINING_JOB_LOCK_FILE_NAME, TRAINING_JOB_ACTIVE_FILE_NAME,
+)
+
+FINAL_STATUSES = ("succeeded", "failed")
+
+
+def write_json(file_path: str, data: dict):
+    # replaced atomically, a reader in another worker never sees a partial file
+    temp_file_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temp_file_path, "w") as json_file:
+        json.dump(data, json_file)
+    os.replace(temp_file_path, file_path)
+
+
+def read_json(file_path: str) -> dict:
+    try:
+        with open(file_path) as json_file:
+            return json.load(json_file)
+    except (OSError, ValueError):
+        return None
+
+
+def run_training_pipeline(job_file_path: str = None) -> str:
+    """Runs in the training process, the job only turns "running" once that process has picked it up"""
+    if job_file_path is not None:
+        job = read_json(job_file_path)
+        if job is not None:
+            write_json(job_file_path, {**job, "status": "running", "started_at": time.time()})
+    try:
+        # imported here so the serving process does not pay for it until a job runs
+        from networksecurity.pipeline.training_pipeline import TrainingPipeline
+        model_trainer_artifact = TrainingPipeline().run_pipeline()
+        return str(model_trainer_artifact)
+    except Exception as e:
+        # NetworkSecurityException holds the sys module and cannot be pickled back to the server
+        raise RuntimeError(str(e)) from None
+
+
+@dataclass
+class TrainingJob:
+    job_id: str
+    status: str
+    submitted_at: float
+    started_at: float = None
+    finished_at: float = None
+    result: str = None
+    error: str = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TrainingJob":
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+
+class TrainingJobManager:
+    """
+    Runs TrainingPipeline as a background job in a separate process.
+
+    Jobs are JSON files in job_dir, so every gunicorn worker sees the same jobs. Only
+    one retrain runs at a time across all workers: the worker that starts a job holds
+    an exclusive lock on the lock file until the job finishes (the kernel drops it if
+    that worker dies), and submitting while it is held returns the active job.
+    on_success is called in the submitting worker once its job succeeds, e.g. to
+    reload the model registry; the other workers pick the new model up by polling.
+    """
+
+    def __init__(self, on_success=None, history_size: int = TRAINING_JOB_HISTORY_SIZE,
+                 job_dir: str = TRAINING_JOB_DIR):
+        self.on_success = on_success
+        self.history_size = history_size
+        self.job_dir = job_dir
+        self._lock = threading.Lock()
+        self._lock_file = None
+        # created on first submit, so under gunicorn's preload it belongs to a worker and not to the master
+        self._executor: ProcessPoolExecutor = None
+
+    def job_file_path(self, job_id: str) -> str:
+        return os.path.join(self.job_dir, f"{job_id}.json")
+
+    def _save(self, job: TrainingJob):
+        write_json(self.job_file_path(job.job_id), job.to_dict())
+
+    def _active(self) -> TrainingJob:
+        active = read_json(os.path.join(self.job_dir, TRAINING_JOB_ACTIVE_FILE_NAME))
+        return None if active is None else self.get(active["job_id"])
+
+    def _try_lock(self) -> bool:
+        lock_file = open(os.path.join(self.job_dir, TRAINING_JOB_LOCK_FILE_NAME), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _unlock(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _prune(self):
+        job_files = [os.path.join(self.job_dir, name) for name in os.listdir(self.job_dir)
+                     if name.endswith(".json") and name != TRAINING_JOB_ACTIVE_FILE_NAME]
+        job_files.sort(key=os.path.getmtime)
+        for file_path in job_files[:max(len(job_files) - self.history_size, 0)]:
+            os.remove(file_path)
+
+    def submit(self) -> TrainingJob:
+        try:
+            os.makedirs(self.job_dir, exist_ok=True)
+            with self._lock:
+                if self._lock_file is not None or not self._try_lock():
+                    active = self._active()
+                    if active is not None:
+                        return active
+                    raise RuntimeError("A training job is starting, retry shortly")
+                try:
+                    # the last job was left unfinished by a worker that died while holding the lock
+                    orphan = self._active()
+                    if orphan is not None and orphan.status not in FINAL_STATUSES:
+                        orphan.status, orphan.error, orphan.finished_at = "failed", "interrupted", time.time()
+                        self._save(orphan)
+                    job = TrainingJob(job_id=uuid.uuid4().hex, status="queued", submitted_at=time.time())
+                    self._save(job)
+                    write_json(os.path.join(self.job_dir, TRAINING_JOB_ACTIVE_FILE_NAME), {"job_id": job.job_id})
+                    self._prune()
+
+                    try:
+                        future = self._get_executor().submit(run_training_pipeline, self.job_file_path(job.job_id))
+                    except BrokenProcessPool:
+                        self._discard_executor()
+                        future = self._get_executor().submit(run_training_pipeline, self.job_file_path(job.job_id))
+                except Exception:
+                    self._unlock()
+                    raise
+            future.add_done_callback(lambda f: self._finish(job, f))
+            logging.info(f"Training job {job.job_id} queued")
+            return job
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn keeps the child clear of the locks and threads held by the server process, and a
+            # process per job means every retrain imports the current code and constants afresh
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                                                 max_tasks_per_child=1)
+        return self._executor
+
+    def _discard_executor(self):
+        """Drop a pool whose process died (e.g. OOM killed), the next submit starts a new one"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _finish(self, job: TrainingJob, future):
+        # the training process wrote status and started_at when it picked the job up
+        job = self.get(job.job_id) or job
+        job.finished_at = time.time()
+        try:
+            job.result = future.result()
+            job.status = "succeeded"
+            # started_at is missing when the training process could not update the job file
+            started_at = job.started_at or job.submitted_at
+            logging.info(f"Training job {job.job_id} succeeded in {job.finished_at - started_at:.1f}s")
+        except BrokenProcessPool as e:
+            job.status = "failed"
+            job.error = f"training process died: {e}"
+            logging.error(f"Training job {job.job_id} failed, its process died: {e}")
+            with self._lock:
+                self._discard_executor()
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logging.error(f"Training job {job.job_id} failed: {e}")
+        finally:
+            with self._lock:
+                try:
+                    self._save(job)
+                finally:
+                    self._unlock()
+        if job.status == "succeeded" and self.on_success is not None:
+            try:
+                self.on_success()
+            except Exception as e:
+                logging.error(f"Training job {job.job_id} post-processing failed: {e}")
+
+    def get(self, job_id: str) -> TrainingJob:
+        # job ids are uuid4 hex, anything else is not a file name to look up
+        if not job_id.isalnum():
+            return None
+        data = read_json(self.job_file_path(job_id))
+        return None if data is None else TrainingJob.from_dict(data)
+
+    def shutdown(self):
+        self._discard_executor()
@@ -24,15 +24,49 @@ from networksecurity.entity.artifact_entity import (
     ModelTrainerArtifact,
 )
 
+from networksecurity.constant.training_pipeline import (SCHEMA_FILE_PATH, TARGET_COLUMN, TRAINING_PIPELINE_STAGE_CACHE,
+                                                       PIPELINE_RUN_REPORT_FILE_NAME, PIPELINE_PROFILE_DIR_NAME)
+from networksecurity.pipeline.dag import TaskGraph
+from networksecurity.pipeline.stage_cache import StageCache, fingerprint_path, fingerprint_source, stage_constants
+from networksecurity.utils.main_utils import utils as main_utils
+from networksecurity.utils.main_utils.utils import load_object
+from networksecurity.utils.main_utils.profiling import RunProfiler, activate
+from networksecurity.utils.ml_utils.metric import drift
+from networksecurity.utils.ml_utils.model import compiled, estimator, search
+from networksecurity.utils.ml_utils.imputer import ternary_knn_imputer
+
 
 
 
 
 class TrainingPipeline:
-    def __init__(self):
+    def __init__(self,use_stage_cache:bool=TRAINING_PIPELINE_STAGE_CACHE):
         self.training_pipeline_config=TrainingPipelineConfig()
         # self.s3_sync = S3Sync()
-        
+        self.stage_cache=StageCache() if use_stage_cache else None
+        # stages whose artifact was reused from an earlier run
+        self.cached_stages=set()
+
+    def run_stage(self,stage:str,inputs,artifact_type,run):
+        """
+        Return the cached artifact of stage when an earlier run had the same inputs, else run() it
+        and cache the result. inputs is a callable, fingerprinting is skipped when caching is off.
+        """
+        try:
+            if self.stage_cache is None:
+                return run()
+            inputs=inputs()
+            key=self.stage_cache.key(inputs)
+            artifact=self.stage_cache.get(stage,key,artifact_type)
+            if artifact is not None:
+                self.cached_stages.add(stage)
+                return artifact
+            artifact=run()
+            self.stage_cache.put(stage,key,artifact,inputs,run=self.training_pipeline_config.timestamp)
+            return artifact
+        except Exception as e:
+            raise NetworkSecurityException(e,sys)
+
 
     def start_data_ingestion(self):
         try:
@@ -49,9 +83,18 @@ class TrainingPipeline:
     def start_data_validation(self,data_ingestion_artifact:DataIngestionArtifact):
         try:
             data_validation_config=DataValidationConfig(training_pipeline_config=self.training_pipeline_config)
-            data_validation=DataValidation(data_ingestion_artifact=data_ingestion_artifact,data_validation_config=data_validation_config)
-            logging.info("Initiate the data Validation")
-            data_validation_artifact=data_validation.initiate_data_validation()
+            def run():
+                data_validation=DataValidation(data_ingestion_artifact=data_ingestion_artifact,data_validation_config=data_validation_config)
+                logging.info("Initiate the data Validation")
+                return data_validation.initiate_data_validation()
+            inputs=lambda: {
+                "train":fingerprint_path(data_ingestion_artifact.trained_file_path),
+                "test":fingerprint_path(data_ingestion_artifact.test_file_path),
+                "schema":fingerprint_path(SCHEMA_FILE_PATH),
+                "constants":stage_constants("DATA_VALIDATION_"),
+                "source":fingerprint_source(DataValidation,drift),
+            }
+            data_validation_artifact=self.run_stage("data_validation",inputs,DataValidationArtifact,run)
             return data_validation_artifact
         except Exception as e:
             raise NetworkSecurityException(e,sys)
@@ -59,10 +102,18 @@ class TrainingPipeline:
     def start_data_transformation(self,data_validation_artifact:DataValidationArtifact):
         try:
             data_transformation_config = DataTransformationConfig(training_pipeline_config=self.training_pipeline_config)
-            data_transformation = DataTransformation(data_validation_artifact=data_validation_artifact,
-            data_transformation_config=data_transformation_config)
-            
-            data_transformation_artifact = data_transformation.initiate_data_transformation()
+            def run():
+                data_transformation = DataTransformation(data_validation_artifact=data_validation_artifact,
+                data_transformation_config=data_transformation_config)
+                return data_transformation.initiate_data_transformation()
+            inputs=lambda: {
+                "train":fingerprint_path(data_validation_artifact.valid_train_file_path),
+                "test":fingerprint_path(data_validation_artifact.valid_test_file_path),
+                "target_column":TARGET_COLUMN,
+                "constants":stage_constants("DATA_TRANSFORMATION_"),
+                "source":fingerprint_source(DataTransformation,ternary_knn_imputer,drift),
+            }
+            data_transformation_artifact = self.run_stage("data_transformation",inputs,DataTransformationArtifact,run)
             return data_transformation_artifact
         except Exception as e:
             raise NetworkSecurityException(e,sys)
@@ -73,12 +124,25 @@ class TrainingPipeline:
                 training_pipeline_config=self.training_pipeline_config
             )
 
-            model_trainer = ModelTrainer(
-                data_transformation_artifact=data_transformation_artifact,
-                model_trainer_config=self.model_trainer_config,
-            )
-
-            model_trainer_artifact = model_trainer.initiate_model_trainer()
+            def run():
+                model_trainer = ModelTrainer(
+                    data_transformation_artifact=data_transformation_artifact,
+                    model_trainer_config=self.model_trainer_config,
+                )
+                return model_trainer.initiate_model_trainer()
+            inputs=lambda: {
+                "train":fingerprint_path(data_transformation_artifact.transformed_train_file_path),
+                "test":fingerprint_path(data_transformation_artifact.transformed_test_file_path),
+                "preprocessor":fingerprint_path(data_transformation_artifact.transformed_object_file_path),
+                "constants":stage_constants("MODEL_TRAINER_"),
+                # the model families and parameter grids are defined in model_trainer.py
+                "source":fingerprint_source(ModelTrainer,main_utils,search,compiled,estimator),
+            }
+            model_trainer_artifact = self.run_stage("model_trainer",inputs,ModelTrainerArtifact,run)
+            if "model_trainer" in self.cached_stages:
+                # final_model/ may hold another run's release by now
+                ModelTrainer.publish_final_model(load_object(model_trainer_artifact.trained_model_file_path),
+                                                 data_transformation_artifact.drift_baseline_file_path)
 
             return model_trainer_artifact
 
@@ -87,17 +151,39 @@ class TrainingPipeline:
         
     
     
+    def profiled_stage(self,stage:str,start):
+        """start() wrapped in a profiler section, so every stage is measured on its own"""
+        def run(**inputs):
+            with self.profiler.section(stage) as section:
+                artifact=start(**inputs)
+                section.details["cached"]=stage in self.cached_stages
+            return artifact
+        return run
+
     def run_pipeline(self):
         try:
-            data_ingestion_artifact=self.start_data_ingestion()
-            data_validation_artifact=self.start_data_validation(data_ingestion_artifact=data_ingestion_artifact)
-            data_transformation_artifact=self.start_data_transformation(data_validation_artifact=data_validation_artifact)
-            model_trainer_artifact=self.start_model_trainer(data_transformation_artifact=data_transformation_artifact)
-            
-        
-            
+            artifact_dir=self.training_pipeline_config.artifact_dir
+            self.profiler=RunProfiler(run=self.training_pipeline_config.timestamp,
+                                      profile_dir=os.path.join(artifact_dir,PIPELINE_PROFILE_DIR_NAME))
+            # the stages form a chain; the parallel work is inside them, in each component's own graph
+            graph=TaskGraph("training_pipeline",max_workers=1)
+            graph.add("data_ingestion_artifact",self.profiled_stage("data_ingestion",self.start_data_ingestion))
+            graph.add("data_validation_artifact",self.profiled_stage("data_validation",self.start_data_validation),
+                      inputs=["data_ingestion_artifact"])
+            graph.add("data_transformation_artifact",
+                      self.profiled_stage("data_transformation",self.start_data_transformation),
+                      inputs=["data_validation_artifact"])
+            graph.add("model_trainer_artifact",self.profiled_stage("model_trainer",self.start_model_trainer),
+                      inputs=["data_transformation_artifact"])
+            marker=TaskGraph.finished_count
+            with activate(self.profiler):
+                model_trainer_artifact=graph.run()["model_trainer_artifact"]
+
+            self.profiler.extra["task_graphs"]=TaskGraph.reports_since(marker)
+            run_report_file_path=os.path.join(artifact_dir,PIPELINE_RUN_REPORT_FILE_NAME)
+            self.profiler.save(run_report_file_path)
+            logging.info(f"Pipeline run report written to {run_report_file_path}")
+
             return model_trainer_artifact
         except Exception as e:
             raise NetworkSecurityException(e,sys)
-        
-    
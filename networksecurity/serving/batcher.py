@@ -0,0 +1,157 @@
+import sys
+import asyncio
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constant.training_pipeline import (
+    PREDICTION_BATCH_MAX_SIZE,
+    PREDICTION_BATCH_MAX_WAIT_MS,
+)
+from networksecurity.utils.ml_utils.model.registry import ModelRegistry
+from networksecurity.serving.executor import BoundedExecutor
+from networksecurity.serving.drift_monitor import DriftMonitor
+from networksecurity.serving.prediction_log import PredictionLogWriter
+from networksecurity.serving.metrics import ServingMetrics, MetricsRegistry
+
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent JSON prediction requests into micro-batches.
+
+    Every request is turned into a float matrix up front (so a malformed record
+    only fails its own request), queued, and a single background task drains the
+    queue into batches of at most max_batch_size rows or max_wait_ms of waiting,
+    scoring each batch with one NetworkModel.predict call on the inference
+    executor so the event loop keeps collecting the next batch meanwhile.
+    """
+
+    def __init__(self, model_registry: ModelRegistry, executor: BoundedExecutor,
+                 max_batch_size: int = PREDICTION_BATCH_MAX_SIZE,
+                 max_wait_ms: float = PREDICTION_BATCH_MAX_WAIT_MS, drift_monitor: DriftMonitor = None,
+                 prediction_log: PredictionLogWriter = None, metrics: ServingMetrics = None):
+        self.model_registry = model_registry
+        self.executor = executor
+        self.drift_monitor = drift_monitor
+        self.prediction_log = prediction_log
+        self.metrics = metrics or ServingMetrics(registry=MetricsRegistry())
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: asyncio.Queue = None
+        self._task: asyncio.Task = None
+        self._dispatched = set()
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logging.info(f"Prediction batcher started (max_batch_size={self.max_batch_size}, "
+                     f"max_wait_ms={self.max_wait * 1000})")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @staticmethod
+    def records_to_rows(records: List[Dict], columns) -> np.ndarray:
+        """Order each record by the training columns, absent keys become 0 like the CSV route, nulls become NaN"""
+        try:
+            return np.array([[record.get(column, 0) for column in columns] for record in records],
+                            dtype=np.float64).reshape(len(records), len(columns))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Feature values must be numeric: {e}")
+
+    async def predict(self, records: List[Dict]) -> Dict:
+        if self._task is None:
+            raise NetworkSecurityException(Exception("Prediction batcher is not running"), sys)
+        if not records:
+            # an empty request alone in a batch would reach predict with 0 rows
+            raise ValueError("No records to score")
+        columns = self.model_registry.get().preprocessor.feature_names_in_
+        with self.metrics.phase("json", "parse"):
+            rows = self.records_to_rows(records, columns)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    async def _collect(self):
+        rows, future = await self._queue.get()
+        batch = [(rows, future)]
+        batch_size = len(rows)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while batch_size < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                rows, future = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append((rows, future))
+            batch_size += len(rows)
+        return batch
+
+    def _score(self, batch):
+        loaded_model = self.model_registry.current()
+        network_model, version = loaded_model.network_model, loaded_model.version
+        columns = network_model.preprocessor.feature_names_in_
+        with self.metrics.phase("json", "preprocess"):
+            x = pd.DataFrame(np.vstack([rows for rows, _ in batch]), columns=columns)
+        self.metrics.observe_batch("json", len(x), requests=len(batch))
+        with self.metrics.phase("json", "predict"):
+            y_pred = np.asarray(network_model.predict(x))
+        with self.metrics.phase("json", "write"):
+            if self.drift_monitor is not None:
+                self.drift_monitor.observe(loaded_model, x.to_numpy())
+            if self.prediction_log is not None:
+                self.prediction_log.log(version, x, y_pred, source="json")
+        with self.metrics.phase("json", "render"):
+            y_pred = y_pred.tolist()
+            results, start = [], 0
+            for rows, _ in batch:
+                results.append({"model_version": version, "predictions": y_pred[start:start + len(rows)]})
+                start += len(rows)
+        return results
+
+    async def _dispatch(self, batch):
+        try:
+            results = await self.executor.run(self._score, batch)
+        except Exception as e:
+            logging.error(f"Prediction batch of {len(batch)} requests failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            pending = [(rows, future) for rows, future in batch if not future.done()]
+            if not pending:
+                continue
+            task = asyncio.create_task(self._dispatch(pending))
+            self._dispatched.add(task)
+            task.add_done_callback(self._dispatched.discard)
@@ -0,0 +1,127 @@
+import sys
+import time
+import threading
+
+import numpy as np
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constant.training_pipeline import (
+    DRIFT_MONITOR_WINDOW_SECONDS,
+    DRIFT_MONITOR_MIN_ROWS,
+)
+from networksecurity.utils.ml_utils.model.registry import LoadedModel
+from networksecurity.utils.ml_utils.metric.drift import value_histograms, compare_histograms
+
+
+class DriftMonitor:
+    """
+    Compares live prediction traffic with the training data of the served model.
+
+    Every scored batch is folded into per-feature value counts over the domain of
+    the model's drift baseline, so memory is columns x values no matter how many
+    rows pass through; rows themselves are never kept. Windows are tumbling: once
+    window_seconds have passed (or the model version changes) the window is tested
+    against the baseline with the same tests as data validation, logged, and kept
+    as the last report until the next window closes.
+    """
+
+    def __init__(self, window_seconds: float = DRIFT_MONITOR_WINDOW_SECONDS,
+                 min_rows: int = DRIFT_MONITOR_MIN_ROWS):
+        self.window_seconds = window_seconds
+        self.min_rows = min_rows
+        self._lock = threading.Lock()
+        self._version: str = None
+        self._baseline: dict = None
+        self._domain: np.ndarray = None
+        self._counts: np.ndarray = None
+        self._out_of_domain: np.ndarray = None
+        self._rows = 0
+        self._window_start = time.time()
+        self.last_window: dict = None
+
+    def _reset(self, loaded_model: LoadedModel, now: float):
+        baseline = loaded_model.drift_baseline
+        self._version = loaded_model.version
+        self._baseline = baseline
+        self._domain = np.asarray(baseline["domain"]) if baseline else None
+        n_columns, n_values = (len(baseline["columns"]), len(baseline["domain"])) if baseline else (0, 0)
+        self._counts = np.zeros((n_columns, n_values), dtype=np.int64)
+        self._out_of_domain = np.zeros(n_columns, dtype=np.int64)
+        self._rows = 0
+        self._window_start = now
+
+    def _close_window(self, now: float):
+        if self._baseline is None or self._rows == 0:
+            return
+        window = {
+            "model_version": self._version,
+            "window_start": self._window_start,
+            "window_end": min(now, self._window_start + self.window_seconds),
+            "rows": self._rows,
+            "out_of_domain_values": dict(zip(self._baseline["columns"], self._out_of_domain.tolist())),
+        }
+        if self._rows < self.min_rows:
+            window.update({"drift_detected": None, "drifted_columns": [], "columns": {}})
+            logging.info(f"Drift monitor window closed with {self._rows} rows, too few to test")
+        else:
+            status, report = compare_histograms(self._baseline["columns"], np.asarray(self._baseline["counts"]),
+                                                self._counts, self._domain)
+            drifted = [column for column, result in report.items() if result["drift_detected"]]
+            # a feature that was NaN in every row of the window has no p-value, JSON has no NaN
+            report = {column: {name: None if isinstance(value, float) and np.isnan(value) else value
+                               for name, value in result.items()}
+                      for column, result in report.items()}
+            window.update({"drift_detected": not status, "drifted_columns": drifted, "columns": report})
+            if drifted:
+                logging.warning(f"Drift monitor: {len(drifted)} features drifted over {self._rows} rows "
+                                f"for model {self._version}: {drifted}")
+            else:
+                logging.info(f"Drift monitor: no drift over {self._rows} rows for model {self._version}")
+        self.last_window = window
+
+    def _rotate(self, loaded_model: LoadedModel, now: float):
+        if loaded_model is not None and loaded_model.version != self._version:
+            self._close_window(now)
+            self._reset(loaded_model, now)
+        elif now - self._window_start >= self.window_seconds:
+            self._close_window(now)
+            self._counts[:] = 0
+            self._out_of_domain[:] = 0
+            self._rows = 0
+            self._window_start = now
+
+    def observe(self, loaded_model: LoadedModel, rows: np.ndarray):
+        """Count the raw feature rows scored by loaded_model, in the baseline's column order"""
+        try:
+            baseline = loaded_model.drift_baseline
+            rows = np.asarray(rows)
+            if baseline is None or len(rows) == 0 or rows.shape[1] != len(baseline["columns"]):
+                return
+            domain = np.asarray(baseline["domain"])
+            counts = value_histograms(rows, domain)
+            present = len(rows) - np.isnan(rows).sum(axis=0) if rows.dtype.kind == "f" else len(rows)
+            out_of_domain = present - counts.sum(axis=1)
+            with self._lock:
+                self._rotate(loaded_model, time.time())
+                self._counts += counts
+                self._out_of_domain += out_of_domain
+                self._rows += len(rows)
+        except Exception as e:
+            # monitoring must never fail a prediction
+            logging.error(f"Drift monitor could not record a batch: {NetworkSecurityException(e, sys)}")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            if self._counts is not None:
+                self._rotate(None, time.time())
+            return {
+                "window_seconds": self.window_seconds,
+                "current_window": {
+                    "model_version": self._version,
+                    "window_start": self._window_start,
+                    "rows": self._rows,
+                },
+                "last_window": self.last_window,
+            }
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from collections import deque
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from networksecurity.logging.logger import logging
+
+from networksecurity.constant.training_pipeline import (
+    INFERENCE_MAX_WORKERS,
+    INFERENCE_MAX_QUEUE_DEPTH,
+)
+
+
+class ServerOverloadedError(Exception):
+    pass
+
+
+class BoundedExecutor:
+    """
+    Thread pool for blocking inference work with a hard cap on queued calls.
+
+    At most max_workers calls run and max_queue_depth wait; anything beyond that
+    is rejected immediately with ServerOverloadedError instead of piling up.
+    A slot is released when the work finishes, not when the caller stops waiting.
+    run_when_free() is for callers that cannot answer 503 (e.g. mid-stream): it
+    waits for a slot, woken by the release, instead of raising.
+    """
+
+    def __init__(self, max_workers: int = INFERENCE_MAX_WORKERS,
+                 max_queue_depth: int = INFERENCE_MAX_QUEUE_DEPTH):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue_depth)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        # (loop, future) of run_when_free calls waiting for a slot
+        self._waiters = deque()
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _release(self, _):
+        with self._lock:
+            self._in_flight -= 1
+            self._slots.release()
+            waiters = list(self._waiters)
+            self._waiters.clear()
+        # every waiter retries, one whose caller went away must not swallow the wakeup
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(lambda waiter=waiter: waiter.done() or waiter.set_result(None))
+            except RuntimeError:
+                # the waiter's event loop is already closed
+                pass
+
+    async def run(self, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            logging.warning(f"Inference executor saturated ({self._in_flight} calls in flight)")
+            raise ServerOverloadedError(
+                f"Too many requests in flight (limit {self.max_workers + self.max_queue_depth})")
+        with self._lock:
+            self._in_flight += 1
+        return await self._submit(fn, *args, **kwargs)
+
+    async def run_when_free(self, fn, *args, **kwargs):
+        """Like run(), but waits for a free slot instead of raising ServerOverloadedError"""
+        loop = asyncio.get_running_loop()
+        while True:
+            # checked and registered under the lock _release takes, so a release cannot slip in between
+            with self._lock:
+                if self._slots.acquire(blocking=False):
+                    self._in_flight += 1
+                    break
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            await waiter
+        return await self._submit(fn, *args, **kwargs)
+
+    async def _submit(self, fn, *args, **kwargs):
+        try:
+            future = self._executor.submit(partial(fn, *args, **kwargs))
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
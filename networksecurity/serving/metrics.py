@@ -0,0 +1,452 @@
+import os
+import sys
+import json
+import time
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constant.training_pipeline import (
+    METRICS_PREFIX,
+    METRICS_LATENCY_BUCKETS,
+    METRICS_BATCH_ROWS_BUCKETS,
+    METRICS_MULTIPROCESS_DIR_ENV_VAR,
+    METRICS_FLUSH_INTERVAL_SECONDS,
+)
+
+
+class _ThreadShards:
+    """
+    One dict per writing thread. Only the owning thread ever writes to its shard,
+    so updates need no lock; readers copy every shard (a single C call under the
+    GIL) and combine the copies. A thread takes the lock once, to register its shard.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def local(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def copies(self) -> List[dict]:
+        with self._lock:
+            shards = list(self._shards)
+        return [shard.copy() for shard in shards]
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._shards = _ThreadShards()
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        shard = self._shards.local()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def samples(self) -> Dict[tuple, float]:
+        totals = {}
+        for shard in self._shards.copies():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+
+class Gauge(Counter):
+    """A counter that can go down, for in-flight counts moved by the threads doing the work"""
+    type = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: tuple = METRICS_LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards()
+
+    def observe(self, labels: tuple, value: float):
+        shard = self._shards.local()
+        counts = shard.get(labels)
+        if counts is None:
+            # one count per bucket (not cumulative), one for +Inf, then the sum
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> Dict[tuple, list]:
+        totals = {}
+        for shard in self._shards.copies():
+            for labels, counts in shard.items():
+                counts = list(counts)
+                total = totals.get(labels)
+                totals[labels] = counts if total is None else [a + b for a, b in zip(total, counts)]
+        return totals
+
+
+class CallbackMetric:
+    """A gauge or counter read from another component's own stats when metrics are collected"""
+
+    def __init__(self, name: str, help: str, type: str, labelnames: Tuple[str, ...], fn: Callable[[], dict]):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+
+    def samples(self) -> Dict[tuple, float]:
+        try:
+            return {labels: value for labels, value in self.fn().items() if value is not None}
+        except Exception as e:
+            logging.warning(f"Metric {self.name} could not be collected: {e}")
+            return {}
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of one process and renders them in the Prometheus text format.
+
+    With multiprocess_dir set (gunicorn), a background thread writes this process'
+    snapshot to <multiprocess_dir>/<pid>.json every flush_interval seconds and
+    render() merges the snapshots of every worker: counters and histograms are
+    added up, dead workers included so totals never go backwards, and gauges of
+    live workers are reported per worker with a pid label.
+    """
+
+    def __init__(self, prefix: str = METRICS_PREFIX, multiprocess_dir: str = None,
+                 flush_interval: float = METRICS_FLUSH_INTERVAL_SECONDS):
+        self.prefix = prefix
+        self.multiprocess_dir = multiprocess_dir
+        self.flush_interval = flush_interval
+        self.metrics: Dict[str, object] = {}
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread = None
+
+    def register(self, metric):
+        metric.name = f"{self.prefix}_{metric.name}" if self.prefix else metric.name
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                  buckets: tuple = METRICS_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name: str, help: str, type: str, fn: Callable[[], dict],
+                 labelnames: Tuple[str, ...] = ()) -> CallbackMetric:
+        return self.register(CallbackMetric(name, help, type, labelnames, fn))
+
+    def snapshot(self) -> dict:
+        return {
+            name: {
+                "type": metric.type,
+                "help": metric.help,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", [])),
+                "samples": [[list(labels), value] for labels, value in metric.samples().items()],
+            }
+            for name, metric in self.metrics.items()
+        }
+
+    def write_snapshot(self):
+        try:
+            os.makedirs(self.multiprocess_dir, exist_ok=True)
+            file_path = os.path.join(self.multiprocess_dir, f"{os.getpid()}.json")
+            temp_file_path = f"{file_path}.tmp"
+            with open(temp_file_path, "w") as snapshot_file:
+                json.dump(self.snapshot(), snapshot_file)
+            os.replace(temp_file_path, file_path)
+        except Exception as e:
+            logging.warning(f"Metrics snapshot not written: {e}")
+
+    def start(self):
+        if self.multiprocess_dir is None or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        if self.multiprocess_dir is not None:
+            self.write_snapshot()
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.write_snapshot()
+
+    def _snapshots(self) -> List[Tuple[int, dict]]:
+        """(pid, snapshot) of this process, live, and of every other worker that wrote one"""
+        snapshots = [(os.getpid(), self.snapshot())]
+        if self.multiprocess_dir is None or not os.path.isdir(self.multiprocess_dir):
+            return snapshots
+        for file_name in os.listdir(self.multiprocess_dir):
+            pid, extension = os.path.splitext(file_name)
+            if extension != ".json" or not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, file_name)) as snapshot_file:
+                    snapshots.append((int(pid), json.load(snapshot_file)))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self) -> str:
+        try:
+            per_worker = self.multiprocess_dir is not None
+            merged: Dict[str, dict] = {}
+            for pid, snapshot in self._snapshots():
+                alive = pid == os.getpid() or _pid_alive(pid)
+                for name, metric in snapshot.items():
+                    entry = merged.setdefault(name, {**metric, "samples": {}})
+                    for labels, value in metric["samples"]:
+                        if metric["type"] == "gauge":
+                            if not alive:
+                                continue
+                            labels = labels + [pid] if per_worker else labels
+                            entry["samples"][tuple(labels)] = value
+                        elif metric["type"] == "histogram":
+                            total = entry["samples"].get(tuple(labels))
+                            entry["samples"][tuple(labels)] = value if total is None else [
+                                a + b for a, b in zip(total, value)]
+                        else:
+                            entry["samples"][tuple(labels)] = entry["samples"].get(tuple(labels), 0) + value
+            lines = []
+            for name, metric in merged.items():
+                labelnames = metric["labelnames"]
+                if metric["type"] == "gauge" and per_worker:
+                    labelnames = labelnames + ["pid"]
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['type']}")
+                for labels, value in sorted(metric["samples"].items(), key=lambda item: str(item[0])):
+                    if metric["type"] != "histogram":
+                        lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(list(metric["buckets"]) + [float("inf")], value[:-1]):
+                        cumulative += count
+                        le = _format_labels(labelnames + ["le"], list(labels) + [_format_value(bound)])
+                        lines.append(f"{name}_bucket{le} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value[-1])}")
+                    lines.append(f"{name}_count{_format_labels(labelnames, labels)} {cumulative}")
+            return "\n".join(lines) + "\n"
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+class _PhaseTimer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(self.labels, time.perf_counter() - self.start)
+        return False
+
+
+class ServingMetrics:
+    """
+    The metrics of the serving app: request counts and latency per route, latency
+    of every scoring phase (parse, preprocess, predict, render, write) per source,
+    batch sizes, and gauges read at scrape time from the model registry, prediction
+    cache, inference executor, batcher, prediction log, database pool and drift monitor.
+    """
+
+    def __init__(self, registry: MetricsRegistry = None):
+        self.registry = registry or MetricsRegistry(multiprocess_dir=os.getenv(METRICS_MULTIPROCESS_DIR_ENV_VAR))
+        registry = self.registry
+        self.requests = registry.counter("http_requests_total", "HTTP requests served",
+                                         ("method", "route", "status"))
+        self.request_seconds = registry.histogram("http_request_duration_seconds",
+                                                  "Time from request start to the last body byte sent",
+                                                  ("method", "route"))
+        self.requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being served")
+        self.phase_seconds = registry.histogram("prediction_phase_duration_seconds",
+                                                "Time spent per scoring phase and batch", ("source", "phase"))
+        self.batch_rows = registry.histogram("prediction_batch_rows", "Rows per scored batch", ("source",),
+                                             buckets=METRICS_BATCH_ROWS_BUCKETS)
+        self.batch_requests = registry.histogram("prediction_batch_requests",
+                                                 "JSON requests coalesced into one batch",
+                                                 buckets=METRICS_BATCH_ROWS_BUCKETS)
+        self.predictions = registry.counter("predictions_total", "Rows scored", ("source",))
+
+    def phase(self, source: str, phase: str) -> _PhaseTimer:
+        """with metrics.phase("csv", "predict"): ... records the block's duration"""
+        return _PhaseTimer(self.phase_seconds, (source, phase))
+
+    def observe_batch(self, source: str, rows: int, requests: int = None):
+        self.batch_rows.observe((source,), rows)
+        self.predictions.inc((source,), rows)
+        if requests is not None:
+            self.batch_requests.observe((), requests)
+
+    def register_sources(self, model_registry=None, executor=None, batcher=None, prediction_log=None,
+                         db_pool=None, drift_monitor=None):
+        """Gauges and counters the components already keep, read when /metrics is scraped"""
+        registry = self.registry
+        if model_registry is not None:
+            registry.callback("model_info", "Served model version", "gauge", labelnames=("version",),
+                              fn=lambda: {(model_registry.version,): 1} if model_registry.is_loaded else {})
+
+            def cache_stats():
+                if not model_registry.is_loaded:
+                    return None
+                loaded_model = model_registry.current()
+                stats = getattr(loaded_model.network_model, "stats", None)
+                return (loaded_model.version, stats()) if stats is not None else None
+
+            def cache_metric(key):
+                def collect():
+                    current = cache_stats()
+                    return {(current[0],): current[1][key]} if current is not None else {}
+                return collect
+
+            for key, type, help in (("hits", "counter", "Rows answered from the prediction cache"),
+                                    ("misses", "counter", "Cacheable rows the model had to score"),
+                                    ("uncacheable", "counter", "Rows with values the cache cannot key"),
+                                    ("evictions", "counter", "Prediction cache evictions"),
+                                    ("size", "gauge", "Feature vectors in the prediction cache"),
+                                    ("hit_rate", "gauge", "Share of cacheable rows answered from the cache")):
+                name = f"prediction_cache_{key}_total" if type == "counter" else f"prediction_cache_{key}"
+                registry.callback(name, help + " (current model)", type, cache_metric(key), labelnames=("version",))
+        if executor is not None:
+            registry.callback("inference_in_flight", "Inference calls running or queued", "gauge",
+                              lambda: {(): executor.in_flight})
+            registry.callback("inference_rejected_total", "Inference calls rejected with 503", "counter",
+                              lambda: {(): executor.rejected})
+        if batcher is not None:
+            registry.callback("prediction_batcher_queue_depth", "JSON requests waiting to be batched", "gauge",
+                              lambda: {(): batcher.queue_depth})
+        if prediction_log is not None:
+            stats = prediction_log.stats
+            registry.callback("prediction_log_buffered_rows", "Rows waiting for the next COPY", "gauge",
+                              lambda: {(): stats()["buffered_rows"]})
+            for key in ("written_rows", "dropped_rows", "failed_flushes"):
+                registry.callback(f"prediction_log_{key}_total", f"Prediction log {key.replace('_', ' ')}",
+                                  "counter", lambda key=key: {(): stats()[key]})
+        if db_pool is not None:
+            for key, type in (("open", "gauge"), ("in_use", "gauge"), ("checkouts", "counter"),
+                              ("replaced", "counter")):
+                name = f"db_pool_{key}_total" if type == "counter" else f"db_pool_{key}"
+                registry.callback(name, f"PostgreSQL pool {key.replace('_', ' ')} connections", type,
+                                  lambda key=key: {(): db_pool.stats()[key]})
+        if drift_monitor is not None:
+            registry.callback("drift_window_rows", "Rows in the current drift window", "gauge",
+                              lambda: {(): drift_monitor.snapshot()["current_window"]["rows"]})
+
+            def last_window(key):
+                def collect():
+                    window = drift_monitor.last_window
+                    if window is None or window.get("drift_detected") is None:
+                        return {}
+                    value = window[key]
+                    return {(window["model_version"],): len(value) if isinstance(value, list) else int(value)}
+                return collect
+
+            registry.callback("drift_detected", "1 when the last closed window drifted from the baseline",
+                              "gauge", last_window("drift_detected"), labelnames=("version",))
+            registry.callback("drift_drifted_features", "Features that drifted in the last closed window",
+                              "gauge", last_window("drifted_columns"), labelnames=("version",))
+
+    def start(self):
+        self.registry.start()
+
+    def stop(self):
+        self.registry.stop()
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting every HTTP request by route template (not raw path, so
+    ids do not multiply the series) and timing it until its last body byte is sent.
+    """
+
+    def __init__(self, app, metrics: ServingMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics = self.metrics
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        metrics.requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.requests_in_flight.dec()
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            metrics.requests.inc((scope["method"], route, str(status[0])))
+            metrics.request_seconds.observe((scope["method"], route), time.perf_counter() - start)
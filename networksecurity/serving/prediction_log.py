@@ -0,0 +1,198 @@
+import io
+import sys
+import time
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import List
+
+import numpy as np
+import pandas as pd
+import psycopg2
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constant.training_pipeline import (
+    PREDICTION_LOG_TABLE_NAME,
+    PREDICTION_LOG_FLUSH_ROWS,
+    PREDICTION_LOG_FLUSH_INTERVAL_SECONDS,
+    PREDICTION_LOG_MAX_BUFFER_ROWS,
+    PREDICTION_LOG_MAX_FLUSH_ATTEMPTS,
+)
+from networksecurity.utils.main_utils.db import PostgresPool, PoolExhaustedError
+
+# the database is unreachable rather than rejecting the rows, retrying later can succeed
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, PoolExhaustedError)
+
+
+class PredictionLogWriter:
+    """
+    Appends every served prediction to a PostgreSQL table from a background thread.
+
+    log() only queues a reference to the scored batch, so a request never waits on
+    the database. The writer thread flushes once flush_rows rows are queued or
+    flush_interval seconds have passed, turning everything queued into one COPY.
+    Features are stored as JSONB with the same keys as the training table, so the
+    log can be fed back into ingestion once labels are known. When the database
+    cannot keep up, batches beyond max_buffer_rows are dropped and counted. A flush
+    the database rejects is retried batch by batch, and a batch that fails
+    max_flush_attempts times is dropped so it cannot hold up the rows behind it.
+    """
+
+    def __init__(self, db_pool: PostgresPool, table_name: str = PREDICTION_LOG_TABLE_NAME,
+                 flush_rows: int = PREDICTION_LOG_FLUSH_ROWS,
+                 flush_interval: float = PREDICTION_LOG_FLUSH_INTERVAL_SECONDS,
+                 max_buffer_rows: int = PREDICTION_LOG_MAX_BUFFER_ROWS,
+                 max_flush_attempts: int = PREDICTION_LOG_MAX_FLUSH_ATTEMPTS):
+        self.db_pool = db_pool
+        self.table_name = table_name
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_buffer_rows = max_buffer_rows
+        self.max_flush_attempts = max_flush_attempts
+        self._buffer = deque()
+        self._buffered_rows = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread = None
+        self._table_ready = False
+        self.written_rows = 0
+        self.dropped_rows = 0
+        self.failed_flushes = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="prediction-log-writer", daemon=True)
+        self._thread.start()
+        logging.info(f"Prediction log writer started, table {self.table_name}")
+
+    def stop(self):
+        """Flush what is queued and stop the writer thread"""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 30)
+            self._thread = None
+
+    def log(self, model_version: str, features: pd.DataFrame, predictions: np.ndarray, source: str):
+        """Queue one scored batch, never blocks on the database and never raises"""
+        try:
+            rows = len(features)
+            if rows == 0:
+                return
+            with self._lock:
+                if self._buffered_rows + rows > self.max_buffer_rows:
+                    self.dropped_rows += rows
+                    return
+                # the last field counts the flushes the database rejected this batch in
+                self._buffer.append((time.time(), model_version, source, features, np.asarray(predictions), 0))
+                self._buffered_rows += rows
+                flush = self._buffered_rows >= self.flush_rows
+            if flush:
+                self._wakeup.set()
+        except Exception as e:
+            logging.error(f"Prediction log could not queue a batch: {NetworkSecurityException(e, sys)}")
+
+    def stats(self) -> dict:
+        return {
+            "buffered_rows": self._buffered_rows,
+            "written_rows": self.written_rows,
+            "dropped_rows": self.dropped_rows,
+            "failed_flushes": self.failed_flushes,
+        }
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+        self.flush()
+
+    def _ensure_table(self, cursor):
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {self.table_name} (
+            id BIGSERIAL PRIMARY KEY,
+            logged_at TIMESTAMPTZ NOT NULL,
+            model_version TEXT,
+            source TEXT NOT NULL,
+            features JSONB NOT NULL,
+            prediction DOUBLE PRECISION NOT NULL
+        );
+        """)
+
+    @staticmethod
+    def to_copy_payload(batches: List[tuple]) -> io.StringIO:
+        """COPY text format lines, NaN features become JSON null"""
+        payload = io.StringIO()
+        for logged_at, model_version, source, features, predictions, *_ in batches:
+            prefix = "\t".join([datetime.fromtimestamp(logged_at, timezone.utc).isoformat(),
+                                model_version or "\\N", source])
+            values = features.to_numpy(dtype=np.float64)
+            present = values[~np.isnan(values)]
+            if np.array_equal(present, np.round(present)):
+                # whole numbers are written as 1, not 1.0, so (data->>column)::smallint reads them like the training table
+                features = features.astype("Int64")
+            # backslash is COPY's escape character
+            documents = features.to_json(orient="records", lines=True).replace("\\", "\\\\").splitlines()
+            payload.writelines(f"{prefix}\t{document}\t{prediction!r}\n"
+                               for document, prediction in zip(documents, predictions.astype(float).tolist()))
+        payload.seek(0)
+        return payload
+
+    def _copy(self, batches: List[tuple]):
+        with self.db_pool.cursor() as cursor:
+            if not self._table_ready:
+                self._ensure_table(cursor)
+            cursor.copy_expert(
+                f"COPY {self.table_name} (logged_at, model_version, source, features, prediction) FROM STDIN;",
+                self.to_copy_payload(batches))
+        self._table_ready = True
+
+    def flush(self) -> int:
+        """Write everything queued in one transaction, returns the number of rows written"""
+        with self._lock:
+            batches = list(self._buffer)
+            self._buffer.clear()
+            rows = self._buffered_rows
+            self._buffered_rows = 0
+        if not batches:
+            return 0
+        try:
+            self._copy(batches)
+            self.written_rows += rows
+            return rows
+        except Exception as e:
+            self.failed_flushes += 1
+            error = e
+        written, failed, rejected = 0, batches, not isinstance(error, CONNECTION_ERRORS)
+        if rejected and len(batches) > 1:
+            # find the batches the database rejects, the others are written now
+            failed = []
+            for batch in batches:
+                try:
+                    self._copy([batch])
+                    written += len(batch[3])
+                except Exception as e:
+                    if isinstance(e, CONNECTION_ERRORS):
+                        rejected = False
+                    failed.append(batch)
+            self.written_rows += written
+        # put the rows back for the next flush while there is room, the oldest are dropped first
+        with self._lock:
+            requeued = dropped = 0
+            for batch in reversed(failed):
+                attempts = batch[5] + 1 if rejected else batch[5]
+                if attempts >= self.max_flush_attempts or self._buffered_rows + len(batch[3]) > self.max_buffer_rows:
+                    dropped += len(batch[3])
+                    continue
+                self._buffer.appendleft(batch[:5] + (attempts,))
+                self._buffered_rows += len(batch[3])
+                requeued += len(batch[3])
+            self.dropped_rows += dropped
+        logging.error(f"Prediction log flush of {rows} rows failed: {written} written on retry, "
+                      f"{requeued} kept for retry, {dropped} dropped: {error}")
+        return written
@@ -0,0 +1,230 @@
+import os
+import sys
+import json
+import shutil
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+
+class ColumnarStore:
+    """
+    Append-only column store on disk.
+
+    Every column is a raw little-endian binary file (<column>.bin) and
+    manifest.json records the columns, their dtypes, the committed row count and
+    free-form metadata. Columns are opened with np.memmap, so readers get the
+    data without parsing or copying. Missing values in integer columns are kept
+    as the dtype's minimum value (e.g. -128 for int8) and come back as NaN from
+    to_dataframe().
+
+    The manifest is replaced atomically after the column files are written, so a
+    crash during append leaves the store at its previous row count; bytes past
+    that count are cut off by the next append.
+    """
+
+    MANIFEST_FILE_NAME = "manifest.json"
+    FORMAT_VERSION = 1
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self._manifest: dict = None
+
+    @property
+    def manifest_file_path(self) -> str:
+        return os.path.join(self.root_dir, self.MANIFEST_FILE_NAME)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_file_path)
+
+    @property
+    def manifest(self) -> dict:
+        if self._manifest is None:
+            if not self.exists():
+                raise NetworkSecurityException(Exception(f"No columnar store at {self.root_dir}"), sys)
+            with open(self.manifest_file_path) as manifest_file:
+                self._manifest = json.load(manifest_file)
+        return self._manifest
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.manifest["columns"])
+
+    @property
+    def num_rows(self) -> int:
+        return self.manifest["num_rows"]
+
+    @property
+    def metadata(self) -> dict:
+        return dict(self.manifest["metadata"])
+
+    def dtype(self, column: str) -> np.dtype:
+        return np.dtype(self.manifest["dtypes"][column])
+
+    def _column_file_path(self, column: str) -> str:
+        return os.path.join(self.root_dir, f"{column}.bin")
+
+    @staticmethod
+    def null_sentinel(dtype: np.dtype):
+        return np.iinfo(dtype).min if np.issubdtype(dtype, np.integer) else np.nan
+
+    def _write_manifest(self, manifest: dict):
+        temp_file_path = f"{self.manifest_file_path}.tmp"
+        with open(temp_file_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        os.replace(temp_file_path, self.manifest_file_path)
+        self._manifest = manifest
+
+    def create(self, columns: List[str], dtypes: Dict[str, str] = None, default_dtype: str = "int8",
+               metadata: dict = None, overwrite: bool = False) -> "ColumnarStore":
+        """Create an empty store, an existing one is kept as it is if it has the same columns unless overwrite"""
+        try:
+            if overwrite and os.path.exists(self.root_dir):
+                shutil.rmtree(self.root_dir)
+                self._manifest = None
+            if self.exists():
+                if self.columns != list(columns):
+                    raise Exception(f"Columnar store {self.root_dir} exists with different columns")
+                return self
+            os.makedirs(self.root_dir, exist_ok=True)
+            dtypes = dtypes or {}
+            for column in columns:
+                open(self._column_file_path(column), "wb").close()
+            self._write_manifest({
+                "format_version": self.FORMAT_VERSION,
+                "columns": list(columns),
+                "dtypes": {column: np.dtype(dtypes.get(column, default_dtype)).str for column in columns},
+                "num_rows": 0,
+                "metadata": metadata or {},
+            })
+            return self
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _encode(self, values, dtype: np.dtype) -> np.ndarray:
+        values = np.asarray(values)
+        if np.issubdtype(dtype, np.integer) and values.dtype.kind == "f":
+            missing = np.isnan(values)
+            values = np.where(missing, self.null_sentinel(dtype), values)
+        return values.astype(dtype, copy=False)
+
+    def append(self, frame, metadata: dict = None) -> int:
+        """Append the rows of a DataFrame (or a dict of equal length arrays), returns the new row count"""
+        try:
+            num_rows = self.num_rows
+            lengths = {len(frame[column]) for column in self.columns}
+            if len(lengths) != 1:
+                raise Exception(f"Columns have different lengths: {lengths}")
+            new_rows = lengths.pop()
+            for column in self.columns:
+                dtype = self.dtype(column)
+                with open(self._column_file_path(column), "r+b") as column_file:
+                    column_file.truncate(num_rows * dtype.itemsize)
+                    column_file.seek(0, os.SEEK_END)
+                    column_file.write(np.ascontiguousarray(self._encode(frame[column], dtype)).tobytes())
+
+            manifest = dict(self.manifest)
+            manifest["num_rows"] = num_rows + new_rows
+            manifest["metadata"] = {**manifest["metadata"], **(metadata or {})}
+            self._write_manifest(manifest)
+            return manifest["num_rows"]
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def column(self, column: str) -> np.ndarray:
+        """Read-only memory map over the committed rows of one column"""
+        dtype = self.dtype(column)
+        if self.num_rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._column_file_path(column), dtype=dtype, mode="r", shape=(self.num_rows,))
+
+    def to_numpy(self, columns: List[str] = None, rows=None, dtype=np.float64) -> np.ndarray:
+        """Stack columns into a (rows, columns) matrix, missing values become NaN"""
+        columns = columns or self.columns
+        matrix = None
+        for i, column in enumerate(columns):
+            values = self.column(column)
+            values = values if rows is None else values[rows]
+            if matrix is None:
+                matrix = np.empty((len(values), len(columns)), dtype=dtype)
+            matrix[:, i] = values
+            sentinel = self.null_sentinel(self.dtype(column))
+            if not np.isnan(sentinel):
+                matrix[values == sentinel, i] = np.nan
+        return matrix
+
+    def to_dataframe(self, columns: List[str] = None, rows=None) -> pd.DataFrame:
+        """Columns without missing values keep their stored dtype, the others become float32 with NaN"""
+        try:
+            data = {}
+            for column in columns or self.columns:
+                values = self.column(column)
+                values = np.array(values if rows is None else values[rows])
+                sentinel = self.null_sentinel(values.dtype)
+                if not np.isnan(sentinel):
+                    missing = values == sentinel
+                    if missing.any():
+                        values = np.where(missing, np.nan, values).astype(np.float32)
+                data[column] = values
+            return pd.DataFrame(data)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def iter_chunks(self, chunk_size: int, columns: List[str] = None):
+        for start in range(0, self.num_rows, chunk_size):
+            yield self.to_dataframe(columns, rows=slice(start, start + chunk_size))
+
+    def subset(self, root_dir: str, rows, chunk_size: int = 100_000, metadata: dict = None) -> "ColumnarStore":
+        """
+        Copy the given rows (an index array, in that order) into a new store at root_dir.
+        Stored values are copied as they are, chunk_size rows at a time.
+        """
+        try:
+            if os.path.exists(root_dir):
+                shutil.rmtree(root_dir)
+            rows = np.asarray(rows)
+            store = type(self)(root_dir).create(self.columns, dtypes=self.manifest["dtypes"], metadata=metadata)
+            columns = {column: self.column(column) for column in self.columns}
+            for start in range(0, len(rows), chunk_size):
+                chunk_rows = rows[start:start + chunk_size]
+                store.append({column: values[chunk_rows] for column, values in columns.items()})
+            logging.info(f"Copied {store.num_rows} rows from columnar store {self.root_dir} to {root_dir}")
+            return store
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @classmethod
+    def write(cls, root_dir: str, frame, columns: List[str] = None, dtypes: Dict[str, str] = None,
+              default_dtype: str = None, metadata: dict = None) -> "ColumnarStore":
+        """
+        Replace whatever is at root_dir with a new store holding frame. Without dtypes or
+        default_dtype the columns keep the dtypes they have in frame.
+        """
+        try:
+            if os.path.exists(root_dir):
+                shutil.rmtree(root_dir)
+            columns = list(columns or frame.columns)
+            if dtypes is None and default_dtype is None:
+                dtypes = {column: np.asarray(frame[column]).dtype.str for column in columns}
+            store = cls(root_dir).create(columns, dtypes=dtypes, default_dtype=default_dtype or "int8",
+                                         metadata=metadata)
+            store.append(frame)
+            logging.info(f"Wrote {store.num_rows} rows to columnar store {root_dir}")
+            return store
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+def read_table(path: str) -> pd.DataFrame:
+    """Read a columnar store directory, or a CSV file for artifacts written by older runs"""
+    try:
+        store = ColumnarStore(path)
+        if store.exists():
+            return store.to_dataframe()
+        return pd.read_csv(path)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
@@ -0,0 +1,181 @@
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from dotenv import load_dotenv
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constant.training_pipeline import (
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_CHECKOUT_TIMEOUT_SECONDS,
+    DB_POOL_HEALTH_CHECK_INTERVAL_SECONDS,
+    DB_CONNECT_TIMEOUT_SECONDS,
+)
+
+load_dotenv()
+
+
+def postgres_connect_kwargs() -> dict:
+    return {
+        "host": os.getenv("POSTGRES_HOST", "localhost"),
+        "port": int(os.getenv("POSTGRES_PORT", 5432)),
+        "database": os.getenv("POSTGRES_DB", "NetworkSecurity"),
+        "user": os.getenv("POSTGRES_USER", "postgres"),
+        "password": os.getenv("POSTGRES_PASSWORD", ""),
+        "connect_timeout": DB_CONNECT_TIMEOUT_SECONDS,
+    }
+
+
+class PoolExhaustedError(Exception):
+    pass
+
+
+class PostgresPool:
+    """
+    Thread-safe PostgreSQL connection pool with blocking checkout.
+
+    min_size connections are opened on first use and kept open between checkouts,
+    so hot paths pay no connect latency; bursts open more, up to max_size, which
+    are closed again when returned. A checkout waits up to checkout_timeout
+    seconds for a free connection instead of failing at once like
+    ThreadedConnectionPool.getconn. A connection that sat idle longer than
+    health_check_interval is pinged before it is handed out, broken ones are
+    dropped and replaced. The pool belongs to the process that created it: after
+    a fork the child builds its own and never touches the parent's sockets.
+    """
+
+    def __init__(self, min_size: int = DB_POOL_MIN_SIZE, max_size: int = DB_POOL_MAX_SIZE,
+                 checkout_timeout: float = DB_POOL_CHECKOUT_TIMEOUT_SECONDS,
+                 health_check_interval: float = DB_POOL_HEALTH_CHECK_INTERVAL_SECONDS, **connect_kwargs):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.connect_kwargs = connect_kwargs or postgres_connect_kwargs()
+        self._lock = threading.Lock()
+        self._pool: ThreadedConnectionPool = None
+        self._pid: int = None
+        self._slots: threading.BoundedSemaphore = None
+        self._last_used = {}
+        self.checkouts = 0
+        self.replaced = 0
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                # a pool inherited through fork is dropped without closing, closing would end the parent's sessions
+                self._pool = ThreadedConnectionPool(self.min_size, self.max_size, **self.connect_kwargs)
+                self._pid = os.getpid()
+                self._slots = threading.BoundedSemaphore(self.max_size)
+                self._last_used = {}
+                logging.info(f"Opened PostgreSQL pool ({self.min_size}..{self.max_size} connections) "
+                             f"to {self.connect_kwargs.get('host')}/{self.connect_kwargs.get('database')}")
+            return self._pool
+
+    def _healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - self._last_used.get(id(conn), 0.0) < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection for the duration of the block. The caller commits; an exception
+        rolls back, and the pool rolls back a connection returned inside a transaction.
+        """
+        pool = self._get_pool()
+        slots = self._slots
+        if not slots.acquire(timeout=self.checkout_timeout):
+            raise PoolExhaustedError(f"No PostgreSQL connection free within {self.checkout_timeout}s "
+                                     f"(pool size {self.max_size})")
+        conn = None
+        try:
+            conn = pool.getconn()
+            # every idle connection may have died with the server, at most max_size get replaced
+            for _ in range(self.max_size):
+                if self._healthy(conn):
+                    break
+                pool.putconn(conn, close=True)
+                self.replaced += 1
+                logging.warning("Replaced a broken PostgreSQL connection")
+                conn = pool.getconn()
+            self.checkouts += 1
+            try:
+                yield conn
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+        finally:
+            if conn is not None:
+                self._last_used[id(conn)] = time.monotonic()
+                pool.putconn(conn, close=bool(conn.closed))
+            slots.release()
+
+    @contextmanager
+    def cursor(self, **cursor_kwargs):
+        """Cursor on a checked out connection, committed when the block exits cleanly"""
+        with self.connection() as conn:
+            with conn.cursor(**cursor_kwargs) as cursor:
+                yield cursor
+            conn.commit()
+
+    def ping(self) -> bool:
+        try:
+            with self.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except Exception as e:
+            logging.error(f"PostgreSQL is unreachable: {e}")
+            return False
+
+    def stats(self) -> dict:
+        pool = self._pool if self._pid == os.getpid() else None
+        return {
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "open": len(pool._pool) + len(pool._used) if pool is not None else 0,
+            "in_use": len(pool._used) if pool is not None else 0,
+            "checkouts": self.checkouts,
+            "replaced": self.replaced,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.closeall()
+            self._pool = None
+
+
+_default_pool: PostgresPool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_pool() -> PostgresPool:
+    """The process-wide pool every database touch point shares, sized by DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE"""
+    global _default_pool
+    try:
+        with _default_pool_lock:
+            if _default_pool is None:
+                _default_pool = PostgresPool(
+                    min_size=int(os.getenv("DB_POOL_MIN_SIZE", DB_POOL_MIN_SIZE)),
+                    max_size=int(os.getenv("DB_POOL_MAX_SIZE", DB_POOL_MAX_SIZE)),
+                )
+            return _default_pool
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import glob
+import pickle
+import hashlib
+import platform
+
+import numpy as np
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+FORMAT_NAME = "networksecurity-artifact"
+FORMAT_VERSION = 1
+# buffers smaller than this stay inside the pickle stream
+OUT_OF_BAND_MIN_BYTES = 64 * 1024
+
+
+def manifest_file_path(file_path: str) -> str:
+    return f"{file_path}.manifest.json"
+
+
+def _sha256(data) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _library_versions() -> dict:
+    versions = {"python": platform.python_version(), "numpy": np.__version__}
+    try:
+        import sklearn
+        versions["scikit-learn"] = sklearn.__version__
+    except ImportError:
+        pass
+    return versions
+
+
+def dump_artifact(file_path: str, obj: object) -> dict:
+    """
+    Pickle obj with protocol 5, moving every large contiguous buffer (numpy arrays:
+    the imputer's training matrix, tree node arrays ...) out of band into its own
+    .npy file. Writes:
+
+        <file_path>                   the pickle stream
+        <file_path>.<digest>/<i>.npy  one uint8 .npy per out-of-band buffer
+        <file_path>.manifest.json     format version, library versions, sizes and sha256 checksums
+
+    Buffer files are never rewritten in place and the stream and manifest are
+    replaced atomically, so a process still mapping the previous buffers keeps
+    valid pages and a reader never pairs a stream with the wrong buffers.
+    """
+    try:
+        buffers = []
+
+        def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+            if buffer.raw().nbytes < OUT_OF_BAND_MIN_BYTES:
+                return True
+            buffers.append(buffer)
+            return False
+
+        stream = pickle.dumps(obj, protocol=5, buffer_callback=buffer_callback)
+        stream_sha256 = _sha256(stream)
+        entries = [{"file": f"{i}.npy", "nbytes": buffer.raw().nbytes, "sha256": _sha256(buffer.raw())}
+                   for i, buffer in enumerate(buffers)]
+        # the buffer directory is content addressed, an identical dump reuses it untouched
+        content_sha256 = _sha256("".join([stream_sha256] + [entry["sha256"] for entry in entries]).encode())
+        directory, file_name = os.path.split(file_path)
+        os.makedirs(directory or ".", exist_ok=True)
+        buffers_dir_name = f"{file_name}.{content_sha256[:12]}"
+        buffers_dir = os.path.join(directory, buffers_dir_name)
+        if not os.path.isdir(buffers_dir):
+            temp_dir = f"{buffers_dir}.{os.getpid()}.tmp"
+            os.makedirs(temp_dir, exist_ok=True)
+            for buffer, entry in zip(buffers, entries):
+                np.save(os.path.join(temp_dir, entry["file"]), np.frombuffer(buffer.raw(), dtype=np.uint8))
+            os.rename(temp_dir, buffers_dir)
+
+        manifest = {
+            "format": FORMAT_NAME,
+            "format_version": FORMAT_VERSION,
+            "object_type": f"{type(obj).__module__}.{type(obj).__qualname__}",
+            "versions": _library_versions(),
+            "pickle_sha256": stream_sha256,
+            "pickle_nbytes": len(stream),
+            "buffers_dir": buffers_dir_name,
+            "buffers": entries,
+        }
+        for target, content in ((file_path, stream), (manifest_file_path(file_path),
+                                                      json.dumps(manifest, indent=2).encode())):
+            temp_file_path = f"{target}.{os.getpid()}.tmp"
+            with open(temp_file_path, "wb") as file_obj:
+                file_obj.write(content)
+            os.replace(temp_file_path, target)
+
+        # old buffer files are unlinked, not overwritten, so existing mappings stay intact
+        for stale_dir in glob.glob(os.path.join(glob.escape(directory), glob.escape(file_name) + ".*")):
+            if (os.path.isdir(stale_dir) and os.path.basename(stale_dir) != buffers_dir_name
+                    and not stale_dir.endswith(".tmp")):
+                for stale_file in glob.glob(os.path.join(glob.escape(stale_dir), "*.npy")):
+                    os.remove(stale_file)
+                os.rmdir(stale_dir)
+        logging.info(f"Saved {manifest['object_type']} to {file_path}: {len(stream)} pickle bytes, "
+                     f"{sum(entry['nbytes'] for entry in entries)} bytes in {len(entries)} mapped buffers")
+        return manifest
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def read_manifest(file_path: str) -> dict:
+    """Manifest of an artifact written by dump_artifact, None for a plain pickle file"""
+    path = manifest_file_path(file_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} manifest")
+    if manifest["format_version"] > FORMAT_VERSION:
+        raise ValueError(f"{file_path} has format version {manifest['format_version']}, "
+                         f"this code reads up to {FORMAT_VERSION}")
+    return manifest
+
+
+def load_artifact(file_path: str, verify_checksums: bool = False) -> object:
+    """
+    Load an artifact written by dump_artifact. Out-of-band buffers are opened with
+    np.load(mmap_mode="r"), so arrays are backed by read-only pages of the OS cache
+    that every process loading the same artifact shares. The pickle stream is always
+    checked against the manifest; with verify_checksums every buffer is too, which
+    reads each of them once.
+    """
+    try:
+        manifest = read_manifest(file_path)
+        with open(file_path, "rb") as file_obj:
+            stream = file_obj.read()
+        if manifest is None:
+            return pickle.loads(stream)
+        if len(stream) != manifest["pickle_nbytes"] or _sha256(stream) != manifest["pickle_sha256"]:
+            raise ValueError(f"{file_path} does not match its manifest, it may still be being written")
+
+        buffers_dir = os.path.join(os.path.dirname(file_path), manifest["buffers_dir"])
+        buffers = []
+        for entry in manifest["buffers"]:
+            array = np.load(os.path.join(buffers_dir, entry["file"]), mmap_mode="r")
+            if array.nbytes != entry["nbytes"]:
+                raise ValueError(f"Buffer {entry['file']} of {file_path} has {array.nbytes} bytes, "
+                                 f"expected {entry['nbytes']}")
+            if verify_checksums and _sha256(array) != entry["sha256"]:
+                raise ValueError(f"Checksum mismatch for buffer {entry['file']} of {file_path}")
+            buffers.append(pickle.PickleBuffer(array))
+        return pickle.loads(stream, buffers=buffers)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
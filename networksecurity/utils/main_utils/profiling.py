@@ -0,0 +1,251 @@
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import resource
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constant.training_pipeline import PIPELINE_PROFILE_ENV_VAR, PIPELINE_PROFILE_TOP_N
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+
+def profile_modes() -> List[str]:
+    """Profilers requested through PIPELINE_PROFILE_ENV_VAR, "all" turns on every one"""
+    value = os.getenv(PIPELINE_PROFILE_ENV_VAR, "").lower()
+    modes = [mode.strip() for mode in value.split(",") if mode.strip()]
+    if "all" in modes or "1" in modes:
+        return list(PROFILE_MODES)
+    unknown = [mode for mode in modes if mode not in PROFILE_MODES]
+    if unknown:
+        logging.warning(f"Ignoring unknown {PIPELINE_PROFILE_ENV_VAR} values {unknown}")
+    return [mode for mode in PROFILE_MODES if mode in modes]
+
+
+def _proc_status_mb(key: str) -> float:
+    """VmRSS / VmHWM of this process in MB, None where /proc is not available"""
+    try:
+        with open("/proc/self/status") as status_file:
+            for line in status_file:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_mb() -> float:
+    return _proc_status_mb("VmRSS")
+
+
+def peak_rss_mb() -> float:
+    peak = _proc_status_mb("VmHWM")
+    if peak is None:
+        # ru_maxrss is in KB on Linux and in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return peak
+
+
+def reset_peak_rss() -> bool:
+    """Restart the kernel's RSS high-water mark (Linux), False where it cannot be reset"""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+@dataclass
+class SectionProfile:
+    name: str
+    kind: str
+    wall_seconds: float = 0.0
+    # CPU of this process on all of its threads; joblib worker processes report their own in details
+    cpu_seconds: float = 0.0
+    rss_mb: float = None
+    peak_rss_mb: float = None
+    # False when the high-water mark could not be reset and peak_rss_mb covers the process lifetime
+    peak_rss_scoped: bool = True
+    rows: int = 0
+    details: Dict = field(default_factory=dict)
+    started: float = 0.0
+
+    def add_rows(self, rows: int):
+        self.rows += int(rows)
+
+
+class RunProfiler:
+    """
+    Collects a SectionProfile for every stage, model or other section of one pipeline run.
+
+    section() measures wall time, CPU time and peak RSS of its block and, for the modes
+    enabled through PIPELINE_PROFILE_ENV_VAR, records a cProfile of every thread started
+    inside it and tracemalloc's peak and top allocation sites. Code deeper down reports
+    into the innermost open section through the module's add_rows() and profile_section()
+    without being handed the profiler. Sections nest and are opened from one thread at a
+    time, the stages of the pipeline run one after the other.
+    """
+
+    def __init__(self, run: str, profile_dir: str = None, modes: List[str] = None):
+        self.run = run
+        self.profile_dir = profile_dir
+        self.modes = profile_modes() if modes is None else list(modes)
+        self.sections: List[SectionProfile] = []
+        self.extra: Dict = {}
+        self._stack: List[SectionProfile] = []
+        self._start = time.perf_counter()
+
+    @property
+    def current(self) -> SectionProfile:
+        return self._stack[-1] if self._stack else None
+
+    @contextmanager
+    def section(self, name: str, kind: str = "stage", rows: int = 0, profile: bool = None):
+        """Measure the block, profile defaults to True for stages when a profile mode is set"""
+        profile = kind == "stage" if profile is None else profile
+        record = SectionProfile(name=name, kind=kind, rows=rows, started=time.perf_counter() - self._start)
+        self._stack.append(record)
+        record.peak_rss_scoped = reset_peak_rss()
+        profilers = self._start_profilers(profile)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - wall
+            record.cpu_seconds = time.process_time() - cpu
+            record.rss_mb = current_rss_mb()
+            peak = peak_rss_mb()
+            # a nested section restarted the high-water mark, its peak counts for this one too
+            nested = [section.peak_rss_mb for section in self.sections
+                      if section.started >= record.started and section is not record and section.peak_rss_mb]
+            record.peak_rss_mb = max([peak] + nested)
+            self._stop_profilers(record, profilers)
+            self._stack.pop()
+            self.sections.append(record)
+            logging.info(f"[profile] {kind} {name}: {record.wall_seconds:.2f}s wall, {record.cpu_seconds:.2f}s cpu, "
+                         f"peak rss {record.peak_rss_mb:.0f} MB, {record.rows} rows")
+
+    def _start_profilers(self, profile: bool) -> dict:
+        profilers = {}
+        if not profile:
+            return profilers
+        if "cprofile" in self.modes:
+            thread_profiles = [cProfile.Profile()]
+
+            def profile_new_thread(*args):
+                # runs once as the first profile event of a thread started in the section,
+                # enabling a profiler replaces this hook for that thread
+                thread_profile = cProfile.Profile()
+                thread_profiles.append(thread_profile)
+                thread_profile.enable()
+
+            threading.setprofile(profile_new_thread)
+            thread_profiles[0].enable()
+            profilers["cprofile"] = thread_profiles
+        if "tracemalloc" in self.modes:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            profilers["tracemalloc"] = started
+        return profilers
+
+    def _stop_profilers(self, record: SectionProfile, profilers: dict):
+        try:
+            if "cprofile" in profilers:
+                threading.setprofile(None)
+                thread_profiles = profilers["cprofile"]
+                thread_profiles[0].disable()
+                stats = pstats.Stats(thread_profiles[0])
+                for thread_profile in thread_profiles[1:]:
+                    stats.add(thread_profile)
+                record.details["cprofile"] = self._top_functions(stats)
+                if self.profile_dir is not None:
+                    os.makedirs(self.profile_dir, exist_ok=True)
+                    profile_file_path = os.path.join(self.profile_dir, f"{record.name}.prof")
+                    stats.dump_stats(profile_file_path)
+                    record.details["cprofile_file_path"] = profile_file_path
+            if "tracemalloc" in profilers:
+                _, peak = tracemalloc.get_traced_memory()
+                top = tracemalloc.take_snapshot().statistics("lineno")[:PIPELINE_PROFILE_TOP_N]
+                record.details["tracemalloc"] = {
+                    "peak_mb": peak / (1024 * 1024),
+                    "top_allocations": [{"where": str(stat.traceback[0]), "size_mb": stat.size / (1024 * 1024),
+                                         "count": stat.count} for stat in top],
+                }
+                if profilers["tracemalloc"]:
+                    tracemalloc.stop()
+        except Exception as e:
+            # a failing profiler never fails the run it measures
+            logging.warning(f"Profiling {record.name} failed: {NetworkSecurityException(e, sys)}")
+
+    @staticmethod
+    def _top_functions(stats: pstats.Stats) -> List[dict]:
+        rows = []
+        for (file_name, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({"function": f"{file_name}:{line}({function})", "calls": calls,
+                         "tottime": tottime, "cumtime": cumtime})
+        return sorted(rows, key=lambda row: row["cumtime"], reverse=True)[:PIPELINE_PROFILE_TOP_N]
+
+    def report(self) -> dict:
+        return {
+            "run": self.run,
+            "wall_seconds": time.perf_counter() - self._start,
+            "profile_modes": self.modes,
+            "sections": [asdict(section) for section in sorted(self.sections, key=lambda section: section.started)],
+            **self.extra,
+        }
+
+    def save(self, file_path: str):
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w") as report_file:
+                json.dump(self.report(), report_file, indent=2, default=repr)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+_active_profiler: RunProfiler = None
+
+
+@contextmanager
+def activate(profiler: RunProfiler):
+    """Make profiler the one add_rows() and profile_section() report to for the block"""
+    global _active_profiler
+    previous, _active_profiler = _active_profiler, profiler
+    try:
+        yield profiler
+    finally:
+        _active_profiler = previous
+
+
+def active_profiler() -> RunProfiler:
+    return _active_profiler
+
+
+def add_rows(rows: int):
+    """Count rows processed by the innermost open section, a no-op outside a profiled run"""
+    profiler = _active_profiler
+    if profiler is not None and profiler.current is not None:
+        profiler.current.add_rows(rows)
+
+
+@contextmanager
+def profile_section(name: str, kind: str, rows: int = 0):
+    """A section of the active profiler, or an unrecorded SectionProfile outside a profiled run"""
+    profiler = _active_profiler
+    if profiler is None:
+        yield SectionProfile(name=name, kind=kind, rows=rows)
+        return
+    with profiler.section(name, kind=kind, rows=rows, profile=False) as record:
+        yield record
@@ -4,10 +4,13 @@ from networksecurity.logging.logger import logging
 import os,sys
 import numpy as np
 import dill
-import pickle
 
 from sklearn.metrics import r2_score
-from sklearn.model_selection import GridSearchCV
+
+from networksecurity.constant.training_pipeline import MODEL_TRAINER_SEARCH_STRATEGY
+from networksecurity.utils.ml_utils.model.search import CachedGridSearch, HalvingSearch
+from networksecurity.utils.main_utils.mmap_pickle import dump_artifact, load_artifact
+from networksecurity.utils.main_utils.profiling import profile_section
 
 def read_yaml_file(file_path: str) -> dict:
     try:
@@ -42,22 +45,23 @@ def save_numpy_array_data(file_path: str, array: np.array):
         raise NetworkSecurityException(e, sys) from e
     
 def save_object(file_path: str, obj: object) -> None:
+    """
+    Save obj in the memory-mapped artifact format: a pickle stream at file_path, its
+    large arrays as .npy files next to it and a manifest with versions and checksums
+    """
     try:
         logging.info("Entered the save_object method of MainUtils class")
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "wb") as file_obj:
-            pickle.dump(obj, file_obj)
+        dump_artifact(file_path, obj)
         logging.info("Exited the save_object method of MainUtils class")
     except Exception as e:
         raise NetworkSecurityException(e, sys) from e
     
-def load_object(file_path: str, ) -> object:
+def load_object(file_path: str, verify_checksums: bool = False) -> object:
+    """Load an object saved by save_object, arrays stay memory-mapped read-only; plain pickle files still load"""
     try:
         if not os.path.exists(file_path):
             raise Exception(f"The file: {file_path} is not exists")
-        with open(file_path, "rb") as file_obj:
-            print(file_obj)
-            return pickle.load(file_obj)
+        return load_artifact(file_path, verify_checksums=verify_checksums)
     except Exception as e:
         raise NetworkSecurityException(e, sys) from e
     
@@ -75,33 +79,37 @@ def load_numpy_array_data(file_path: str) -> np.array:
     
 
 
-def evaluate_models(X_train, y_train,X_test,y_test,models,param):
+def evaluate_models(X_train, y_train,X_test,y_test,models,param,search_strategy=MODEL_TRAINER_SEARCH_STRATEGY):
+    """
+    Tunes every model on X_train (see CachedGridSearch / HalvingSearch), replaces each
+    entry of models with its refitted best estimator and returns {name: test r2 score}.
+    """
     try:
         report = {}
 
-        for i in range(len(list(models))):
-            model = list(models.values())[i]
-            para=param[list(models.keys())[i]]
-
-            gs = GridSearchCV(model,para,cv=3)
-            gs.fit(X_train,y_train)
-
-            model.set_params(**gs.best_params_)
-            model.fit(X_train,y_train)
+        if search_strategy == "halving":
+            search = HalvingSearch()
+        else:
+            search = CachedGridSearch()
+        with profile_section("search", kind="search", rows=len(X_train)) as section:
+            results = search.fit(models, param, X_train, y_train)
+            section.details["candidate_stats"] = getattr(search, "candidate_stats", [])
 
-            #model.fit(X_train, y_train)  # Train model
+        for name, (best_estimator, best_params, best_score) in results.items():
+            logging.info(f"{name}: best params {best_params}, cv score {best_score:.4f}")
+            models[name] = best_estimator
 
-            y_train_pred = model.predict(X_train)
+            # the section times scoring on the test split, the search's own figures are in details
+            with profile_section(name, kind="model", rows=len(X_test)) as section:
+                y_test_pred = best_estimator.predict(X_test)
 
-            y_test_pred = model.predict(X_test)
+                test_model_score = r2_score(y_test, y_test_pred)
+                section.details.update(getattr(search, "model_stats", {}).get(name, {}),
+                                       best_params=best_params, cv_score=best_score, test_score=test_model_score)
 
-            train_model_score = r2_score(y_train, y_train_pred)
-
-            test_model_score = r2_score(y_test, y_test_pred)
-
-            report[list(models.keys())[i]] = test_model_score
+            report[name] = test_model_score
 
         return report
 
     except Exception as e:
-        raise NetworkSecurityException(e, sys)
\ No newline at end of file
+        raise NetworkSecurityException(e, sys)
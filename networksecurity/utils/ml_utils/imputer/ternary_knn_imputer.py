@@ -0,0 +1,163 @@
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+
+TERNARY_VALUES = (-1, 0, 1)
+
+
+def popcount(array: np.ndarray) -> np.ndarray:
+    """Number of set bits of every element of a uint64 array"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(array)
+    counts = np.unpackbits(array.view(np.uint8).reshape(array.shape + (8,)), axis=-1)
+    return counts.sum(axis=-1, dtype=np.uint8)
+
+
+def pack_ternary_rows(values: np.ndarray):
+    """
+    Packs a float matrix of {-1, 0, 1, NaN} into three uint64 bit planes per row:
+    which features are negative, positive and present (not NaN).
+    """
+    bits = np.left_shift(np.uint64(1), np.arange(values.shape[1], dtype=np.uint64))
+    present = ~np.isnan(values)
+    negative = (values == -1) & present
+    positive = (values == 1) & present
+    return (np.bitwise_or.reduce(np.where(negative, bits, np.uint64(0)), axis=1),
+            np.bitwise_or.reduce(np.where(positive, bits, np.uint64(0)), axis=1),
+            np.bitwise_or.reduce(np.where(present, bits, np.uint64(0)), axis=1))
+
+
+class TernaryKNNImputer(TransformerMixin, BaseEstimator):
+    """
+    Drop-in replacement for KNNImputer(n_neighbors, weights="uniform") on
+    features that only take the values -1, 0 and 1.
+
+    Training rows are packed into 64 bit planes and deduplicated at fit time, so
+    the nan-euclidean distance from a row to every distinct training pattern is a
+    handful of AND/XOR/popcount operations instead of a dense float product with
+    every training row. Distances are reproduced bit for bit. KNNImputer breaks
+    ties between equally distant donors arbitrarily (np.argpartition); here ties
+    go to the pattern seen first in the training data, so results only differ
+    from KNNImputer when the k-th nearest donor is tied with a donor holding a
+    different value.
+    """
+
+    def __init__(self, n_neighbors: int = 3, chunk_size: int = 256):
+        self.n_neighbors = n_neighbors
+        self.chunk_size = chunk_size
+
+    def _validate(self, X, reset: bool) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            columns = np.asarray(X.columns, dtype=object)
+            if reset:
+                self.feature_names_in_ = columns
+            elif hasattr(self, "feature_names_in_") and not np.array_equal(columns, self.feature_names_in_):
+                raise ValueError("The feature names should match those that were passed during fit.")
+            values = X.to_numpy(dtype=np.float64, copy=True)
+        else:
+            values = np.array(X, dtype=np.float64)
+        if values.ndim != 2:
+            raise ValueError(f"Expected a 2D array, got {values.ndim}D")
+        if reset:
+            if values.shape[1] > 64:
+                raise ValueError(f"{type(self).__name__} supports at most 64 features, got {values.shape[1]}")
+            self.n_features_in_ = values.shape[1]
+        elif values.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {values.shape[1]} features, but {type(self).__name__} "
+                             f"is expecting {self.n_features_in_} features as input.")
+        observed = values[~np.isnan(values)]
+        if not np.isin(observed, TERNARY_VALUES).all():
+            raise ValueError(f"{type(self).__name__} only accepts values in {TERNARY_VALUES} or NaN")
+        return values
+
+    def fit(self, X, y=None):
+        try:
+            values = self._validate(X, reset=True)
+            mask = np.isnan(values)
+            self._valid_mask = ~np.all(mask, axis=0)
+
+            # column means of the observed values, used when a row shares no feature with any donor
+            self.column_means_ = np.ma.array(values, mask=mask).mean(axis=0).filled(np.nan)
+
+            negative, positive, present = pack_ternary_rows(values)
+            patterns = np.stack([negative, positive, present], axis=1)
+            unique, first_index, counts = np.unique(patterns, axis=0, return_index=True, return_counts=True)
+            order = np.argsort(first_index, kind="stable")
+            self.negative_, self.positive_, self.present_ = (unique[order, 0], unique[order, 1], unique[order, 2])
+            self.pattern_counts_ = counts[order]
+            self.pattern_values_ = values[first_index[order]]
+
+            # squared distance level for every (sum of squares, shared features) pair,
+            # computed exactly like sklearn.metrics.pairwise.nan_euclidean_distances
+            n_features = self.n_features_in_
+            sum_squares = np.arange(4 * n_features + 1, dtype=np.float64)[:, None]
+            shared = np.maximum(np.arange(n_features + 1, dtype=np.float64), 1)[None, :]
+            distance = np.sqrt(sum_squares / shared * n_features)
+            _, levels = np.unique(distance, return_inverse=True)
+            levels = levels.reshape(distance.shape).astype(np.int64)
+            levels[:, 0] = np.iinfo(np.int32).max
+            self.distance_levels_ = levels
+            logging.info(f"{type(self).__name__} fitted on {len(values)} rows, "
+                         f"{len(self.pattern_counts_)} distinct patterns")
+            return self
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _pattern_keys(self, values: np.ndarray) -> np.ndarray:
+        """Sort keys of every training pattern for each row: distance level first, pattern order second"""
+        negative, positive, present = pack_ternary_rows(values)
+        shared = present[:, None] & self.present_[None, :]
+        different = (negative[:, None] ^ self.negative_[None, :]) | (positive[:, None] ^ self.positive_[None, :])
+        opposite = (negative[:, None] & self.positive_[None, :]) | (positive[:, None] & self.negative_[None, :])
+        # |a - b| is 1 or 2, so the squared difference is 1 per differing feature plus 3 per opposite sign
+        sum_squares = popcount(different & shared).astype(np.int64) + 3 * popcount(opposite & shared)
+        levels = self.distance_levels_[sum_squares, popcount(shared)]
+        return levels * len(self.pattern_counts_) + np.arange(len(self.pattern_counts_))
+
+    def _impute_column(self, keys: np.ndarray, column: int) -> np.ndarray:
+        donors = np.flatnonzero(~np.isnan(self.pattern_values_[:, column]))
+        if len(donors) == 0:
+            return np.full(len(keys), self.column_means_[column])
+        keys = keys[:, donors]
+        n_candidates = min(self.n_neighbors, len(donors))
+        nearest = np.argpartition(keys, n_candidates - 1, axis=1)[:, :n_candidates]
+        nearest = np.take_along_axis(nearest, np.argsort(np.take_along_axis(keys, nearest, axis=1), axis=1), axis=1)
+
+        no_shared_feature = np.take_along_axis(keys, nearest, axis=1) >= (
+            np.iinfo(np.int32).max * len(self.pattern_counts_))
+        counts = self.pattern_counts_[donors][nearest]
+        # take donors pattern by pattern until n_neighbors rows are used, like KNNImputer does row by row
+        taken_before = np.cumsum(counts, axis=1) - counts
+        weights = np.clip(self.n_neighbors - taken_before, 0, counts)
+        weights = np.where(no_shared_feature, 0, weights)
+        donor_values = self.pattern_values_[donors][nearest, column]
+
+        total = weights.sum(axis=1)
+        imputed = np.full(len(keys), self.column_means_[column])
+        has_donor = total > 0
+        imputed[has_donor] = (weights * donor_values).sum(axis=1)[has_donor] / total[has_donor]
+        return imputed
+
+    def transform(self, X):
+        try:
+            check_is_fitted(self, "pattern_counts_")
+            values = self._validate(X, reset=False)
+            mask = np.isnan(values)
+            receivers = np.flatnonzero(mask[:, self._valid_mask].any(axis=1))
+            for start in range(0, len(receivers), self.chunk_size):
+                rows = receivers[start:start + self.chunk_size]
+                keys = self._pattern_keys(values[rows])
+                for column in np.flatnonzero(self._valid_mask & mask[rows].any(axis=0)):
+                    column_rows = np.flatnonzero(mask[rows, column])
+                    values[rows[column_rows], column] = self._impute_column(keys[column_rows], column)
+            return values[:, self._valid_mask]
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
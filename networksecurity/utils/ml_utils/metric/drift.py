@@ -0,0 +1,184 @@
+import sys
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, kstwo, ks_2samp
+
+from networksecurity.exception.exception import NetworkSecurityException
+
+from networksecurity.constant.training_pipeline import (
+    DATA_VALIDATION_DRIFT_THRESHOLDS,
+    DATA_VALIDATION_DRIFT_EXTRA_TESTS,
+    DATA_VALIDATION_DRIFT_KS_EXACT_MAX_ROWS,
+)
+
+# integer columns spanning at most this many values are counted with one bincount, no sorting
+DENSE_DOMAIN_MAX_SIZE = 4096
+# probability floor for PSI, an empty bin on one side would otherwise give an infinite score
+PSI_EPSILON = 1e-4
+
+
+def value_domain(*matrices: np.ndarray) -> np.ndarray:
+    """Sorted distinct non-NaN values found in any of the matrices"""
+    if all(np.issubdtype(matrix.dtype, np.integer) for matrix in matrices):
+        non_empty = [matrix for matrix in matrices if matrix.size]
+        if not non_empty:
+            return np.empty(0, dtype=np.int64)
+        low = min(int(matrix.min()) for matrix in non_empty)
+        high = max(int(matrix.max()) for matrix in non_empty)
+        if high - low < DENSE_DOMAIN_MAX_SIZE:
+            return np.arange(low, high + 1)
+    values = np.concatenate([np.ravel(matrix) for matrix in matrices])
+    if values.dtype.kind == "f":
+        values = values[~np.isnan(values)]
+    return np.unique(values)
+
+
+def value_histograms(matrix: np.ndarray, domain: np.ndarray, chunk_size: int = 1_000_000) -> np.ndarray:
+    """
+    Per column counts of every domain value, shape (columns, len(domain)).
+    NaN and values outside the domain are not counted. Rows are processed
+    chunk_size cells at a time, so memory does not grow with the input.
+    """
+    matrix = np.asarray(matrix)
+    n_rows, n_columns = matrix.shape
+    n_values = len(domain)
+    counts = np.zeros(n_columns * n_values, dtype=np.int64)
+    if n_values == 0:
+        return counts.reshape(n_columns, 0)
+    offsets = np.arange(n_columns, dtype=np.int64) * n_values
+    dense = np.issubdtype(matrix.dtype, np.integer) and np.array_equal(
+        domain, np.arange(domain[0], domain[0] + n_values))
+    step = max(chunk_size // max(n_columns, 1), 1)
+    for start in range(0, n_rows, step):
+        chunk = matrix[start:start + step]
+        if dense:
+            codes = chunk.astype(np.int64) - int(domain[0])
+            valid = (codes >= 0) & (codes < n_values)
+        else:
+            codes = np.clip(np.searchsorted(domain, chunk), 0, n_values - 1)
+            valid = domain[codes] == chunk
+        counts += np.bincount((codes + offsets)[valid], minlength=n_columns * n_values)
+    return counts.reshape(n_columns, n_values)
+
+
+def _probabilities(counts: np.ndarray) -> np.ndarray:
+    totals = counts.sum(axis=1, keepdims=True)
+    return counts / np.maximum(totals, 1)
+
+
+def ks_test(base_counts: np.ndarray, current_counts: np.ndarray, domain: np.ndarray,
+            exact_max_rows: int = DATA_VALIDATION_DRIFT_KS_EXACT_MAX_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Two-sided two-sample Kolmogorov-Smirnov test of every column from its histograms.
+    The statistic equals ks_2samp's. p-values use Smirnov's asymptotic distribution
+    (kstwo), columns with at most exact_max_rows values on both sides get ks_2samp's
+    exact p-value instead.
+    """
+    base_cdf = np.cumsum(_probabilities(base_counts), axis=1)
+    current_cdf = np.cumsum(_probabilities(current_counts), axis=1)
+    statistic = np.abs(base_cdf - current_cdf).max(axis=1, initial=0.0)
+
+    n1 = base_counts.sum(axis=1).astype(np.float64)
+    n2 = current_counts.sum(axis=1).astype(np.float64)
+    en = np.round(n1 * n2 / np.maximum(n1 + n2, 1))
+    p_value = np.clip(kstwo.sf(statistic, np.maximum(en, 1)), 0, 1)
+    p_value[(n1 == 0) | (n2 == 0)] = np.nan
+
+    # ks_2samp only looks at the sorted values, so the histograms rebuild its input exactly
+    for column in np.flatnonzero((np.maximum(n1, n2) <= exact_max_rows) & (n1 > 0) & (n2 > 0)):
+        result = ks_2samp(np.repeat(domain, base_counts[column]), np.repeat(domain, current_counts[column]))
+        p_value[column] = result.pvalue
+    return statistic, p_value
+
+
+def chi2_test(base_counts: np.ndarray, current_counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Chi-square test of homogeneity on the 2 x values contingency table of every column, no continuity correction"""
+    observed = np.stack([base_counts, current_counts], axis=1).astype(np.float64)
+    totals = observed.sum(axis=(1, 2), keepdims=True)
+    expected = observed.sum(axis=2, keepdims=True) * observed.sum(axis=1, keepdims=True) / np.maximum(totals, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cells = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0)
+    statistic = cells.sum(axis=(1, 2))
+    dof = np.count_nonzero(observed.sum(axis=1), axis=1) - 1
+    p_value = np.where(dof > 0, chi2.sf(statistic, np.maximum(dof, 1)), 1.0)
+    return statistic, p_value
+
+
+def population_stability_index(base_counts: np.ndarray, current_counts: np.ndarray) -> np.ndarray:
+    base = np.maximum(_probabilities(base_counts), PSI_EPSILON)
+    current = np.maximum(_probabilities(current_counts), PSI_EPSILON)
+    return ((current - base) * np.log(current / base)).sum(axis=1)
+
+
+def jensen_shannon_distance(base_counts: np.ndarray, current_counts: np.ndarray) -> np.ndarray:
+    """Same as scipy.spatial.distance.jensenshannon(p, q, base=2) for every column"""
+    base = _probabilities(base_counts)
+    current = _probabilities(current_counts)
+    mixture = (base + current) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        divergence = (np.where(base > 0, base * np.log2(base / mixture), 0.0).sum(axis=1)
+                      + np.where(current > 0, current * np.log2(current / mixture), 0.0).sum(axis=1)) / 2
+    return np.sqrt(np.maximum(divergence, 0.0))
+
+
+def compare_histograms(columns: List[str], base_counts: np.ndarray, current_counts: np.ndarray,
+                       domain: np.ndarray, extra_tests: List[str] = DATA_VALIDATION_DRIFT_EXTRA_TESTS,
+                       thresholds: dict = DATA_VALIDATION_DRIFT_THRESHOLDS) -> Tuple[bool, dict]:
+    """
+    Drift report for every column: the KS p-value and whether drift was detected by
+    the KS test or any of extra_tests ("chi2", "psi", "js"). Returns (no drift found, report).
+    """
+    try:
+        unknown = set(extra_tests) - {"chi2", "psi", "js"}
+        if unknown:
+            raise ValueError(f"Unknown drift tests: {sorted(unknown)}")
+        _, ks_p_value = ks_test(base_counts, current_counts, domain)
+        drift = ks_p_value < thresholds["ks"]
+        scores = {}
+        if "chi2" in extra_tests:
+            _, scores["chi2_p_value"] = chi2_test(base_counts, current_counts)
+            drift |= scores["chi2_p_value"] < thresholds["chi2"]
+        if "psi" in extra_tests:
+            scores["psi"] = population_stability_index(base_counts, current_counts)
+            drift |= scores["psi"] > thresholds["psi"]
+        if "js" in extra_tests:
+            scores["js_distance"] = jensen_shannon_distance(base_counts, current_counts)
+            drift |= scores["js_distance"] > thresholds["js"]
+
+        report = {}
+        for i, column in enumerate(columns):
+            report[column] = {"p_value": float(ks_p_value[i]), "drift_detected": bool(drift[i])}
+            report[column].update({name: float(values[i]) for name, values in scores.items()})
+        return not bool(drift.any()), report
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def histogram_snapshot(df: pd.DataFrame) -> dict:
+    """JSON-serialisable per column value counts of df, the baseline the serving drift monitor compares against"""
+    try:
+        columns = list(df.columns)
+        matrix = np.asarray(df[columns])
+        domain = value_domain(matrix)
+        return {
+            "columns": columns,
+            "domain": domain.tolist(),
+            "counts": value_histograms(matrix, domain).tolist(),
+        }
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def detect_drift(base_df: pd.DataFrame, current_df: pd.DataFrame, **kwargs) -> Tuple[bool, dict]:
+    """Histogram both frames over their shared value domain in one pass each and compare every column"""
+    try:
+        columns = list(base_df.columns)
+        base = np.asarray(base_df[columns])
+        current = np.asarray(current_df[columns])
+        domain = value_domain(base, current)
+        return compare_histograms(columns, value_histograms(base, domain), value_histograms(current, domain),
+                                  domain, **kwargs)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
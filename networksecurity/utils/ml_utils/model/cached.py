@@ -0,0 +1,123 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+
+from networksecurity.constant.training_pipeline import PREDICTION_CACHE_SIZE
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+
+
+def encode_ternary_rows(values: np.ndarray):
+    """
+    Pack every row of a float matrix into a uint64 key, 2 bits per feature:
+    -1 -> 0, 0 -> 1, 1 -> 2, NaN -> 3. Returns (keys, cacheable) where rows
+    holding any other value are not cacheable. Supports up to 32 features.
+    """
+    codes = np.full(values.shape, 3, dtype=np.uint64)
+    known = np.isnan(values)
+    for value, code in ((-1.0, 0), (0.0, 1), (1.0, 2)):
+        match = values == value
+        codes[match] = code
+        known |= match
+    cacheable = known.all(axis=1)
+    shifts = np.arange(values.shape[1], dtype=np.uint64) * np.uint64(2)
+    keys = np.bitwise_or.reduce(codes << shifts, axis=1) if values.shape[1] else np.zeros(len(values), np.uint64)
+    return keys, cacheable
+
+
+class CachedNetworkModel:
+    """
+    Memoizes NetworkModel predictions per distinct feature vector.
+
+    Every feature takes one of -1, 0, 1 or NaN, so a row fits in a 64 bit key
+    and repeated URL profiles are answered from a bounded LRU map instead of
+    another imputer + ensemble evaluation. Keys are computed for the whole
+    batch at once; a batch makes at most one call to the wrapped model, for
+    its distinct uncached rows. Predictions are deterministic for a fitted
+    model, so cached answers are the ones the model would give.
+    """
+
+    def __init__(self, network_model: NetworkModel, max_size: int = PREDICTION_CACHE_SIZE):
+        self.network_model = network_model
+        self.max_size = max_size
+        self.feature_names_in_ = network_model.preprocessor.feature_names_in_
+        if len(self.feature_names_in_) > 32:
+            raise NetworkSecurityException(
+                Exception(f"{type(self).__name__} supports at most 32 features, got {len(self.feature_names_in_)}"),
+                sys)
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.evictions = 0
+
+    def __getattr__(self, name):
+        # preprocessor, model, compiled, transform ... come from the wrapped NetworkModel
+        if name == "network_model":
+            raise AttributeError(name)
+        return getattr(self.network_model, name)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncacheable": self.uncacheable,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _values(self, x) -> np.ndarray:
+        if isinstance(x, pd.DataFrame):
+            if not np.array_equal(x.columns, self.feature_names_in_):
+                x = x[self.feature_names_in_]
+            return x.to_numpy(dtype=np.float64)
+        return np.array(x, dtype=np.float64, ndmin=2)
+
+    def predict(self, x) -> np.ndarray:
+        try:
+            values = self._values(x)
+            keys, cacheable = encode_ternary_rows(values)
+            cached_rows = np.flatnonzero(cacheable)
+            unique_keys, first_index, inverse = np.unique(keys[cached_rows], return_index=True, return_inverse=True)
+
+            with self._lock:
+                found = [self._cache.get(key) for key in unique_keys.tolist()]
+                for key, prediction in zip(unique_keys.tolist(), found):
+                    if prediction is not None:
+                        self._cache.move_to_end(key)
+            missing = np.array([i for i, prediction in enumerate(found) if prediction is None], dtype=np.intp)
+
+            # one model call for the distinct uncached rows and the rows that cannot be cached
+            to_predict = np.concatenate([cached_rows[first_index[missing]], np.flatnonzero(~cacheable)])
+            predicted = np.asarray(self.network_model.predict(
+                pd.DataFrame(values[to_predict], columns=self.feature_names_in_))) if len(to_predict) else None
+            for i, prediction in zip(missing, predicted if predicted is not None else []):
+                found[i] = prediction
+
+            result = np.empty(len(values), dtype=predicted.dtype if predicted is not None else np.asarray(found).dtype)
+            if len(cached_rows):
+                result[cached_rows] = np.asarray(found, dtype=result.dtype)[inverse]
+            if not cacheable.all():
+                result[~cacheable] = predicted[len(missing):]
+
+            missed_rows = int(np.isin(inverse, missing).sum())
+            with self._lock:
+                for i in missing:
+                    self._cache[int(unique_keys[i])] = found[i]
+                while len(self._cache) > self.max_size:
+                    self._cache.popitem(last=False)
+                    self.evictions += 1
+                self.hits += len(cached_rows) - missed_rows
+                self.misses += missed_rows
+                self.uncacheable += len(values) - len(cached_rows)
+            return result
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -0,0 +1,175 @@
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.utils.ml_utils.model.estimator import get_passthrough_imputer
+
+
+class FlatTrees:
+    """
+    Any number of fitted sklearn trees concatenated into one set of node arrays.
+    All trees are walked at once, one level per step, so a batch costs max_depth
+    vectorized gathers no matter how many trees there are.
+    """
+
+    def __init__(self, trees: list):
+        offsets = np.cumsum([0] + [tree.tree_.node_count for tree in trees])
+        self.roots = offsets[:-1].astype(np.intp)
+        self.left = np.concatenate([np.where(tree.tree_.children_left < 0, -1, tree.tree_.children_left + offset)
+                                    for tree, offset in zip(trees, offsets)]).astype(np.intp)
+        self.right = np.concatenate([np.where(tree.tree_.children_right < 0, -1, tree.tree_.children_right + offset)
+                                     for tree, offset in zip(trees, offsets)]).astype(np.intp)
+        # leaves have feature -2, keep a valid column index so the gather never fails
+        self.feature = np.concatenate([np.maximum(tree.tree_.feature, 0) for tree in trees]).astype(np.intp)
+        self.threshold = np.concatenate([tree.tree_.threshold for tree in trees])
+        self.value = np.concatenate([tree.tree_.value[:, 0, :] for tree in trees])
+        self.max_depth = max(tree.tree_.max_depth for tree in trees)
+
+    def leaves(self, x: np.ndarray) -> np.ndarray:
+        """Leaf node of every (tree, row), shape (trees, rows)"""
+        # sklearn trees compare float32 features with float64 thresholds
+        x = x.astype(np.float32)
+        nodes = np.repeat(self.roots[:, None], len(x), axis=1)
+        rows = np.arange(len(x))
+        for _ in range(self.max_depth):
+            left = self.left[nodes]
+            if (left < 0).all():
+                break
+            go_left = x[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(left < 0, nodes, np.where(go_left, left, self.right[nodes]))
+        return nodes
+
+
+class CompiledModel:
+    """
+    Preprocessor and classifier flattened into NumPy arrays with one predict routine.
+
+    Supports DecisionTree, RandomForest, GradientBoosting and AdaBoost (binary) with
+    tree estimators, and LogisticRegression, behind a NaN-only imputer. Input is
+    converted once and not re-validated by every step. Complete rows never touch
+    the imputer; rows with NaN go through the original preprocessor. Sums are taken
+    in the same order as sklearn so predictions match exactly; compile() is meant
+    to be followed by check_parity().
+    """
+
+    def __init__(self, preprocessor, model):
+        self.preprocessor = preprocessor
+        self.kind = None
+        self.classes_ = np.asarray(model.classes_)
+        self.n_features_in_ = model.n_features_in_
+        self.feature_names_in_ = getattr(preprocessor, "feature_names_in_", None)
+        self.trees: FlatTrees = None
+        self.init_raw = 0.0
+        self.learning_rate = 1.0
+        self.weights: np.ndarray = None
+        self.coef_: np.ndarray = None
+        self.intercept_: np.ndarray = None
+
+    @classmethod
+    def compile(cls, preprocessor, model) -> "CompiledModel":
+        try:
+            if get_passthrough_imputer(preprocessor) is None:
+                raise ValueError(f"Cannot compile preprocessor {preprocessor}, only a NaN imputer is supported")
+            compiled = cls(preprocessor, model)
+            n_classes = len(compiled.classes_)
+            if isinstance(model, DecisionTreeClassifier):
+                compiled.kind = "forest"
+                compiled.trees = FlatTrees([model])
+            elif isinstance(model, RandomForestClassifier):
+                compiled.kind = "forest"
+                compiled.trees = FlatTrees(list(model.estimators_))
+            elif isinstance(model, GradientBoostingClassifier) and n_classes == 2:
+                compiled.kind = "gradient_boosting"
+                compiled.trees = FlatTrees(list(model.estimators_[:, 0]))
+                compiled.learning_rate = model.learning_rate
+                # the init estimator's raw prediction does not depend on the row
+                compiled.init_raw = float(model._raw_predict_init(np.zeros((1, model.n_features_in_)))[0, 0])
+            elif (isinstance(model, AdaBoostClassifier) and n_classes == 2
+                  and all(isinstance(tree, DecisionTreeClassifier) for tree in model.estimators_)):
+                compiled.kind = "adaboost"
+                compiled.trees = FlatTrees(list(model.estimators_))
+                compiled.weights = np.asarray(model.estimator_weights_[:len(model.estimators_)], dtype=np.float64)
+            elif isinstance(model, LogisticRegression) and n_classes == 2:
+                compiled.kind = "linear"
+                compiled.coef_ = np.asarray(model.coef_)
+                compiled.intercept_ = np.asarray(model.intercept_)
+            else:
+                raise ValueError(f"Cannot compile {type(model).__name__} with {n_classes} classes")
+            nodes = len(compiled.trees.threshold) if compiled.trees is not None else 0
+            logging.info(f"Compiled {type(model).__name__} into a flat {compiled.kind} model with {nodes} tree nodes")
+            return compiled
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def transform(self, x) -> np.ndarray:
+        if isinstance(x, pd.DataFrame):
+            if self.feature_names_in_ is not None and not np.array_equal(x.columns, self.feature_names_in_):
+                x = x[self.feature_names_in_]
+            values = x.to_numpy(dtype=np.float64, copy=True)
+        else:
+            values = np.array(x, dtype=np.float64, ndmin=2)
+        if values.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {values.shape[1]} features, expected {self.n_features_in_}")
+        missing_rows = np.isnan(values).any(axis=1)
+        if missing_rows.any():
+            subset = values[missing_rows]
+            if self.feature_names_in_ is not None:
+                subset = pd.DataFrame(subset, columns=self.feature_names_in_)
+            values[missing_rows] = self.preprocessor.transform(subset)
+        return values
+
+    def decision(self, values: np.ndarray) -> np.ndarray:
+        """Class probabilities (forest) or the binary decision score (other kinds) of transformed rows"""
+        if self.kind == "linear":
+            return (values @ self.coef_.T + self.intercept_).ravel()
+        leaves = self.trees.leaves(values)
+        if self.kind == "forest":
+            # sequential sum over trees, like sklearn accumulates predict_proba
+            return self.trees.value[leaves].sum(axis=0) / len(leaves)
+        if self.kind == "gradient_boosting":
+            stages = self.learning_rate * self.trees.value[leaves, 0]
+            return np.add.reduce(np.vstack([np.full((1, len(values)), self.init_raw), stages]), axis=0)
+        # adaboost: every tree votes +w for the second class and -w for the first
+        votes = np.argmax(self.trees.value[leaves], axis=2) == 1
+        return np.where(votes, self.weights[:, None], -self.weights[:, None]).sum(axis=0)
+
+    def predict(self, x) -> np.ndarray:
+        try:
+            score = self.decision(self.transform(x))
+            if self.kind == "forest":
+                return self.classes_.take(np.argmax(score, axis=1))
+            if self.kind == "gradient_boosting":
+                return self.classes_.take((score >= 0).astype(int))
+            return self.classes_.take((score > 0).astype(int))
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+def check_parity(network_model, compiled: CompiledModel, x: np.ndarray, missing_rate: float = 0.05,
+                 max_missing_rows: int = 2000, random_state: int = 0) -> bool:
+    """
+    Compare predictions on x, and on up to max_missing_rows rows of x with NaN sprinkled in
+    so the imputer path is covered too
+    """
+    try:
+        x = np.asarray(x, dtype=np.float64)
+        rng = np.random.default_rng(random_state)
+        sample = x[rng.permutation(len(x))[:max_missing_rows]]
+        with_missing = np.where(rng.random(sample.shape) < missing_rate, np.nan, sample)
+        for values in (x, with_missing):
+            frame = pd.DataFrame(values, columns=compiled.feature_names_in_)
+            expected = np.asarray(network_model.predict(frame))
+            actual = compiled.predict(frame)
+            if not np.array_equal(expected, actual):
+                logging.error(f"Compiled model disagrees on {int((expected != actual).sum())} of {len(x)} rows")
+                return False
+        return True
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
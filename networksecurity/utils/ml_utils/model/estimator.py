@@ -2,24 +2,87 @@
 import os
 import sys
 
+import numpy as np
+import pandas as pd
+from sklearn.impute import KNNImputer
+from sklearn.pipeline import Pipeline
+
 from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
 
 from networksecurity.constant.training_pipeline import SAVED_MODEL_DIR,MODEL_FILE_NAME
+from networksecurity.utils.ml_utils.imputer.ternary_knn_imputer import TernaryKNNImputer
+
+
+def get_passthrough_imputer(preprocessor):
+    """
+    Returns the imputer if the preprocessor is nothing but a NaN imputer that
+    hands complete rows back unchanged, otherwise None.
+    """
+    imputer = preprocessor
+    if isinstance(preprocessor, Pipeline):
+        if len(preprocessor.steps) != 1:
+            return None
+        imputer = preprocessor.steps[0][1]
+    if isinstance(imputer, TernaryKNNImputer):
+        valid_mask = getattr(imputer, "_valid_mask", None)
+        return imputer if valid_mask is not None and np.all(valid_mask) else None
+    if not isinstance(imputer, KNNImputer) or imputer.add_indicator:
+        return None
+    missing_values = imputer.missing_values
+    if not (isinstance(missing_values, float) and np.isnan(missing_values)):
+        return None
+    # columns that were all NaN during fit are dropped by transform
+    valid_mask = getattr(imputer, "_valid_mask", None)
+    if valid_mask is None or not (imputer.keep_empty_features or np.all(valid_mask)):
+        return None
+    return imputer
 
 
 class NetworkModel:
-    def __init__(self,preprocessor,model):
+    def __init__(self,preprocessor,model,compiled=None):
         try:
             self.preprocessor = preprocessor
             self.model = model
+            # CompiledModel of the same preprocessor and model, used for predict when present
+            self.compiled = compiled
         except Exception as e:
             raise NetworkSecurityException(e,sys)
-    
+
+    def transform(self,x):
+        """
+        Preprocess x, only sending rows that actually contain NaN through the imputer.
+        Complete rows come back exactly as the imputer would return them.
+        """
+        imputer = getattr(self, "_passthrough_imputer", False)
+        if imputer is False:
+            imputer = self._passthrough_imputer = get_passthrough_imputer(self.preprocessor)
+        if imputer is None:
+            return self.preprocessor.transform(x)
+
+        feature_names = getattr(imputer, "feature_names_in_", None)
+        if isinstance(x, pd.DataFrame):
+            if feature_names is not None and not np.array_equal(x.columns, feature_names):
+                return self.preprocessor.transform(x)
+            values = x.to_numpy(dtype=np.float64, copy=True)
+        else:
+            values = np.array(x, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] != imputer.n_features_in_:
+            return self.preprocessor.transform(x)
+
+        missing_rows = np.isnan(values).any(axis=1)
+        if missing_rows.any():
+            subset = x.iloc[missing_rows] if isinstance(x, pd.DataFrame) else values[missing_rows]
+            values[missing_rows] = self.preprocessor.transform(subset)
+        return values
+
     def predict(self,x):
         try:
-            x_transform = self.preprocessor.transform(x)
+            compiled = getattr(self, "compiled", None)
+            if compiled is not None:
+                return compiled.predict(x)
+            x_transform = self.transform(x)
             y_hat = self.model.predict(x_transform)
             return y_hat
         except Exception as e:
-            raise NetworkSecurityException(e,sys)
\ No newline at end of file
+            raise NetworkSecurityException(e,sys)
@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Tuple
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constant.training_pipeline import (
+    FINAL_MODEL_DIR,
+    FINAL_MODEL_FILE_NAME,
+    FINAL_PREPROCESSOR_FILE_NAME,
+    FINAL_COMPILED_MODEL_FILE_NAME,
+    FINAL_DRIFT_BASELINE_FILE_NAME,
+    FINAL_MODEL_RELEASES_DIR,
+    FINAL_MODEL_CURRENT_FILE_NAME,
+    FINAL_MODEL_RELEASE_HISTORY,
+    MODEL_REGISTRY_POLL_INTERVAL_SECONDS,
+    PREDICTION_CACHE_SIZE,
+)
+from networksecurity.utils.main_utils.utils import load_object, save_object
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.model.cached import CachedNetworkModel
+
+
+def read_current_release(model_dir: str) -> str:
+    """Name of the release final_model/current.json points to, None for a model published before releases"""
+    try:
+        with open(os.path.join(model_dir, FINAL_MODEL_CURRENT_FILE_NAME)) as current_file:
+            return json.load(current_file)["release"]
+    except FileNotFoundError:
+        return None
+
+
+def publish_model(network_model: NetworkModel, drift_baseline_file_path: str = None,
+                  model_dir: str = FINAL_MODEL_DIR, history: int = FINAL_MODEL_RELEASE_HISTORY) -> str:
+    """
+    Write the preprocessor, model, compiled model and drift baseline into a new release
+    directory under model_dir and switch current.json to it with one atomic replace.
+    Returns the release name, which the registry serves as the model version.
+    """
+    try:
+        releases_dir = os.path.join(model_dir, FINAL_MODEL_RELEASES_DIR)
+        release = uuid.uuid4().hex[:12]
+        temp_dir = os.path.join(releases_dir, f"{release}.tmp")
+        os.makedirs(temp_dir)
+        save_object(os.path.join(temp_dir, FINAL_PREPROCESSOR_FILE_NAME), network_model.preprocessor)
+        save_object(os.path.join(temp_dir, FINAL_MODEL_FILE_NAME), network_model.model)
+        if getattr(network_model, "compiled", None) is not None:
+            save_object(os.path.join(temp_dir, FINAL_COMPILED_MODEL_FILE_NAME), network_model.compiled)
+        if drift_baseline_file_path is not None:
+            shutil.copyfile(drift_baseline_file_path, os.path.join(temp_dir, FINAL_DRIFT_BASELINE_FILE_NAME))
+        os.rename(temp_dir, os.path.join(releases_dir, release))
+
+        current_file_path = os.path.join(model_dir, FINAL_MODEL_CURRENT_FILE_NAME)
+        temp_file_path = f"{current_file_path}.{os.getpid()}.tmp"
+        with open(temp_file_path, "w") as current_file:
+            json.dump({"release": release, "published_at": time.time()}, current_file)
+        os.replace(temp_file_path, current_file_path)
+
+        # processes serving a removed release keep their mappings, unlinked files stay readable
+        previous = sorted((name for name in os.listdir(releases_dir) if name != release),
+                          key=lambda name: os.path.getmtime(os.path.join(releases_dir, name)), reverse=True)
+        for name in previous[history:]:
+            shutil.rmtree(os.path.join(releases_dir, name), ignore_errors=True)
+        logging.info(f"Published model release {release} to {model_dir}")
+        return release
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+@dataclass
+class LoadedModel:
+    version: str
+    network_model: NetworkModel
+    loaded_at: float
+    drift_baseline: dict = None
+
+
+class ModelRegistry:
+    """
+    Keeps the served NetworkModel resident in memory.
+
+    The model is unpickled once and handed out by reference, so a request that
+    already called get() keeps scoring with its version while a reload builds
+    the next one. The swap itself is a single attribute assignment.
+
+    Models are loaded from the release current.json points to (see publish_model),
+    the release name is the version. A model_dir without current.json holds a model
+    published before releases, its files are read from model_dir itself.
+    """
+
+    def __init__(self, model_dir: str = FINAL_MODEL_DIR,
+                 poll_interval: float = MODEL_REGISTRY_POLL_INTERVAL_SECONDS,
+                 cache_size: int = PREDICTION_CACHE_SIZE):
+        self.model_dir = model_dir
+        self.poll_interval = poll_interval
+        self.cache_size = cache_size
+        self._current: LoadedModel = None
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher: threading.Thread = None
+        self._pending_version: str = None
+
+    def resolve(self) -> Tuple[str, str]:
+        """(version, directory holding its files), version is None if a required file is missing"""
+        try:
+            release = read_current_release(self.model_dir)
+            if release is not None:
+                return release, os.path.join(self.model_dir, FINAL_MODEL_RELEASES_DIR, release)
+            return self.fingerprint(self.model_dir), self.model_dir
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @staticmethod
+    def fingerprint(directory: str) -> str:
+        """Cheap version id built from size and mtime of the model files, None if a required one is missing"""
+        digest = hashlib.sha1()
+        for file_name in (FINAL_PREPROCESSOR_FILE_NAME, FINAL_MODEL_FILE_NAME, FINAL_COMPILED_MODEL_FILE_NAME):
+            file_path = os.path.join(directory, file_name)
+            if not os.path.exists(file_path):
+                if file_name == FINAL_COMPILED_MODEL_FILE_NAME:
+                    continue
+                return None
+            stat = os.stat(file_path)
+            digest.update(f"{file_path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()[:12]
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._current is not None
+
+    @property
+    def version(self) -> str:
+        current = self._current
+        return current.version if current is not None else None
+
+    def current(self) -> LoadedModel:
+        current = self._current
+        if current is None:
+            raise NetworkSecurityException(
+                Exception(f"No model loaded from {self.model_dir}, run /train first"), sys)
+        return current
+
+    def get(self) -> NetworkModel:
+        return self.current().network_model
+
+    def reload(self, force: bool = False) -> str:
+        """Load the model files and swap them in, returns the active version"""
+        try:
+            with self._reload_lock:
+                version, directory = self.resolve()
+                if version is None:
+                    raise Exception(f"Model files are missing in {self.model_dir}")
+                if not force and self.version == version:
+                    return version
+
+                preprocessor = load_object(os.path.join(directory, FINAL_PREPROCESSOR_FILE_NAME),
+                                           verify_checksums=True)
+                model = load_object(os.path.join(directory, FINAL_MODEL_FILE_NAME), verify_checksums=True)
+                compiled = None
+                compiled_model_file_path = os.path.join(directory, FINAL_COMPILED_MODEL_FILE_NAME)
+                if os.path.exists(compiled_model_file_path):
+                    compiled = load_object(compiled_model_file_path, verify_checksums=True)
+                network_model = NetworkModel(preprocessor=preprocessor, model=model, compiled=compiled)
+                if self.cache_size > 0:
+                    # every version starts with an empty cache, nothing stale is served after a swap
+                    network_model = CachedNetworkModel(network_model, max_size=self.cache_size)
+                drift_baseline = None
+                drift_baseline_file_path = os.path.join(directory, FINAL_DRIFT_BASELINE_FILE_NAME)
+                if os.path.exists(drift_baseline_file_path):
+                    with open(drift_baseline_file_path) as baseline_file:
+                        drift_baseline = json.load(baseline_file)
+
+                self._current = LoadedModel(version=version, network_model=network_model,
+                                            loaded_at=time.time(), drift_baseline=drift_baseline)
+                self._pending_version = None
+                logging.info(f"Model registry loaded model version {version} from {directory}")
+                return version
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def refresh_if_changed(self) -> bool:
+        """
+        Reload when current.json points to another release. Files published before
+        releases are reloaded once they changed and stayed unchanged for one poll
+        interval, so a model that is still being written is never picked up half way.
+        """
+        try:
+            version, directory = self.resolve()
+        except NetworkSecurityException as e:
+            logging.error(f"Model registry could not read {self.model_dir}: {e}")
+            return False
+        if version is None or version == self.version:
+            self._pending_version = None
+            return False
+        if directory == self.model_dir and version != self._pending_version:
+            self._pending_version = version
+            return False
+        try:
+            self.reload()
+            return True
+        except NetworkSecurityException as e:
+            logging.error(f"Model registry kept version {self.version}, reload failed: {e}")
+            return False
+
+    def _watch(self):
+        while not self._stop_event.wait(self.poll_interval):
+            self.refresh_if_changed()
+
+    def start_watcher(self):
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+        logging.info(f"Model registry watching {self.model_dir} every {self.poll_interval}s")
+
+    def stop_watcher(self):
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval)
+            self._watcher = None
@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import time
+import hashlib
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.model_selection import ParameterGrid, check_cv
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.utils.main_utils.profiling import peak_rss_mb
+
+from networksecurity.constant.training_pipeline import (
+    MODEL_TRAINER_SEARCH_CV,
+    MODEL_TRAINER_SEARCH_N_JOBS,
+    MODEL_TRAINER_SEARCH_CACHE_DIR,
+    MODEL_TRAINER_SEARCH_CACHE_MAX_FILES,
+)
+
+
+def fit_and_score(estimator, params: dict, X, y, train, test) -> tuple:
+    """
+    (score, wall seconds, cpu seconds, worker peak RSS MB, error) of one fold fit. A fit
+    that raises scores NaN with the error message, like GridSearchCV's error_score=nan.
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        model = clone(estimator).set_params(**params)
+        model.fit(X[train], y[train])
+        score, error = float(model.score(X[test], y[test])), None
+    except Exception as e:
+        score, error = float("nan"), f"{type(e).__name__}: {e}"
+    return score, time.perf_counter() - wall, time.process_time() - cpu, peak_rss_mb(), error
+
+
+def fit_estimator(estimator, params: dict, X, y) -> tuple:
+    """(fitted model, wall seconds, cpu seconds)"""
+    wall, cpu = time.perf_counter(), time.process_time()
+    model = clone(estimator).set_params(**params)
+    return model.fit(X, y), time.perf_counter() - wall, time.process_time() - cpu
+
+
+class CachedGridSearch:
+    """
+    Grid search over several models at once, equivalent to running
+    GridSearchCV(model, grid, cv=cv) for each of them.
+
+    Every (model, candidate, fold) fit of every model goes into one joblib pool,
+    so the small grids do not leave cores idle while the large ones run. Fold
+    scores are cached on disk keyed by a hash of the training data, the full
+    estimator parameters and the fold, so candidates that did not change are not
+    refitted on the next run. Estimators without a fixed random_state are cached
+    with the score of the run that first fitted them. A fold fit that raises scores
+    NaN and is not cached; candidates with a NaN fold are never chosen as best, and a
+    model none of whose candidates could be fitted is left out of the result.
+
+    After fit(), candidate_stats holds the mean score, fold fit time and CPU (measured
+    in the worker) and number of cached folds of every candidate, and model_stats the
+    totals per model with the time to refit its best candidate.
+    """
+
+    def __init__(self, cv: int = MODEL_TRAINER_SEARCH_CV, n_jobs: int = MODEL_TRAINER_SEARCH_N_JOBS,
+                 cache_dir: str = MODEL_TRAINER_SEARCH_CACHE_DIR):
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.candidate_stats = []
+        self.model_stats = {}
+
+    @staticmethod
+    def data_fingerprint(X, y, n_splits: int) -> str:
+        digest = hashlib.sha256()
+        for array in (np.ascontiguousarray(X), np.ascontiguousarray(y)):
+            digest.update(f"{array.dtype}{array.shape}".encode())
+            digest.update(array.tobytes())
+        digest.update(f"cv={n_splits}".encode())
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def candidate_key(estimator, params: dict, fold: int) -> str:
+        full_params = clone(estimator).set_params(**params).get_params(deep=False)
+        return f"{type(estimator).__name__}|{sorted(full_params.items())!r}|fold={fold}"
+
+    def _load_cache(self, cache_file_path: str) -> dict:
+        if self.cache_dir is None or not os.path.exists(cache_file_path):
+            return {}
+        try:
+            with open(cache_file_path) as cache_file:
+                return json.load(cache_file)
+        except ValueError:
+            logging.warning(f"Ignoring unreadable search cache {cache_file_path}")
+            return {}
+
+    def _save_cache(self, cache_file_path: str, scores: dict):
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_file_path = f"{cache_file_path}.{os.getpid()}.tmp"
+        with open(temp_file_path, "w") as cache_file:
+            # failed fits are retried on the next run rather than cached
+            json.dump({key: score for key, score in scores.items() if not np.isnan(score)}, cache_file)
+        os.replace(temp_file_path, cache_file_path)
+
+    def _prune_cache(self, cache_file_path: str, max_files: int = MODEL_TRAINER_SEARCH_CACHE_MAX_FILES):
+        """Drop the cache files of all but the max_files most recently used data fingerprints"""
+        if self.cache_dir is None or not os.path.isdir(self.cache_dir):
+            return
+        if os.path.exists(cache_file_path):
+            # a run served entirely from the cache still counts as a use
+            os.utime(cache_file_path)
+        cache_files = sorted((os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                              if name.endswith(".json")), key=os.path.getmtime, reverse=True)
+        for stale_file_path in cache_files[max_files:]:
+            try:
+                os.remove(stale_file_path)
+            except OSError:
+                pass
+
+    def fit(self, models: dict, param: dict, X, y) -> dict:
+        """
+        Searches every model's grid and returns {name: (best_estimator, best_params, best_score)}
+        with each best estimator refitted on all of X, y.
+        """
+        try:
+            first_model = next(iter(models.values()))
+            cv = check_cv(self.cv, y, classifier=is_classifier(first_model))
+            splits = list(cv.split(X, y))
+            cache_file_path = os.path.join(self.cache_dir or "", f"{self.data_fingerprint(X, y, len(splits))}.json")
+            scores = self._load_cache(cache_file_path)
+
+            candidates = {name: list(ParameterGrid(param[name])) for name in models}
+            tasks = []
+            for name, model in models.items():
+                for params in candidates[name]:
+                    for fold, (train, test) in enumerate(splits):
+                        key = self.candidate_key(model, params, fold)
+                        if key not in scores:
+                            tasks.append((key, model, params, train, test))
+
+            total = sum(len(grid) for grid in candidates.values()) * len(splits)
+            logging.info(f"Grid search: {total} fits, {total - len(tasks)} served from cache")
+            fit_times = {}
+            if tasks:
+                results = Parallel(n_jobs=self.n_jobs)(
+                    delayed(fit_and_score)(model, params, X, y, train, test)
+                    for _, model, params, train, test in tasks
+                )
+                scores.update({key: result[0] for (key, *_), result in zip(tasks, results)})
+                fit_times = {key: result[1:4] for (key, *_), result in zip(tasks, results)}
+                failed = [(key, result[4]) for (key, *_), result in zip(tasks, results) if result[4] is not None]
+                for key, error in failed:
+                    logging.warning(f"Fit failed, scored NaN: {key}: {error}")
+                if failed:
+                    logging.warning(f"Grid search: {len(failed)} of {len(tasks)} fits failed")
+                self._save_cache(cache_file_path, scores)
+            self._prune_cache(cache_file_path)
+
+            best = {}
+            for name, model in models.items():
+                mean_scores = np.array([
+                    np.mean([scores[self.candidate_key(model, params, fold)] for fold in range(len(splits))])
+                    for params in candidates[name]
+                ])
+                if np.isnan(mean_scores).all():
+                    logging.error(f"Grid search: every candidate of {name} failed, leaving it out")
+                    continue
+                # first candidate wins ties, like GridSearchCV's rank_test_score; failed candidates never win
+                best_index = int(np.nanargmax(mean_scores))
+                best[name] = (candidates[name][best_index], float(mean_scores[best_index]))
+            if not best:
+                raise Exception("Grid search: no candidate of any model could be fitted")
+
+            fitted = Parallel(n_jobs=self.n_jobs)(
+                delayed(fit_estimator)(models[name], best_params, X, y)
+                for name, (best_params, _) in best.items()
+            )
+            self._collect_stats(models, candidates, len(splits), scores, fit_times, dict(zip(best, fitted)))
+            return {name: (estimator, best[name][0], best[name][1])
+                    for name, (estimator, _, _) in zip(best, fitted)}
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _collect_stats(self, models: dict, candidates: dict, n_splits: int, scores: dict, fit_times: dict,
+                       refits: dict):
+        self.candidate_stats = []
+        self.model_stats = {}
+        for name, model in models.items():
+            if name not in refits:
+                continue
+            for params in candidates[name]:
+                keys = [self.candidate_key(model, params, fold) for fold in range(n_splits)]
+                timed = [fit_times[key] for key in keys if key in fit_times]
+                self.candidate_stats.append({
+                    "model": name,
+                    "params": params,
+                    "mean_score": float(np.mean([scores[key] for key in keys])),
+                    "fit_seconds": sum(wall for wall, _, _ in timed),
+                    "fit_cpu_seconds": sum(cpu for _, cpu, _ in timed),
+                    "worker_peak_rss_mb": max((rss for _, _, rss in timed if rss is not None), default=None),
+                    "cached_folds": n_splits - len(timed),
+                })
+            model_candidates = [stats for stats in self.candidate_stats if stats["model"] == name]
+            _, refit_seconds, refit_cpu_seconds = refits[name]
+            self.model_stats[name] = {
+                "candidates": len(model_candidates),
+                "fits": sum(n_splits - stats["cached_folds"] for stats in model_candidates),
+                "cached_fits": sum(stats["cached_folds"] for stats in model_candidates),
+                "fit_seconds": sum(stats["fit_seconds"] for stats in model_candidates),
+                "fit_cpu_seconds": sum(stats["fit_cpu_seconds"] for stats in model_candidates),
+                "refit_seconds": refit_seconds,
+                "refit_cpu_seconds": refit_cpu_seconds,
+            }
+
+
+class HalvingSearch:
+    """Successive halving per model via HalvingGridSearchCV, for grids too large to search exhaustively"""
+
+    def __init__(self, cv: int = MODEL_TRAINER_SEARCH_CV, n_jobs: int = MODEL_TRAINER_SEARCH_N_JOBS,
+                 factor: int = 3):
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.factor = factor
+
+    def fit(self, models: dict, param: dict, X, y) -> dict:
+        try:
+            from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+            from sklearn.model_selection import HalvingGridSearchCV
+
+            best = {}
+            for name, model in models.items():
+                search = HalvingGridSearchCV(model, param[name], cv=self.cv, factor=self.factor,
+                                             n_jobs=self.n_jobs)
+                search.fit(X, y)
+                best[name] = (search.best_estimator_, search.best_params_, float(search.best_score_))
+            return best
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -1,26 +1,29 @@
 import os
+import io
 import sys
 import json
+import time
 import logging
+import threading
 from pathlib import Path
 from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
-import psycopg2
 from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging 
+from networksecurity.utils.main_utils.db import get_pool
 # Load .env
 load_dotenv()
 
 
 
-POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
-POSTGRES_PORT = int(os.getenv("POSTGRES_PORT", 5432))
-POSTGRES_DB = os.getenv("POSTGRES_DB", "NetworkSecurity")
-POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
-POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "")
+# Bulk COPY loader
+BULK_LOAD_BATCH_SIZE = int(os.getenv("BULK_LOAD_BATCH_SIZE", 50000))
+BULK_LOAD_WORKERS = int(os.getenv("BULK_LOAD_WORKERS", 1))
+BULK_LOAD_PROGRESS_TABLE = "etl_load_progress"
 
 
 class NetworkDataExtract:
@@ -28,14 +31,9 @@ class NetworkDataExtract:
 
     def __init__(self):
         try:
-            self.conn = psycopg2.connect(
-                host=POSTGRES_HOST,
-                port=POSTGRES_PORT,
-                database=POSTGRES_DB,
-                user=POSTGRES_USER,
-                password=POSTGRES_PASSWORD
-            )
-            self.cursor = self.conn.cursor()
+            self.db_pool = get_pool()
+            if not self.db_pool.ping():
+                raise Exception("PostgreSQL is unreachable")
             logging.info(" Connected to PostgreSQL successfully.")
         except Exception as e:
             logging.error(f" Connection failed: {e}")
@@ -62,11 +60,10 @@ class NetworkDataExtract:
         );
         """
         try:
-            self.cursor.execute(create_sql)
-            self.conn.commit()
+            with self.db_pool.cursor() as cursor:
+                cursor.execute(create_sql)
             logging.info(f" Ensured table '{table_name}' exists.")
         except Exception as e:
-            self.conn.rollback()
             logging.error(f" Failed to ensure table exists: {e}")
             raise
 
@@ -75,17 +72,112 @@ class NetworkDataExtract:
         try:
             values = [(json.dumps(record),) for record in records]
             sql = f"INSERT INTO {table_name} (data) VALUES %s;"
-            execute_values(self.cursor, sql, values)
-            self.conn.commit()
+            with self.db_pool.cursor() as cursor:
+                execute_values(cursor, sql, values)
             logging.info(f" Inserted {len(records)} rows into '{table_name}'.")
             return len(records)
         except Exception as e:
-            self.conn.rollback()
             logging.error(f" Insert failed: {e}")
             raise
-        finally:
-            self.cursor.close()
-            self.conn.close()
+
+    def ensure_progress_table_exists(self):
+        """Batches committed by bulk_load_csv, written in the same transaction as the batch itself."""
+        create_sql = f"""
+        CREATE TABLE IF NOT EXISTS {BULK_LOAD_PROGRESS_TABLE} (
+            source TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            batch_size INTEGER NOT NULL,
+            batch_index INTEGER NOT NULL,
+            no_of_rows INTEGER NOT NULL,
+            loaded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (source, table_name, batch_size, batch_index)
+        );
+        """
+        try:
+            with self.db_pool.cursor() as cursor:
+                cursor.execute(create_sql)
+        except Exception as e:
+            logging.error(f" Failed to ensure progress table exists: {e}")
+            raise
+
+    def loaded_batches(self, source: str, table_name: str, batch_size: int) -> set:
+        with self.db_pool.cursor() as cursor:
+            cursor.execute(
+                f"SELECT batch_index FROM {BULK_LOAD_PROGRESS_TABLE} "
+                "WHERE source = %s AND table_name = %s AND batch_size = %s;",
+                (source, table_name, batch_size),
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    @staticmethod
+    def chunk_to_copy_payload(chunk: pd.DataFrame) -> io.StringIO:
+        """One JSON document per line in COPY text format, where backslash is the escape character."""
+        payload = chunk.to_json(orient="records", lines=True).replace("\\", "\\\\")
+        return io.StringIO(payload)
+
+    @staticmethod
+    def copy_batch(conn, chunk: pd.DataFrame, table_name: str, source: str,
+                   batch_size: int, batch_index: int) -> int:
+        """COPY one batch and mark it loaded, both in one transaction so a retry never duplicates rows."""
+        try:
+            with conn.cursor() as cursor:
+                cursor.copy_expert(f"COPY {table_name} (data) FROM STDIN;",
+                                   NetworkDataExtract.chunk_to_copy_payload(chunk))
+                cursor.execute(
+                    f"INSERT INTO {BULK_LOAD_PROGRESS_TABLE} "
+                    "(source, table_name, batch_size, batch_index, no_of_rows) VALUES (%s, %s, %s, %s, %s);",
+                    (source, table_name, batch_size, batch_index, len(chunk)),
+                )
+            conn.commit()
+            return len(chunk)
+        except Exception:
+            conn.rollback()
+            raise
+
+    def bulk_load_csv(self, file_path: str, table_name: str, batch_size: int = BULK_LOAD_BATCH_SIZE,
+                      workers: int = BULK_LOAD_WORKERS) -> int:
+        """
+        Stream a CSV into table_name with COPY FROM STDIN, batch_size rows per transaction.
+
+        The file is read one batch at a time and batches are spread over `workers`
+        connections. Committed batches are recorded in etl_load_progress, so running
+        the same load again (after a crash or on purpose) only loads missing batches.
+        """
+        try:
+            source = os.path.abspath(file_path)
+            self.ensure_progress_table_exists()
+            loaded = self.loaded_batches(source, table_name, batch_size)
+            if loaded:
+                logging.info(f" Resuming load of {source}: {len(loaded)} batches already loaded.")
+
+            def load(chunk, batch_index):
+                # every batch checks a connection out of the pool, workers beyond its size wait for one
+                with self.db_pool.connection() as conn:
+                    return self.copy_batch(conn, chunk, table_name, source, batch_size, batch_index)
+
+            start = time.perf_counter()
+            no_of_rows = 0
+            # at most two batches per worker are parsed ahead of the database
+            in_flight = threading.BoundedSemaphore(2 * workers)
+            futures = []
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for batch_index, chunk in enumerate(pd.read_csv(file_path, chunksize=batch_size)):
+                    if batch_index in loaded:
+                        continue
+                    in_flight.acquire()
+                    future = executor.submit(load, chunk, batch_index)
+                    future.add_done_callback(lambda _: in_flight.release())
+                    futures.append(future)
+                for future in futures:
+                    no_of_rows += future.result()
+
+            elapsed = time.perf_counter() - start
+            logging.info(f" Bulk loaded {no_of_rows} rows into '{table_name}' in {elapsed:.2f}s "
+                         f"({no_of_rows / elapsed if elapsed else 0:.0f} rows/sec, {workers} workers).")
+            return no_of_rows
+        except Exception as e:
+            logging.error(f" Bulk load failed: {e}")
+            raise
 
 
 if __name__ == "__main__":
@@ -94,6 +186,5 @@ if __name__ == "__main__":
 
     networkobj = NetworkDataExtract()
     networkobj.ensure_table_exists(DATABASE_TABLE)
-    records = networkobj.csv_to_json_convertor(str(FILE_PATH))
-    no_of_records = networkobj.insert_data_postgres(records, DATABASE_TABLE)
+    no_of_records = networkobj.bulk_load_csv(str(FILE_PATH), DATABASE_TABLE)
     logging.info(f"Total records inserted: {no_of_records}")
@@ -0,0 +1,80 @@
+"""CompiledModel must predict exactly what NetworkModel predicts through sklearn, for every model family it compiles"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.impute import KNNImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.tree import DecisionTreeClassifier
+
+from networksecurity.constant.training_pipeline import DATA_TRANSFORMATION_IMPUTER_PARAMS
+from networksecurity.utils.ml_utils.model.compiled import CompiledModel
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+
+N_FEATURES = 30
+FEATURES = [f"feature_{i}" for i in range(N_FEATURES)]
+
+MODELS = {
+    "decision_tree": lambda: DecisionTreeClassifier(random_state=0),
+    "random_forest": lambda: RandomForestClassifier(n_estimators=25, random_state=0),
+    "gradient_boosting": lambda: GradientBoostingClassifier(n_estimators=25, random_state=0),
+    "adaboost": lambda: AdaBoostClassifier(n_estimators=25, random_state=0),
+    "logistic_regression": lambda: LogisticRegression(),
+}
+
+
+def ternary_frame(rows: int, seed: int, missing_rate: float = 0.0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    values = rng.choice([-1.0, 0.0, 1.0], size=(rows, N_FEATURES), p=[0.4, 0.2, 0.4])
+    if missing_rate > 0:
+        values[rng.random(values.shape) < missing_rate] = np.nan
+    return pd.DataFrame(values, columns=FEATURES)
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    x = ternary_frame(2000, seed=0)
+    weights = np.random.default_rng(1).normal(size=N_FEATURES)
+    noise = np.random.default_rng(2).normal(scale=2.0, size=len(x))
+    y = (x.to_numpy() @ weights + noise > 0).astype(int)
+    preprocessor = Pipeline([("imputer", KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS))]).fit(x)
+    return x, y, preprocessor
+
+
+@pytest.fixture(scope="module", params=list(MODELS))
+def models(request, training_data):
+    x, y, preprocessor = training_data
+    model = MODELS[request.param]().fit(preprocessor.transform(x), y)
+    network_model = NetworkModel(preprocessor=preprocessor, model=model)
+    return network_model, CompiledModel.compile(preprocessor, model)
+
+
+def assert_parity(models, frame: pd.DataFrame):
+    network_model, compiled = models
+    expected = np.asarray(network_model.predict(frame))
+    assert np.array_equal(compiled.predict(frame), expected)
+    served = NetworkModel(network_model.preprocessor, network_model.model, compiled=compiled)
+    assert np.array_equal(served.predict(frame), expected)
+
+
+def test_parity_single_rows(models):
+    frame = ternary_frame(50, seed=3, missing_rate=0.05)
+    for i in range(len(frame)):
+        assert_parity(models, frame.iloc[i:i + 1])
+
+
+def test_parity_large_batch(models):
+    assert_parity(models, ternary_frame(20000, seed=4))
+
+
+def test_parity_rows_with_nan(models):
+    frame = ternary_frame(2000, seed=5, missing_rate=0.1)
+    assert frame.isna().any(axis=1).mean() > 0.9
+    assert_parity(models, frame)
+
+
+def test_parity_mixed_batch(models):
+    complete = ternary_frame(1000, seed=6)
+    with_nan = ternary_frame(1000, seed=7, missing_rate=0.05)
+    assert_parity(models, pd.concat([complete, with_nan], ignore_index=True).sample(frac=1.0, random_state=0))
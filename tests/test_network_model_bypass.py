@@ -0,0 +1,87 @@
+"""NetworkModel.predict, which only imputes rows with NaN, must predict exactly what preprocessor.transform + model.predict do"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import KNNImputer
+from sklearn.pipeline import Pipeline
+
+from networksecurity.constant.training_pipeline import DATA_TRANSFORMATION_IMPUTER_PARAMS
+from networksecurity.utils.ml_utils.imputer.ternary_knn_imputer import TernaryKNNImputer
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel, get_passthrough_imputer
+
+N_FEATURES = 30
+FEATURES = [f"feature_{i}" for i in range(N_FEATURES)]
+
+# name: (imputer factory, whether complete rows may skip it)
+PREPROCESSORS = {
+    "knn": (lambda: KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS), True),
+    "ternary": (lambda: TernaryKNNImputer(n_neighbors=DATA_TRANSFORMATION_IMPUTER_PARAMS["n_neighbors"]), True),
+    # the indicator columns are appended to every row, complete ones included
+    "add_indicator": (lambda: KNNImputer(**{**DATA_TRANSFORMATION_IMPUTER_PARAMS, "add_indicator": True}), False),
+}
+
+
+def ternary_frame(rows: int, seed: int, missing_rate: float = 0.0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    values = rng.choice([-1.0, 0.0, 1.0], size=(rows, N_FEATURES), p=[0.4, 0.2, 0.4])
+    if missing_rate > 0:
+        values[rng.random(values.shape) < missing_rate] = np.nan
+    return pd.DataFrame(values, columns=FEATURES)
+
+
+def fit(imputer, bypassable: bool, missing_rate: float = 0.02):
+    x = ternary_frame(1000, seed=0, missing_rate=missing_rate)
+    y = (np.nan_to_num(x.to_numpy()) @ np.random.default_rng(1).normal(size=N_FEATURES) > 0).astype(int)
+    preprocessor = Pipeline([("imputer", imputer)]).fit(x)
+    model = RandomForestClassifier(n_estimators=25, random_state=0).fit(preprocessor.transform(x), y)
+    return preprocessor, model, bypassable
+
+
+@pytest.fixture(scope="module", params=list(PREPROCESSORS))
+def fitted(request):
+    make_imputer, bypassable = PREPROCESSORS[request.param]
+    return fit(make_imputer(), bypassable)
+
+
+def assert_same_predictions(fitted, frame: pd.DataFrame):
+    preprocessor, model, bypassable = fitted
+    network_model = NetworkModel(preprocessor=preprocessor, model=model)
+    assert (get_passthrough_imputer(preprocessor) is not None) == bypassable
+    expected_transform = preprocessor.transform(frame)
+    assert np.array_equal(network_model.transform(frame), expected_transform)
+    assert np.array_equal(network_model.predict(frame), model.predict(expected_transform))
+
+
+def test_complete_batch(fitted):
+    assert_same_predictions(fitted, ternary_frame(2000, seed=2))
+
+
+def test_rows_with_nan(fitted):
+    frame = ternary_frame(2000, seed=3, missing_rate=0.1)
+    assert frame.isna().any(axis=1).mean() > 0.9
+    assert_same_predictions(fitted, frame)
+
+
+def test_mixed_batch(fitted):
+    complete = ternary_frame(1000, seed=4)
+    with_nan = ternary_frame(1000, seed=5, missing_rate=0.05)
+    assert_same_predictions(fitted, pd.concat([complete, with_nan], ignore_index=True).sample(frac=1.0, random_state=0))
+
+
+def test_single_rows(fitted):
+    frame = ternary_frame(20, seed=6, missing_rate=0.05)
+    for i in range(len(frame)):
+        assert_same_predictions(fitted, frame.iloc[i:i + 1])
+
+
+@pytest.mark.filterwarnings("ignore:X does not have valid feature names")
+def test_numpy_input(fitted):
+    assert_same_predictions(fitted, ternary_frame(500, seed=7, missing_rate=0.01).to_numpy())
+
+
+def test_non_nan_missing_values():
+    # 0 is a regular feature value, rows without NaN still hold "missing" values to impute
+    imputer = KNNImputer(**{**DATA_TRANSFORMATION_IMPUTER_PARAMS, "missing_values": 0.0})
+    fitted = fit(imputer, bypassable=False, missing_rate=0.0)
+    assert_same_predictions(fitted, ternary_frame(2000, seed=8))
@@ -0,0 +1,74 @@
+"""TernaryKNNImputer must impute what KNNImputer imputes, up to the choice between donors tied on distance"""
+import numpy as np
+import pytest
+from sklearn.impute import KNNImputer
+from sklearn.metrics.pairwise import nan_euclidean_distances
+
+from networksecurity.utils.ml_utils.imputer.ternary_knn_imputer import TernaryKNNImputer
+
+N_NEIGHBORS = 3
+
+
+def ternary_matrix(rows: int, n_features: int, seed: int, missing_rate: float) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    values = rng.choice([-1.0, 0.0, 1.0], size=(rows, n_features), p=[0.4, 0.2, 0.4])
+    values[rng.random(values.shape) < missing_rate] = np.nan
+    return values
+
+
+def allowed_range(distances: np.ndarray, donor_values: np.ndarray):
+    """
+    (low, high, tied) for one imputed cell: the nearest donors closer than the k-th one are always used,
+    the remaining places go to any of the donors at exactly the k-th distance
+    """
+    order = np.argsort(distances, kind="stable")
+    kth_distance = distances[order[N_NEIGHBORS - 1]]
+    closer = donor_values[distances < kth_distance]
+    at_kth = np.sort(donor_values[distances == kth_distance])
+    places = N_NEIGHBORS - len(closer)
+    low = (closer.sum() + at_kth[:places].sum()) / N_NEIGHBORS
+    high = (closer.sum() + at_kth[len(at_kth) - places:].sum()) / N_NEIGHBORS
+    return low, high, len(at_kth) > places and at_kth[0] != at_kth[-1]
+
+
+@pytest.mark.parametrize("n_features,train_rows,missing_rate", [(30, 2000, 0.05), (12, 500, 0.1)])
+def test_matches_knn_imputer(n_features, train_rows, missing_rate):
+    train = ternary_matrix(train_rows, n_features, seed=0, missing_rate=missing_rate)
+    query = ternary_matrix(300, n_features, seed=1, missing_rate=missing_rate)
+    expected = KNNImputer(n_neighbors=N_NEIGHBORS, weights="uniform").fit(train).transform(query)
+    imputed = TernaryKNNImputer(n_neighbors=N_NEIGHBORS).fit(train).transform(query)
+
+    assert np.array_equal(imputed[~np.isnan(query)], query[~np.isnan(query)])
+    distances = nan_euclidean_distances(query, train)
+    tie_free = tied = 0
+    for row, column in zip(*np.nonzero(np.isnan(query))):
+        donors = ~np.isnan(train[:, column]) & ~np.isnan(distances[row])
+        low, high, is_tied = allowed_range(distances[row, donors], train[donors, column])
+        if is_tied:
+            tied += 1
+            assert low - 1e-12 <= imputed[row, column] <= high + 1e-12
+            assert low - 1e-12 <= expected[row, column] <= high + 1e-12
+        else:
+            tie_free += 1
+            assert imputed[row, column] == expected[row, column]
+    # both cases are exercised
+    assert tie_free > 0 and tied > 0
+
+
+def test_complete_rows_unchanged():
+    train = ternary_matrix(500, 30, seed=2, missing_rate=0.05)
+    query = ternary_matrix(200, 30, seed=3, missing_rate=0.0)
+    assert np.array_equal(TernaryKNNImputer(n_neighbors=N_NEIGHBORS).fit(train).transform(query), query)
+
+
+def test_drops_columns_empty_during_fit():
+    train = ternary_matrix(200, 6, seed=4, missing_rate=0.1)
+    train[:, 2] = np.nan
+    query = ternary_matrix(50, 6, seed=5, missing_rate=0.1)
+    expected = KNNImputer(n_neighbors=N_NEIGHBORS).fit(train).transform(query)
+    assert TernaryKNNImputer(n_neighbors=N_NEIGHBORS).fit(train).transform(query).shape == expected.shape
+
+
+def test_rejects_non_ternary_values():
+    with pytest.raises(Exception, match="only accepts values"):
+        TernaryKNNImputer().fit(np.array([[0.0, 1.0], [2.0, -1.0]]))